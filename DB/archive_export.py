@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Spalten-Export des Preisarchivs
+Schreibt products und prices (optional auch die geparsten XLSX-Dateien)
+als nach Jahr partitionierte Parquet- oder Arrow-IPC-Dateien mit
+dictionary-kodierten Textspalten, für Auswertungen über mehrere Jahre
+ohne zeilenweises Lesen aus SQLite
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Füge Root-Verzeichnis zum Python-Pfad hinzu
+SCRIPT_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from db_diagnose_fix import get_db_path
+
+
+FORMATS = ('parquet', 'arrow')
+
+# Textspalten mit wenigen verschiedenen Werten werden dictionary-kodiert
+DICTIONARY_COLUMNS = {
+    'products': ('category', 'unit'),
+    'prices': ('source_file',),
+    'publications': ('description', 'category', 'unit', 'source_file'),
+}
+
+# Spalten mit ISO-Datum ('YYYY-MM-DD'), gespeichert als date32
+DATE_COLUMNS = ('valid_from', 'valid_until')
+
+BATCH_SIZE = 50000
+
+
+def require_pyarrow():
+    """
+    Importiert pyarrow (optionale Abhängigkeit nur für den Export).
+
+    Returns:
+        module: pyarrow oder None, wenn nicht installiert
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        print("❌ pyarrow nicht installiert (pip install pyarrow)")
+        return None
+    return pyarrow
+
+
+def build_table(pa, names, rows, dictionary_columns=()):
+    """
+    Baut eine Arrow-Tabelle aus Zeilen-Tupeln.
+
+    Args:
+        pa (module): pyarrow
+        names (list): Spaltennamen
+        rows (list): Zeilen-Tupel
+        dictionary_columns (tuple): Spalten, die dictionary-kodiert werden
+
+    Returns:
+        pyarrow.Table: Tabelle
+    """
+    columns = list(zip(*rows)) if rows else [[] for _ in names]
+    arrays = []
+    for name, values in zip(names, columns):
+        if name in DATE_COLUMNS:
+            array = pa.array(values, type=pa.string()).cast(pa.date32())
+        elif name == 'is_current':
+            array = pa.array(values, type=pa.int8()).cast(pa.bool_())
+        else:
+            array = pa.array(values)
+            if array.type == pa.null():
+                array = array.cast(pa.string())
+        if name in dictionary_columns:
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=list(names))
+
+
+def write_table(pa, table, path, fmt):
+    """
+    Schreibt eine Tabelle als Parquet (zstd) oder Arrow IPC (unkomprimiert,
+    damit die Datei direkt per Memory-Mapping gelesen werden kann).
+
+    Args:
+        pa (module): pyarrow
+        table (pyarrow.Table): Tabelle
+        path (Path): Zieldatei ohne Endung
+        fmt (str): 'parquet' oder 'arrow'
+
+    Returns:
+        Path: Geschriebene Datei
+    """
+    path = path.with_suffix(f'.{fmt}')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == 'parquet':
+        pa.parquet.write_table(table, path, compression='zstd')
+    else:
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=BATCH_SIZE)
+    return path
+
+
+def query_table(pa, cursor, sql, params, dictionary_columns):
+    """Führt eine Abfrage aus und liefert das Ergebnis als Arrow-Tabelle."""
+    cursor.execute(sql, params)
+    names = [column[0] for column in cursor.description]
+    rows = cursor.fetchall()
+    return build_table(pa, names, rows, dictionary_columns)
+
+
+def export_database(db_path, out_dir, fmt='parquet'):
+    """
+    Exportiert products und prices (nach Jahr von valid_from partitioniert).
+
+    Layout (Hive-Partitionierung, von pyarrow.dataset direkt lesbar):
+        <out_dir>/products.<fmt>
+        <out_dir>/prices/year=2022/part-0.<fmt>
+        ...
+
+    Args:
+        db_path (str): Datenbank
+        out_dir (str): Zielverzeichnis
+        fmt (str): 'parquet' oder 'arrow'
+
+    Returns:
+        dict: Anzahl Zeilen pro Tabelle bzw. Jahr
+    """
+    pa = require_pyarrow()
+    if pa is None:
+        return None
+
+    out_dir = Path(out_dir)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    counts = {}
+
+    try:
+        product_columns = [row[1] for row in cursor.execute("PRAGMA table_info(products)")]
+        selected = [column for column in
+                    ('id', 'product_number', 'description', 'category', 'unit', 'gtin')
+                    if column in product_columns]
+
+        print("  ├─ Exportiere products")
+        table = query_table(
+            pa, cursor, f"SELECT {', '.join(selected)} FROM products ORDER BY id", (),
+            DICTIONARY_COLUMNS['products']
+        )
+        write_table(pa, table, out_dir / 'products', fmt)
+        counts['products'] = table.num_rows
+
+        years = [row[0] for row in cursor.execute(
+            "SELECT DISTINCT substr(valid_from, 1, 4) FROM prices ORDER BY 1"
+        )]
+        print(f"  ├─ Exportiere prices ({', '.join(years)})")
+        for year in years:
+            table = query_table(pa, cursor, """
+                SELECT product_id, price, valid_from, valid_until, source_file, is_current
+                FROM prices
+                WHERE valid_from >= ? AND valid_from < ?
+                ORDER BY product_id, valid_from
+            """, (f'{year}-01-01', f'{int(year) + 1}-01-01'), DICTIONARY_COLUMNS['prices'])
+            write_table(pa, table, out_dir / 'prices' / f'year={year}' / 'part-0', fmt)
+            counts[f'prices {year}'] = table.num_rows
+            print(f"  │  • {year}: {table.num_rows:,} Zeilen")
+
+    finally:
+        conn.close()
+
+    print("  └─ Export abgeschlossen")
+    return counts
+
+
+def export_workbooks(directory, out_dir, fmt='parquet', sheet_name=None, jobs=1):
+    """
+    Exportiert die geparsten Publications-Sheets der XLSX-Dateien.
+
+    Verwendet parse_publication_file des Importers (gleiches Spaltenprofil,
+    gleiche Normalisierung) und schreibt pro Jahr eine Datei mit allen
+    Monatsständen (Spalte valid_from), ohne die Datenbank zu berühren.
+
+    Args:
+        directory (str): Verzeichnis mit Publications-*.xlsx (rekursiv)
+        out_dir (str): Zielverzeichnis
+        fmt (str): 'parquet' oder 'arrow'
+        sheet_name (str): Name des Tabellenblatts (optional, nutzt Config)
+        jobs (int): Anzahl paralleler Parser-Prozesse
+
+    Returns:
+        dict: Anzahl Zeilen pro Jahr
+    """
+    pa = require_pyarrow()
+    if pa is None:
+        return None
+
+    from concurrent.futures import ProcessPoolExecutor
+    from config import Config
+    from excel_import_script import parse_publication_file
+
+    sheet_name = sheet_name or Config.EXCEL_SHEET_NAME
+    files = sorted(Path(directory).rglob('Publications-*.xlsx'))
+    names = ['valid_from', 'product_number', 'description', 'category', 'unit', 'gtin',
+             'price', 'source_file']
+    by_year = {}
+
+    print(f"  ├─ Lese {len(files)} Dateien")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for parsed in executor.map(parse_publication_file, map(str, files),
+                                   [sheet_name] * len(files)):
+            if parsed['mapping'] is None:
+                print(f"  │  ⚠️  {parsed['filename']}: übersprungen")
+                continue
+            year = parsed['valid_from'][:4]
+            by_year.setdefault(year, []).extend(
+                (parsed['valid_from'],) + row + (parsed['filename'],)
+                for row in parsed['rows']
+            )
+
+    counts = {}
+    for year, rows in sorted(by_year.items()):
+        table = build_table(pa, names, rows, DICTIONARY_COLUMNS['publications'])
+        write_table(pa, table, Path(out_dir) / 'publications' / f'year={year}' / 'part-0', fmt)
+        counts[year] = table.num_rows
+        print(f"  │  • {year}: {table.num_rows:,} Zeilen")
+
+    print("  └─ Export abgeschlossen")
+    return counts
+
+
+def compare_scan(db_path, out_dir, fmt):
+    """
+    Vergleicht eine Auswertung über das ganze Archiv (Durchschnittspreis
+    pro Jahr) in SQLite und im Spalten-Export (pyarrow.dataset).
+
+    Args:
+        db_path (str): Datenbank
+        out_dir (str): Exportverzeichnis
+        fmt (str): 'parquet' oder 'arrow'
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    sqlite_result = conn.execute("""
+        SELECT substr(valid_from, 1, 4), COUNT(*), AVG(price)
+        FROM prices
+        GROUP BY 1
+        ORDER BY 1
+    """).fetchall()
+    sqlite_time = time.perf_counter() - start
+    conn.close()
+
+    start = time.perf_counter()
+    dataset = ds.dataset(
+        Path(out_dir) / 'prices', format='ipc' if fmt == 'arrow' else 'parquet',
+        partitioning='hive'
+    )
+    table = dataset.to_table(columns=['year', 'price'])
+    grouped = table.group_by('year').aggregate([('price', 'count'), ('price', 'mean')])
+    grouped = grouped.sort_by('year')
+    arrow_time = time.perf_counter() - start
+
+    print("\n" + "="*70)
+    print("📊 AUSWERTUNG: Durchschnittspreis pro Jahr")
+    print("="*70)
+    for year, count, mean in zip(grouped['year'].to_pylist(),
+                                 grouped['price_count'].to_pylist(),
+                                 pc.round(grouped['price_mean'], 2).to_pylist()):
+        print(f"   • {year}: {count:>9,} Preise  Ø {mean:>10,.2f}")
+    print(f"\n   SQLite:   {sqlite_time * 1000:8.1f} ms ({len(sqlite_result)} Jahre)")
+    print(f"   {fmt:<9} {arrow_time * 1000:8.1f} ms")
+    print("="*70)
+
+
+def main():
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description="Preisarchiv als Parquet/Arrow exportieren")
+    parser.add_argument('--db', dest='db_path', help="Datenbank (Standard: Config)")
+    parser.add_argument('--out', dest='out_dir', help="Zielverzeichnis (Standard: <db>_export)")
+    parser.add_argument('--format', choices=FORMATS, default='parquet',
+                        help="parquet (komprimiert) oder arrow (IPC, memory-mapbar)")
+    parser.add_argument('--xlsx', dest='xlsx_dir',
+                        help="Zusätzlich die XLSX-Dateien dieses Verzeichnisses exportieren")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Anzahl paralleler Parser-Prozesse für --xlsx")
+    parser.add_argument('--compare', action='store_true',
+                        help="Danach eine Jahresauswertung in SQLite und im Export vergleichen")
+    args = parser.parse_args()
+
+    db_path = args.db_path or get_db_path()
+    out_dir = args.out_dir or f"{os.path.splitext(db_path)[0]}_export"
+
+    print("\n" + "="*70)
+    print("📦 SPALTEN-EXPORT")
+    print("="*70)
+    print(f"Quelle: {db_path}")
+    print(f"Ziel:   {out_dir} ({args.format})\n")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Datenbank nicht gefunden: {db_path}")
+        return
+
+    try:
+        counts = export_database(db_path, out_dir, args.format)
+    except sqlite3.Error as e:
+        print(f"\n❌ Fehlgeschlagen: {e}")
+        return
+    if counts is None:
+        return
+
+    if args.xlsx_dir:
+        print(f"\n📄 XLSX-Dateien: {args.xlsx_dir}")
+        export_workbooks(args.xlsx_dir, out_dir, args.format, jobs=args.jobs)
+
+    if args.compare:
+        compare_scan(db_path, out_dir, args.format)
+
+    print(f"\n✅ Export nach {out_dir}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Kompaktes Datenbank-Schema
+Erstellt aus einer bestehenden Datenbank eine kompakte Kopie mit
+Publikations-Dimension, ganzzahligen Datumswerten und einer nach
+(product_id, valid_from) geclusterten WITHOUT ROWID Preistabelle
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+from db_diagnose_fix import get_db_path, create_db_meta_table, refresh_db_meta
+
+
+def build_compact_database(source_path, target_path):
+    """
+    Erstellt die kompakte Kopie einer Datenbank.
+
+    Die Kopie enthält alle übrigen Tabellen unverändert. prices wird ersetzt
+    durch:
+    - publications: eine Zeile pro Quelldatei (Datum, SHA-256 aus import_manifest)
+    - prices_compact: WITHOUT ROWID, Primärschlüssel (product_id, valid_from),
+      Datumswerte als Tage seit 1970-01-01, Quelldatei als publication_id
+    - View prices mit den bisherigen Spalten, damit die App unverändert lesen kann
+
+    Die Kopie ist für lesenden Zugriff gedacht; importiert wird weiterhin in
+    die normale Datenbank und die Kopie danach neu erstellt.
+
+    Args:
+        source_path (str): Bestehende Datenbank
+        target_path (str): Zieldatei (darf noch nicht existieren)
+
+    Returns:
+        dict: Anzahl Preiszeilen vorher/nachher
+    """
+    if os.path.exists(target_path):
+        raise FileExistsError(f"Zieldatei existiert bereits: {target_path}")
+
+    print("  ├─ Kopiere Datenbank (VACUUM INTO)")
+    source = sqlite3.connect(source_path)
+    source.execute("VACUUM INTO ?", (target_path,))
+    source.close()
+
+    conn = sqlite3.connect(target_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Erstelle Tabelle: publications")
+        cursor.execute("""
+            CREATE TABLE publications (
+                id INTEGER PRIMARY KEY,
+                source_file TEXT UNIQUE,
+                valid_from INTEGER,
+                sha256 TEXT
+            )
+        """)
+
+        has_manifest = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'import_manifest'"
+        ).fetchone()
+        sha256_column = (
+            "(SELECT m.sha256 FROM import_manifest m WHERE m.filename = p.source_file "
+            "ORDER BY m.imported_at DESC LIMIT 1)"
+            if has_manifest else "NULL"
+        )
+        cursor.execute(f"""
+            INSERT INTO publications (source_file, valid_from, sha256)
+            SELECT p.source_file,
+                   MIN(CAST(strftime('%s', p.valid_from) AS INTEGER) / 86400),
+                   {sha256_column}
+            FROM prices p
+            GROUP BY p.source_file
+            ORDER BY MIN(p.valid_from), p.source_file
+        """)
+
+        print("  ├─ Erstelle Tabelle: prices_compact (WITHOUT ROWID)")
+        cursor.execute("""
+            CREATE TABLE prices_compact (
+                product_id INTEGER NOT NULL,
+                valid_from INTEGER NOT NULL,
+                valid_until INTEGER,
+                price REAL NOT NULL,
+                publication_id INTEGER REFERENCES publications(id),
+                is_current INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (product_id, valid_from)
+            ) WITHOUT ROWID
+        """)
+
+        # Mehrere Zeilen pro Produkt und Datum (erneuter Import derselben
+        # Datei): die zuletzt importierte Zeile gewinnt
+        cursor.execute("""
+            INSERT OR REPLACE INTO prices_compact (
+                product_id, valid_from, valid_until, price, publication_id, is_current
+            )
+            SELECT p.product_id,
+                   CAST(strftime('%s', p.valid_from) AS INTEGER) / 86400,
+                   CAST(strftime('%s', p.valid_until) AS INTEGER) / 86400,
+                   p.price,
+                   pub.id,
+                   p.is_current
+            FROM prices p
+            LEFT JOIN publications pub ON pub.source_file = p.source_file
+            ORDER BY p.id
+        """)
+
+        before = cursor.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        after = cursor.execute("SELECT COUNT(*) FROM prices_compact").fetchone()[0]
+
+        print("  ├─ Ersetze Tabelle prices durch View")
+        cursor.execute("DROP TABLE prices")
+        # Quelldatei als Unterabfrage statt Join: so bleibt die View eine
+        # Einzeltabellen-View, die SQLite auch in LEFT JOINs auflöst
+        cursor.execute("""
+            CREATE VIEW prices AS
+            SELECT pc.product_id,
+                   pc.price,
+                   date(pc.valid_from * 86400, 'unixepoch') AS valid_from,
+                   date(pc.valid_until * 86400, 'unixepoch') AS valid_until,
+                   (SELECT pub.source_file FROM publications pub
+                    WHERE pub.id = pc.publication_id) AS source_file,
+                   pc.is_current
+            FROM prices_compact pc
+        """)
+
+        # Dashboard-Kennzahlen, damit die App nicht über die View zählt
+        create_db_meta_table(cursor)
+        refresh_db_meta(cursor)
+
+        conn.commit()
+
+    except sqlite3.Error:
+        conn.rollback()
+        conn.close()
+        os.remove(target_path)
+        raise
+
+    print("  └─ Gebe Speicherplatz frei (VACUUM)")
+    conn.execute("VACUUM")
+    conn.close()
+
+    return {'before': before, 'after': after}
+
+
+def measure_queries(db_path, product_ids, repeat=3):
+    """
+    Misst typische Abfragen der App (beste von mehreren Runden).
+
+    Args:
+        db_path (str): Datenbank
+        product_ids (list): Produkt-IDs für Verlauf und aktuellen Preis
+        repeat (int): Anzahl Runden
+
+    Returns:
+        dict: Abfrage → Millisekunden pro Ausführung
+    """
+    queries = {
+        'Preisverlauf': """
+            SELECT price, valid_from, source_file
+            FROM prices
+            WHERE product_id = ?
+            ORDER BY valid_from ASC
+        """,
+        'Aktueller Preis': """
+            SELECT p.product_number, pr.price, pr.valid_from
+            FROM products p
+            LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+            WHERE p.id = ?
+        """,
+    }
+
+    conn = sqlite3.connect(db_path)
+    results = {}
+    for name, sql in queries.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for product_id in product_ids:
+                conn.execute(sql, (product_id,)).fetchall()
+            elapsed = (time.perf_counter() - start) / len(product_ids)
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best * 1000
+    conn.close()
+    return results
+
+
+def print_comparison(source_path, target_path, sample_size=2000):
+    """
+    Vergleicht Dateigröße und Abfragezeiten beider Datenbanken.
+
+    Args:
+        source_path (str): Bestehende Datenbank
+        target_path (str): Kompakte Kopie
+        sample_size (int): Anzahl zufälliger Produkte für die Messung
+    """
+    conn = sqlite3.connect(source_path)
+    product_ids = [row[0] for row in conn.execute("SELECT id FROM products")]
+    conn.close()
+    product_ids = random.Random(42).sample(product_ids, min(sample_size, len(product_ids)))
+
+    source_size = os.path.getsize(source_path)
+    target_size = os.path.getsize(target_path)
+    source_times = measure_queries(source_path, product_ids)
+    target_times = measure_queries(target_path, product_ids)
+
+    print("\n" + "="*70)
+    print("📊 VERGLEICH")
+    print("="*70)
+    print(f"{'':<20} {'Bestehend':>15} {'Kompakt':>15}")
+    print(f"{'Dateigröße (MB)':<20} {source_size / 1024 / 1024:>15.1f} "
+          f"{target_size / 1024 / 1024:>15.1f}")
+    for name in source_times:
+        print(f"{name + ' (ms)':<20} {source_times[name]:>15.4f} {target_times[name]:>15.4f}")
+    print("="*70)
+
+
+def main():
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description="Kompakte Kopie der Datenbank erstellen")
+    parser.add_argument('--db', dest='db_path', help="Quell-Datenbank (Standard: Config)")
+    parser.add_argument('--out', dest='target_path',
+                        help="Zieldatei (Standard: <db>_compact.db)")
+    args = parser.parse_args()
+
+    source_path = args.db_path or get_db_path()
+    target_path = args.target_path or f"{os.path.splitext(source_path)[0]}_compact.db"
+
+    print("\n" + "="*70)
+    print("🗜️  KOMPAKTES SCHEMA")
+    print("="*70)
+    print(f"Quelle: {source_path}")
+    print(f"Ziel:   {target_path}\n")
+
+    if not os.path.exists(source_path):
+        print(f"❌ Datenbank nicht gefunden: {source_path}")
+        return
+
+    try:
+        counts = build_compact_database(source_path, target_path)
+    except (sqlite3.Error, FileExistsError) as e:
+        print(f"\n❌ Fehlgeschlagen: {e}")
+        return
+
+    print(f"\n📊 Preiszeilen: {counts['before']:,} → {counts['after']:,}")
+    print_comparison(source_path, target_path)
+    print(f"\n💡 Für die App DB_PATH auf {target_path} setzen (nur lesend)\n")
+
+
+if __name__ == "__main__":
+    main()
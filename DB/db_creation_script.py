@@ -51,6 +51,7 @@ def create_database(db_path='publications.db'):
             description TEXT,
             category TEXT,
             unit TEXT,
+            gtin TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -66,6 +67,11 @@ def create_database(db_path='publications.db'):
         CREATE INDEX idx_products_category ON products(category)
         ''')
         
+        # Index für exakte GTIN-Suchen
+        cursor.execute('''
+        CREATE INDEX idx_products_gtin ON products(gtin)
+        ''')
+        
         print("  │  ✓ Tabelle 'products' erstellt")
         print("  │  ✓ Indizes erstellt")
         
@@ -89,12 +95,14 @@ def create_database(db_path='publications.db'):
         ''')
         
         # Indizes für Performance
+        # Preisverlauf eines Produkts sortiert und ohne Tabellenzugriff
         cursor.execute('''
-        CREATE INDEX idx_prices_product_id ON prices(product_id)
+        CREATE INDEX idx_prices_product_history ON prices(product_id, valid_from, price)
         ''')
         
+        # Höchstens ein aktueller Preis pro Produkt
         cursor.execute('''
-        CREATE INDEX idx_prices_current ON prices(is_current)
+        CREATE UNIQUE INDEX idx_prices_current_product ON prices(product_id) WHERE is_current = 1
         ''')
         
         cursor.execute('''
@@ -104,6 +112,160 @@ def create_database(db_path='publications.db'):
         print("  │  ✓ Tabelle 'prices' erstellt")
         print("  │  ✓ Indizes erstellt")
         
+        # =====================================================================
+        # Tabelle: import_manifest
+        # =====================================================================
+        print("  ├─ Erstelle Tabelle: import_manifest")
+        
+        cursor.execute('''
+        CREATE TABLE import_manifest (
+            sha256 TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime REAL NOT NULL,
+            valid_from DATE,
+            row_count INTEGER,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        # Index für den schnellen Abgleich ohne Hash-Berechnung
+        cursor.execute('''
+        CREATE INDEX idx_import_manifest_file ON import_manifest(filename, file_size, file_mtime)
+        ''')
+        
+        print("  │  ✓ Tabelle 'import_manifest' erstellt")
+        print("  │  ✓ Indizes erstellt")
+        
+        # =====================================================================
+        # Tabelle: mapping_profiles
+        # =====================================================================
+        print("  ├─ Erstelle Tabelle: mapping_profiles")
+        
+        # Spaltenzuordnung pro Header-Signatur (Positionen als JSON)
+        cursor.execute('''
+        CREATE TABLE mapping_profiles (
+            signature TEXT PRIMARY KEY,
+            profile TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            positions TEXT NOT NULL,
+            header TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        print("  │  ✓ Tabelle 'mapping_profiles' erstellt")
+        
+        # =====================================================================
+        # Tabelle: price_stats (vorberechnete Preisstatistiken pro Produkt)
+        # =====================================================================
+        print("  ├─ Erstelle Tabelle: price_stats")
+        
+        # Durchschnitt und Änderung sind berechnete Spalten
+        cursor.execute('''
+        CREATE TABLE price_stats (
+            product_id INTEGER PRIMARY KEY,
+            price_count INTEGER NOT NULL,
+            price_sum REAL NOT NULL,
+            min_price REAL NOT NULL,
+            max_price REAL NOT NULL,
+            first_price REAL NOT NULL,
+            first_valid_from DATE NOT NULL,
+            current_price REAL NOT NULL,
+            current_valid_from DATE NOT NULL,
+            last_change_date DATE NOT NULL,
+            avg_price REAL GENERATED ALWAYS AS (price_sum / price_count) VIRTUAL,
+            price_change REAL GENERATED ALWAYS AS (current_price - first_price) VIRTUAL,
+            change_percent REAL GENERATED ALWAYS AS (
+                CASE WHEN first_price > 0
+                     THEN (current_price - first_price) / first_price * 100
+                     ELSE 0 END
+            ) VIRTUAL,
+            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+        )
+        ''')
+        
+        print("  │  ✓ Tabelle 'price_stats' erstellt")
+        
+        # =====================================================================
+        # Tabelle: db_meta (Kennzahlen für das Dashboard, vom Importer gepflegt)
+        # =====================================================================
+        print("  ├─ Erstelle Tabelle: db_meta")
+        
+        cursor.execute('''
+        CREATE TABLE db_meta (
+            key TEXT PRIMARY KEY,
+            value,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        print("  │  ✓ Tabelle 'db_meta' erstellt")
+        
+        # =====================================================================
+        # Tabellen der Zusatz-Sheets (Publications_FR, Limitationen, Generika, ...)
+        # =====================================================================
+        print("  ├─ Erstelle Tabellen: product_texts, strings, limitations, product_flags")
+        
+        # Bezeichnung pro Sprache
+        cursor.execute('''
+        CREATE TABLE product_texts (
+            product_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            description TEXT,
+            PRIMARY KEY (product_id, language),
+            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+        )
+        ''')
+        
+        # Gemeinsamer Textspeicher: jeder Text nur einmal (string → id)
+        cursor.execute('''
+        CREATE TABLE strings (
+            id INTEGER PRIMARY KEY,
+            value TEXT NOT NULL UNIQUE
+        )
+        ''')
+        
+        # Limitationstexte (als strings.id) als Intervalle (offen = valid_until NULL)
+        cursor.execute('''
+        CREATE TABLE limitations (
+            id INTEGER PRIMARY KEY,
+            product_id INTEGER NOT NULL,
+            language TEXT NOT NULL,
+            text_id INTEGER NOT NULL,
+            valid_from DATE NOT NULL,
+            valid_until DATE,
+            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+            FOREIGN KEY (text_id) REFERENCES strings(id)
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE UNIQUE INDEX idx_limitations_current
+        ON limitations(product_id, language) WHERE valid_until IS NULL
+        ''')
+        
+        # Generikum / Selbstbehalt als Intervalle
+        cursor.execute('''
+        CREATE TABLE product_flags (
+            id INTEGER PRIMARY KEY,
+            product_id INTEGER NOT NULL,
+            is_generic INTEGER NOT NULL,
+            deductible_percent INTEGER,
+            valid_from DATE NOT NULL,
+            valid_until DATE,
+            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE UNIQUE INDEX idx_product_flags_current
+        ON product_flags(product_id) WHERE valid_until IS NULL
+        ''')
+        
+        print("  │  ✓ Tabellen 'product_texts', 'strings', 'limitations', 'product_flags' erstellt")
+        print("  │  ✓ Indizes erstellt")
+        
         # =====================================================================
         # Trigger für updated_at Timestamp
         # =====================================================================
@@ -121,6 +283,102 @@ def create_database(db_path='publications.db'):
         
         print("  │  ✓ Trigger 'update_products_timestamp' erstellt")
         
+        # =====================================================================
+        # Volltextindex für die Produktsuche
+        # =====================================================================
+        print("  ├─ Erstelle Volltextindex: products_fts")
+        
+        # Externer Content (keine Datenkopie), Umlaute/Akzente werden ignoriert
+        cursor.execute('''
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            product_number,
+            description,
+            content='products',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_fts_insert
+        AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts (rowid, product_number, description)
+            VALUES (NEW.id, NEW.product_number, NEW.description);
+        END
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_fts_delete
+        AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, product_number, description)
+            VALUES ('delete', OLD.id, OLD.product_number, OLD.description);
+        END
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_fts_update
+        AFTER UPDATE OF product_number, description ON products
+        BEGIN
+            INSERT INTO products_fts (products_fts, rowid, product_number, description)
+            VALUES ('delete', OLD.id, OLD.product_number, OLD.description);
+            INSERT INTO products_fts (rowid, product_number, description)
+            VALUES (NEW.id, NEW.product_number, NEW.description);
+        END
+        ''')
+        
+        print("  │  ✓ Volltextindex 'products_fts' erstellt")
+        print("  │  ✓ Sync-Trigger erstellt")
+        
+        # =====================================================================
+        # Trigram-Index für Teilstring-Suche in Produktnummer und GTIN
+        # =====================================================================
+        print("  ├─ Erstelle Trigram-Index: products_trigram")
+        
+        cursor.execute('''
+        CREATE VIRTUAL TABLE products_trigram USING fts5(
+            product_number,
+            gtin,
+            content='products',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_trigram_insert
+        AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_trigram (rowid, product_number, gtin)
+            VALUES (NEW.id, NEW.product_number, NEW.gtin);
+        END
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_trigram_delete
+        AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_trigram (products_trigram, rowid, product_number, gtin)
+            VALUES ('delete', OLD.id, OLD.product_number, OLD.gtin);
+        END
+        ''')
+        
+        cursor.execute('''
+        CREATE TRIGGER products_trigram_update
+        AFTER UPDATE OF product_number, gtin ON products
+        BEGIN
+            INSERT INTO products_trigram (products_trigram, rowid, product_number, gtin)
+            VALUES ('delete', OLD.id, OLD.product_number, OLD.gtin);
+            INSERT INTO products_trigram (rowid, product_number, gtin)
+            VALUES (NEW.id, NEW.product_number, NEW.gtin);
+        END
+        ''')
+        
+        print("  │  ✓ Trigram-Index 'products_trigram' erstellt")
+        print("  │  ✓ Sync-Trigger erstellt")
+        
         # =====================================================================
         # Commit und Abschluss
         # =====================================================================
@@ -91,7 +91,9 @@ def check_database(db_path):
             result['errors'].append("Datenbank enthält keine Tabellen")
         
         # Prüfe erwartete Tabellen
-        expected_tables = ['products', 'prices']
+        expected_tables = ['products', 'prices', 'import_manifest', 'mapping_profiles',
+                           'price_stats', 'db_meta', 'product_texts', 'strings',
+                           'limitations', 'product_flags']
         missing_tables = [t for t in expected_tables if t not in tables]
         
         if missing_tables:
@@ -118,6 +120,473 @@ def check_database(db_path):
     return result
 
 
+def create_search_index(cursor):
+    """
+    Erstellt den FTS5-Volltextindex über products inkl. Sync-Trigger.
+    
+    Der Index speichert keine eigenen Daten (content='products') und wird
+    über Trigger bei jeder Änderung an Produktnummer oder Beschreibung
+    nachgeführt. unicode61 mit remove_diacritics 2 findet 'Lösung' auch
+    mit 'losung', die Präfix-Indizes beschleunigen Suchen während der Eingabe.
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        product_number,
+        description,
+        content='products',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert
+    AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_fts (rowid, product_number, description)
+        VALUES (NEW.id, NEW.product_number, NEW.description);
+    END
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete
+    AFTER DELETE ON products
+    BEGIN
+        INSERT INTO products_fts (products_fts, rowid, product_number, description)
+        VALUES ('delete', OLD.id, OLD.product_number, OLD.description);
+    END
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF product_number, description ON products
+    BEGIN
+        INSERT INTO products_fts (products_fts, rowid, product_number, description)
+        VALUES ('delete', OLD.id, OLD.product_number, OLD.description);
+        INSERT INTO products_fts (rowid, product_number, description)
+        VALUES (NEW.id, NEW.product_number, NEW.description);
+    END
+    ''')
+
+
+def create_gtin_column(cursor):
+    """
+    Ergänzt in älteren Datenbanken die Spalte products.gtin samt B-Tree-Index
+    für exakte GTIN-Suchen.
+    
+    Args:
+        cursor: SQLite Cursor
+    
+    Returns:
+        bool: True, wenn die Spalte neu angelegt wurde
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(products)")]
+    added = 'gtin' not in columns
+    if added:
+        cursor.execute("ALTER TABLE products ADD COLUMN gtin TEXT")
+    
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_products_gtin ON products(gtin)
+    ''')
+    return added
+
+
+def create_number_index(cursor):
+    """
+    Erstellt den Trigram-Index über Produktnummer und GTIN inkl. Sync-Trigger.
+    
+    Der FTS5 trigram-Tokenizer erlaubt Teilstring-Suchen (z.B. '5366201'
+    innerhalb von '7680536620137') über den Index statt per LIKE-Scan.
+    Fehlt in älteren Datenbanken die Spalte products.gtin, wird sie ergänzt
+    (create_gtin_column).
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    create_gtin_column(cursor)
+    
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_trigram USING fts5(
+        product_number,
+        gtin,
+        content='products',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_trigram_insert
+    AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_trigram (rowid, product_number, gtin)
+        VALUES (NEW.id, NEW.product_number, NEW.gtin);
+    END
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_trigram_delete
+    AFTER DELETE ON products
+    BEGIN
+        INSERT INTO products_trigram (products_trigram, rowid, product_number, gtin)
+        VALUES ('delete', OLD.id, OLD.product_number, OLD.gtin);
+    END
+    ''')
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS products_trigram_update
+    AFTER UPDATE OF product_number, gtin ON products
+    BEGIN
+        INSERT INTO products_trigram (products_trigram, rowid, product_number, gtin)
+        VALUES ('delete', OLD.id, OLD.product_number, OLD.gtin);
+        INSERT INTO products_trigram (rowid, product_number, gtin)
+        VALUES (NEW.id, NEW.product_number, NEW.gtin);
+    END
+    ''')
+
+
+def create_price_stats_table(cursor):
+    """
+    Erstellt die Tabelle price_stats mit vorberechneten Preisstatistiken.
+    
+    Pro Produkt werden Anzahl, Summe, Min/Max sowie erster und aktueller
+    Preis gespeichert; Durchschnitt und Änderung sind berechnete Spalten.
+    Der Importer aktualisiert die Tabelle inkrementell nach jeder Datei.
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS price_stats (
+        product_id INTEGER PRIMARY KEY,
+        price_count INTEGER NOT NULL,
+        price_sum REAL NOT NULL,
+        min_price REAL NOT NULL,
+        max_price REAL NOT NULL,
+        first_price REAL NOT NULL,
+        first_valid_from DATE NOT NULL,
+        current_price REAL NOT NULL,
+        current_valid_from DATE NOT NULL,
+        last_change_date DATE NOT NULL,
+        avg_price REAL GENERATED ALWAYS AS (price_sum / price_count) VIRTUAL,
+        price_change REAL GENERATED ALWAYS AS (current_price - first_price) VIRTUAL,
+        change_percent REAL GENERATED ALWAYS AS (
+            CASE WHEN first_price > 0
+                 THEN (current_price - first_price) / first_price * 100
+                 ELSE 0 END
+        ) VIRTUAL,
+        FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+    )
+    ''')
+
+
+def rebuild_price_stats(cursor):
+    """
+    Berechnet price_stats vollständig aus der Tabelle prices neu.
+    
+    Args:
+        cursor: SQLite Cursor
+    
+    Returns:
+        int: Anzahl Produkte mit Statistik
+    """
+    cursor.execute("DELETE FROM price_stats")
+    cursor.execute('''
+    INSERT INTO price_stats (
+        product_id, price_count, price_sum, min_price, max_price,
+        first_price, first_valid_from, current_price, current_valid_from,
+        last_change_date
+    )
+    SELECT product_id,
+           COUNT(*),
+           SUM(price),
+           MIN(price),
+           MAX(price),
+           MAX(CASE WHEN first_rank = 1 THEN price END),
+           MAX(CASE WHEN first_rank = 1 THEN valid_from END),
+           MAX(CASE WHEN last_rank = 1 THEN price END),
+           MAX(CASE WHEN last_rank = 1 THEN valid_from END),
+           MAX(CASE WHEN previous_price IS NULL OR price <> previous_price
+                    THEN valid_from END)
+    FROM (
+        SELECT product_id,
+               price,
+               valid_from,
+               ROW_NUMBER() OVER (
+                   PARTITION BY product_id ORDER BY valid_from, id
+               ) AS first_rank,
+               ROW_NUMBER() OVER (
+                   PARTITION BY product_id ORDER BY valid_from DESC, id DESC
+               ) AS last_rank,
+               LAG(price) OVER (
+                   PARTITION BY product_id ORDER BY valid_from, id
+               ) AS previous_price
+        FROM prices
+    )
+    GROUP BY product_id
+    ''')
+    return cursor.rowcount
+
+
+def create_db_meta_table(cursor):
+    """
+    Erstellt die Schlüssel/Wert-Tabelle db_meta für Dashboard-Kennzahlen.
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS db_meta (
+        key TEXT PRIMARY KEY,
+        value,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def refresh_db_meta(cursor, bump_generation=False):
+    """
+    Schreibt die Kennzahlen (Anzahl Produkte/Preise, neuestes Datum) in db_meta.
+    
+    Das neueste Datum ist das der zuletzt publizierten importierten Datei
+    (import_manifest). Im Intervall-Modus (--change-only) schreibt eine
+    Publikation ohne Preisänderung keine neue Preiszeile, MAX(valid_from)
+    aus prices bliebe dann auf der vorherigen Publikation stehen. Fehlt
+    import_manifest (ältere Datenbanken), zählt nur prices.
+    
+    Args:
+        cursor: SQLite Cursor
+        bump_generation (bool): import_generation um 1 erhöhen (nach einem Import)
+    
+    Returns:
+        dict: Geschriebene Kennzahlen
+    """
+    meta = {
+        'product_count': cursor.execute("SELECT COUNT(*) FROM products").fetchone()[0],
+        'price_count': cursor.execute("SELECT COUNT(*) FROM prices").fetchone()[0],
+        'latest_date': cursor.execute("SELECT MAX(valid_from) FROM prices").fetchone()[0],
+    }
+    
+    try:
+        published = cursor.execute("SELECT MAX(valid_from) FROM import_manifest").fetchone()[0]
+    except sqlite3.OperationalError:
+        published = None
+    if published and (meta['latest_date'] is None or published > meta['latest_date']):
+        meta['latest_date'] = published
+    
+    cursor.executemany('''
+    INSERT INTO db_meta (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+    ''', meta.items())
+    
+    cursor.execute(f'''
+    INSERT INTO db_meta (key, value) VALUES ('import_generation', {int(bump_generation)})
+    ON CONFLICT(key) DO UPDATE SET value = value + {int(bump_generation)}, updated_at = CURRENT_TIMESTAMP
+    ''')
+    
+    return meta
+
+
+# Speichermodus der Preise (db_meta price_mode): eine Zeile pro Publikation
+# und Produkt oder Intervalle mit neuer Zeile nur bei Preisänderung
+PRICE_MODE_PUBLICATION = 'publication'
+PRICE_MODE_CHANGE_ONLY = 'change_only'
+
+
+def get_price_mode(cursor):
+    """
+    Liefert den Speichermodus der Preise.
+    
+    Der Modus steht in db_meta (price_mode). Ältere Datenbanken ohne
+    Eintrag werden anhand der Daten eingeordnet: Nur der Modus pro
+    Publikation schreibt aufeinanderfolgende Zeilen eines Produkts mit
+    gleichem Preis. Mit höchstens einer Publikation sind beide Modi gleich.
+    
+    Args:
+        cursor: SQLite Cursor
+    
+    Returns:
+        str: PRICE_MODE_PUBLICATION, PRICE_MODE_CHANGE_ONLY oder None (noch offen)
+    """
+    try:
+        row = cursor.execute("SELECT value FROM db_meta WHERE key = 'price_mode'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row:
+        return row[0]
+    
+    publications = cursor.execute(
+        "SELECT COUNT(*) FROM (SELECT DISTINCT valid_from FROM prices LIMIT 2)"
+    ).fetchone()[0]
+    if publications < 2:
+        return None
+    
+    repeated = cursor.execute('''
+    SELECT 1
+    FROM prices a
+    JOIN prices b ON b.product_id = a.product_id
+                 AND b.valid_from = a.valid_until
+                 AND b.price = a.price
+    LIMIT 1
+    ''').fetchone()
+    return PRICE_MODE_PUBLICATION if repeated else PRICE_MODE_CHANGE_ONLY
+
+
+def set_price_mode(cursor, mode):
+    """
+    Vermerkt den Speichermodus der Preise in db_meta.
+    
+    Args:
+        cursor: SQLite Cursor
+        mode (str): PRICE_MODE_PUBLICATION oder PRICE_MODE_CHANGE_ONLY
+    """
+    cursor.execute('''
+    INSERT INTO db_meta (key, value) VALUES ('price_mode', ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+    ''', (mode,))
+
+
+def create_price_indexes(cursor):
+    """
+    Erstellt die auf die Abfragen der App abgestimmten Indizes auf prices.
+    
+    - idx_prices_product_history (product_id, valid_from, price): Preisverlauf
+      eines Produkts sortiert aus dem Index, Preis ohne Tabellenzugriff
+    - idx_prices_current_product (product_id) WHERE is_current = 1: eindeutiger
+      Teilindex für den aktuellen Preis eines Produkts
+    
+    Die wenig selektiven Indizes auf is_current und product_id (durch den
+    Verlaufsindex abgedeckt) werden entfernt. Mehrfach als aktuell markierte
+    Preise eines Produkts werden vorher bereinigt, sonst scheitert der
+    eindeutige Index.
+    
+    Args:
+        cursor: SQLite Cursor
+    
+    Returns:
+        int: Anzahl bereinigter Preiszeilen
+    """
+    cursor.execute('''
+    UPDATE prices
+    SET is_current = 0
+    WHERE is_current = 1
+      AND id <> (
+          SELECT c.id FROM prices c
+          WHERE c.product_id = prices.product_id AND c.is_current = 1
+          ORDER BY c.valid_from DESC, c.id DESC
+          LIMIT 1
+      )
+    ''')
+    repaired = cursor.rowcount
+    
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_prices_product_history ON prices(product_id, valid_from, price)
+    ''')
+    
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_prices_current_product ON prices(product_id) WHERE is_current = 1
+    ''')
+    
+    cursor.execute("DROP INDEX IF EXISTS idx_prices_current")
+    cursor.execute("DROP INDEX IF EXISTS idx_prices_product_id")
+    
+    return repaired
+
+
+def create_mapping_profiles_table(cursor):
+    """
+    Erstellt die Tabelle mapping_profiles.
+    
+    Speichert pro Header-Signatur (Spaltennamen ohne Datumsangaben) die
+    erkannte Spaltenzuordnung als Positionen, damit Dateien mit bekannter
+    Kopfzeile ohne erneute Erkennung importiert werden.
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS mapping_profiles (
+        signature TEXT PRIMARY KEY,
+        profile TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        positions TEXT NOT NULL,
+        header TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def create_sheet_tables(cursor):
+    """
+    Erstellt die Tabellen für die Zusatz-Sheets der Publikationsdateien.
+    
+    - product_texts: Bezeichnung pro Sprache (Publications_FR)
+    - strings: Gemeinsamer Textspeicher, jeder Text nur einmal (string → id)
+    - limitations: Limitationstext (als strings.id) pro Produkt und Sprache als
+      Intervall (Limitationen, Limitations_FR); offenes Intervall = valid_until NULL
+    - product_flags: Generikum und Selbstbehalt in Prozent als Intervall
+      (Generika, Packungen_xx%SB)
+    
+    Args:
+        cursor: SQLite Cursor
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS product_texts (
+        product_id INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        description TEXT,
+        PRIMARY KEY (product_id, language),
+        FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS strings (
+        id INTEGER PRIMARY KEY,
+        value TEXT NOT NULL UNIQUE
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS limitations (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        text_id INTEGER NOT NULL,
+        valid_from DATE NOT NULL,
+        valid_until DATE,
+        FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+        FOREIGN KEY (text_id) REFERENCES strings(id)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_limitations_current
+    ON limitations(product_id, language) WHERE valid_until IS NULL
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS product_flags (
+        id INTEGER PRIMARY KEY,
+        product_id INTEGER NOT NULL,
+        is_generic INTEGER NOT NULL,
+        deductible_percent INTEGER,
+        valid_from DATE NOT NULL,
+        valid_until DATE,
+        FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_product_flags_current
+    ON product_flags(product_id) WHERE valid_until IS NULL
+    ''')
+
+
 def create_tables(db_path):
     """
     Erstellt die notwendigen Tabellen.
@@ -140,6 +609,7 @@ def create_tables(db_path):
             description TEXT,
             category TEXT,
             unit TEXT,
+            gtin TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -169,18 +639,53 @@ def create_tables(db_path):
         )
         ''')
         
+        create_price_indexes(cursor)
+        
         cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_prices_product_id ON prices(product_id)
+        CREATE INDEX IF NOT EXISTS idx_prices_valid_from ON prices(valid_from)
         ''')
         
+        # Tabelle: import_manifest
+        print("  📋 Erstelle Tabelle: import_manifest")
         cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_prices_current ON prices(is_current)
+        CREATE TABLE IF NOT EXISTS import_manifest (
+            sha256 TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime REAL NOT NULL,
+            valid_from DATE,
+            row_count INTEGER,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
         ''')
         
         cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_prices_valid_from ON prices(valid_from)
+        CREATE INDEX IF NOT EXISTS idx_import_manifest_file ON import_manifest(filename, file_size, file_mtime)
         ''')
         
+        # Tabelle: mapping_profiles
+        print("  📋 Erstelle Tabelle: mapping_profiles")
+        create_mapping_profiles_table(cursor)
+        
+        # Tabelle: price_stats
+        print("  📋 Erstelle Tabelle: price_stats")
+        create_price_stats_table(cursor)
+        
+        # Tabelle: db_meta
+        print("  📋 Erstelle Tabelle: db_meta")
+        create_db_meta_table(cursor)
+        
+        # Tabellen der Zusatz-Sheets
+        print("  📋 Erstelle Tabellen: product_texts, strings, limitations, product_flags")
+        create_sheet_tables(cursor)
+        
+        # Volltextindex
+        print("  🔎 Erstelle Volltextindex: products_fts")
+        create_search_index(cursor)
+        
+        print("  🔢 Erstelle Trigram-Index: products_trigram")
+        create_number_index(cursor)
+        
         # Trigger
         print("  ⚙️  Erstelle Trigger")
         cursor.execute('''
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Datenbank Migrations-Script
+Führt Schema- und Daten-Migrationen auf einer bestehenden Datenbank aus
+"""
+
+import argparse
+import os
+import sqlite3
+
+from db_diagnose_fix import (
+    get_db_path, backup_database, create_search_index, create_number_index,
+    create_price_stats_table, rebuild_price_stats, create_db_meta_table, refresh_db_meta,
+    create_price_indexes
+)
+from mapping_profiles import SWISSMEDIC_LISTS, clear_swissmedic_units
+
+
+def analyze(cursor):
+    """
+    Aktualisiert die Statistiken für den Query-Planer (ANALYZE).
+
+    Solange products.gtin leer ist (Datenbank noch nicht mit GTIN
+    importiert), würde ANALYZE idx_products_gtin als völlig unselektiv
+    vermerken und der Planer die Nummernsuche über einen Index-Scan
+    führen. Dann wird ANALYZE ausgelassen, bis ein Import die GTINs
+    geschrieben hat, und eine solche ältere Statistik entfernt.
+
+    Args:
+        cursor: SQLite Cursor
+
+    Returns:
+        bool: True wenn ANALYZE ausgeführt wurde
+    """
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(products)")]
+    if 'gtin' in columns and not cursor.execute(
+        "SELECT 1 FROM products WHERE gtin IS NOT NULL LIMIT 1"
+    ).fetchone():
+        has_stats = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        if has_stats:
+            cursor.execute("DELETE FROM sqlite_stat1 WHERE idx = 'idx_products_gtin'")
+        print("  ├─ ANALYZE übersprungen: products.gtin ist noch leer "
+              "(nach dem nächsten Import tune-price-indexes ausführen)")
+        return False
+
+    print("  ├─ Aktualisiere Statistiken für den Query-Planer (ANALYZE)")
+    cursor.execute("ANALYZE")
+    return True
+
+
+def compact_price_history(db_path):
+    """
+    Fasst die Preishistorie zu Preisintervallen zusammen.
+
+    Aufeinanderfolgende Preiszeilen eines Produkts mit identischem Preis
+    werden auf die erste Zeile reduziert. Danach wird valid_until jeder
+    Zeile auf den Beginn des nächsten Intervalls gesetzt und nur das letzte
+    Intervall pro Produkt als aktuell markiert. Das entspricht dem Stand,
+    den der Import mit --change-only erzeugt.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+
+    Returns:
+        dict: Anzahl Preiszeilen vorher/nachher
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        before = cursor.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        print(f"  📊 Preiszeilen vorher: {before:,}")
+
+        print("  ├─ Entferne unveränderte Folgepreise")
+        cursor.execute("""
+            DELETE FROM prices
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id,
+                           price,
+                           LAG(price) OVER (
+                               PARTITION BY product_id ORDER BY valid_from, id
+                           ) AS previous_price
+                    FROM prices
+                )
+                WHERE price = previous_price
+            )
+        """)
+
+        print("  ├─ Setze Intervallgrenzen neu")
+        cursor.execute("""
+            CREATE TEMP TABLE price_interval_ends (
+                id INTEGER PRIMARY KEY,
+                next_valid_from DATE
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO price_interval_ends (id, next_valid_from)
+            SELECT id,
+                   LEAD(valid_from) OVER (
+                       PARTITION BY product_id ORDER BY valid_from, id
+                   )
+            FROM prices
+        """)
+        cursor.execute("""
+            UPDATE prices
+            SET valid_until = (
+                    SELECT next_valid_from FROM price_interval_ends e WHERE e.id = prices.id
+                ),
+                is_current = (
+                    SELECT next_valid_from IS NULL FROM price_interval_ends e WHERE e.id = prices.id
+                )
+        """)
+        cursor.execute("DROP TABLE price_interval_ends")
+
+        print("  ├─ Berechne Preisstatistiken neu")
+        create_price_stats_table(cursor)
+        rebuild_price_stats(cursor)
+        create_db_meta_table(cursor)
+        refresh_db_meta(cursor)
+
+        conn.commit()
+
+        after = cursor.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        print(f"  📊 Preiszeilen nachher: {after:,}")
+
+    except sqlite3.Error:
+        conn.rollback()
+        conn.close()
+        raise
+
+    print("  └─ Gebe Speicherplatz frei (VACUUM)")
+    conn.execute("VACUUM")
+    conn.close()
+
+    return {'before': before, 'after': after}
+
+
+def add_search_index(db_path):
+    """
+    Legt den FTS5-Volltextindex products_fts an und füllt ihn aus products.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Erstelle products_fts und Sync-Trigger")
+        create_search_index(cursor)
+
+        print("  ├─ Baue Index aus products auf")
+        cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+        conn.commit()
+
+        count = cursor.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        print(f"  └─ {count:,} Produkte indexiert")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def add_number_index(db_path):
+    """
+    Ergänzt products.gtin und legt den Trigram-Index products_trigram an.
+
+    GTINs bestehender Produkte werden erst beim nächsten Import gefüllt
+    (bei bereits importierter neuester Datei mit --force).
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Erstelle products_trigram und Sync-Trigger")
+        create_number_index(cursor)
+
+        print("  ├─ Baue Index aus products auf")
+        cursor.execute("INSERT INTO products_trigram (products_trigram) VALUES ('rebuild')")
+        conn.commit()
+
+        count, with_gtin = cursor.execute(
+            "SELECT COUNT(*), COUNT(gtin) FROM products"
+        ).fetchone()
+        print(f"  └─ {count:,} Produkte indexiert ({with_gtin:,} mit GTIN)")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def refresh_price_stats(db_path):
+    """
+    Legt price_stats an (falls nötig) und berechnet sie aus prices neu.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Erstelle price_stats")
+        create_price_stats_table(cursor)
+
+        print("  ├─ Berechne Statistiken aus prices")
+        count = rebuild_price_stats(cursor)
+        conn.commit()
+
+        print(f"  └─ {count:,} Produkte mit Statistik")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def refresh_dashboard_meta(db_path):
+    """
+    Legt db_meta an (falls nötig) und schreibt die Dashboard-Kennzahlen neu.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Erstelle db_meta")
+        create_db_meta_table(cursor)
+
+        print("  ├─ Zähle Produkte und Preise")
+        meta = refresh_db_meta(cursor)
+        conn.commit()
+
+        for key, value in meta.items():
+            print(f"  │  • {key}: {value}")
+        print("  └─ Kennzahlen gespeichert")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def tune_price_indexes(db_path):
+    """
+    Ersetzt die Einzelspalten-Indizes auf prices durch den Verlaufsindex
+    und den eindeutigen Teilindex für aktuelle Preise.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        print("  ├─ Bereinige mehrfach aktuelle Preise und erstelle Indizes")
+        repaired = create_price_indexes(cursor)
+        if repaired:
+            print(f"  │  • {repaired:,} Preiszeilen nicht mehr als aktuell markiert")
+
+        analyze(cursor)
+        conn.commit()
+
+        print("  └─ Indizes auf prices:")
+        for (name,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'prices' ORDER BY name"
+        ):
+            print(f"     • {name}")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+
+def normalize_product_keys(db_path):
+    """
+    Entfernt die Endung '.0' aus Produktnummern und GTINs.
+
+    Ältere Importe haben Nummern über pandas als float gelesen und als
+    '53662013.0' gespeichert. Existiert die bereinigte Nummer bereits (Import
+    nach der Korrektur), wird das alte Produkt in das neue zusammengeführt:
+    Preise an Stichtagen, die das neue Produkt nicht hat, werden übernommen,
+    die Intervallgrenzen neu gesetzt und das alte Produkt gelöscht. Sonst
+    wird die Nummer umbenannt.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+
+    Returns:
+        dict: Anzahl umbenannter und zusammengeführter Produkte
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        tables = {row[0] for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(products)")]
+
+        print("  ├─ Suche Produktnummern mit Endung '.0'")
+        cursor.execute("""
+            CREATE TEMP TABLE key_fixes (
+                old_id INTEGER PRIMARY KEY,
+                product_number TEXT NOT NULL,
+                new_id INTEGER
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO key_fixes (old_id, product_number, new_id)
+            SELECT p.id AS old_id,
+                   substr(p.product_number, 1, length(p.product_number) - 2) AS product_number,
+                   n.id AS new_id
+            FROM products p
+            LEFT JOIN products n
+                   ON n.product_number = substr(p.product_number, 1, length(p.product_number) - 2)
+            WHERE p.product_number GLOB '[0-9]*.0'
+              AND substr(p.product_number, 1, length(p.product_number) - 2) NOT GLOB '*[^0-9]*'
+        """)
+        renamed, merged = cursor.execute(
+            "SELECT COUNT(*) - COUNT(new_id), COUNT(new_id) FROM key_fixes"
+        ).fetchone()
+        print(f"  │  • {renamed:,} umbenennen, {merged:,} zusammenführen")
+
+        if merged:
+            print("  ├─ Führe doppelte Produkte zusammen")
+            cursor.execute("""
+                CREATE TEMP TABLE key_merges (
+                    old_id INTEGER PRIMARY KEY,
+                    new_id INTEGER NOT NULL UNIQUE
+                )
+            """)
+            cursor.execute("""
+                INSERT INTO key_merges (old_id, new_id)
+                SELECT old_id, new_id FROM key_fixes WHERE new_id IS NOT NULL
+            """)
+
+            # Stichtage, die das neue Produkt schon hat, gewinnen
+            cursor.execute("""
+                DELETE FROM prices
+                WHERE product_id IN (SELECT old_id FROM key_merges)
+                  AND EXISTS (
+                      SELECT 1 FROM key_merges m
+                      JOIN prices n ON n.product_id = m.new_id
+                      WHERE m.old_id = prices.product_id
+                        AND n.valid_from = prices.valid_from
+                  )
+            """)
+            cursor.execute("""
+                UPDATE prices
+                SET is_current = 0,
+                    product_id = (SELECT new_id FROM key_merges WHERE old_id = prices.product_id)
+                WHERE product_id IN (SELECT old_id FROM key_merges)
+            """)
+
+            # Intervallgrenzen der zusammengeführten Produkte neu setzen
+            cursor.execute("""
+                CREATE TEMP TABLE merged_interval_ends (
+                    id INTEGER PRIMARY KEY,
+                    next_valid_from DATE
+                )
+            """)
+            cursor.execute("""
+                INSERT INTO merged_interval_ends (id, next_valid_from)
+                SELECT id,
+                       LEAD(valid_from) OVER (
+                           PARTITION BY product_id ORDER BY valid_from, id
+                       ) AS next_valid_from
+                FROM prices
+                WHERE product_id IN (SELECT new_id FROM key_merges)
+            """)
+            cursor.execute("""
+                UPDATE prices
+                SET valid_until = (
+                        SELECT next_valid_from FROM merged_interval_ends e WHERE e.id = prices.id
+                    ),
+                    is_current = (
+                        SELECT next_valid_from IS NULL FROM merged_interval_ends e WHERE e.id = prices.id
+                    )
+                WHERE id IN (SELECT id FROM merged_interval_ends)
+            """)
+
+            # Zusatz-Sheets: vorhandene Daten des neuen Produkts gewinnen
+            if 'product_texts' in tables:
+                cursor.execute("""
+                    INSERT OR IGNORE INTO product_texts (product_id, language, description)
+                    SELECT m.new_id, t.language, t.description
+                    FROM product_texts t
+                    JOIN key_merges m ON m.old_id = t.product_id
+                """)
+                cursor.execute(
+                    "DELETE FROM product_texts WHERE product_id IN (SELECT old_id FROM key_merges)"
+                )
+            for table in ('limitations', 'product_flags'):
+                if table in tables:
+                    cursor.execute(f"""
+                        DELETE FROM {table}
+                        WHERE product_id IN (
+                            SELECT m.old_id FROM key_merges m
+                            WHERE EXISTS (SELECT 1 FROM {table} n WHERE n.product_id = m.new_id)
+                        )
+                    """)
+                    cursor.execute(f"""
+                        UPDATE {table}
+                        SET product_id = (SELECT new_id FROM key_merges WHERE old_id = {table}.product_id)
+                        WHERE product_id IN (SELECT old_id FROM key_merges)
+                    """)
+            if 'price_stats' in tables:
+                cursor.execute(
+                    "DELETE FROM price_stats WHERE product_id IN (SELECT old_id FROM key_merges)"
+                )
+
+            cursor.execute("DELETE FROM products WHERE id IN (SELECT old_id FROM key_merges)")
+
+        print("  ├─ Bereinige Produktnummern und GTINs")
+        cursor.execute("""
+            UPDATE products
+            SET product_number = (SELECT f.product_number FROM key_fixes f WHERE f.old_id = products.id)
+            WHERE id IN (SELECT old_id FROM key_fixes WHERE new_id IS NULL)
+        """)
+        if 'gtin' in columns:
+            cursor.execute("""
+                UPDATE products
+                SET gtin = substr(gtin, 1, length(gtin) - 2)
+                WHERE gtin GLOB '[0-9]*.0'
+                  AND substr(gtin, 1, length(gtin) - 2) NOT GLOB '*[^0-9]*'
+            """)
+
+        if merged and 'price_stats' in tables:
+            print("  ├─ Berechne Preisstatistiken neu")
+            rebuild_price_stats(cursor)
+        if 'db_meta' in tables:
+            refresh_db_meta(cursor)
+
+        # Verteilung von product_number/gtin hat sich geändert
+        analyze(cursor)
+
+        conn.commit()
+        print("  └─ Produktschlüssel bereinigt")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return {'renamed': renamed, 'merged': merged}
+
+
+def remove_swissmedic_units(db_path):
+    """
+    Entfernt die Abgabekategorie (Swissmedic-Liste A–E) aus products.unit.
+
+    Das Profil bag_publications bis Version 1 hat die Spalte
+    'Swissmedic-Liste' als Einheit gespeichert. Enthält die Spalte auch
+    andere Werte, stammen die Einheiten aus einer echten Packungsspalte und
+    bleiben unverändert.
+
+    Args:
+        db_path (str): Pfad zur Datenbank
+
+    Returns:
+        int: Anzahl bereinigter Produkte
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        placeholders = ', '.join('?' * len(SWISSMEDIC_LISTS))
+        others = cursor.execute(
+            f"SELECT COUNT(*) FROM products WHERE unit IS NOT NULL AND unit <> '' "
+            f"AND unit NOT IN ({placeholders})", SWISSMEDIC_LISTS
+        ).fetchone()[0]
+        if others:
+            print(f"  └─ {others:,} Produkte mit anderer Einheit, products.unit bleibt unverändert")
+            return 0
+
+        print("  ├─ Entferne Swissmedic-Liste aus products.unit")
+        cleared = clear_swissmedic_units(cursor)
+        conn.commit()
+        print(f"  └─ Einheit bei {cleared:,} Produkten entfernt")
+
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return cleared
+
+
+MIGRATIONS = {
+    'compact-prices': (
+        compact_price_history,
+        "Preishistorie zu Intervallen zusammenfassen (nur Preisänderungen behalten)"
+    ),
+    'add-search-index': (
+        add_search_index,
+        "FTS5-Volltextindex für die Produktsuche anlegen und aufbauen"
+    ),
+    'add-number-index': (
+        add_number_index,
+        "GTIN-Spalte und Trigram-Index für Nummern-Teilstrings anlegen"
+    ),
+    'refresh-price-stats': (
+        refresh_price_stats,
+        "Vorberechnete Preisstatistiken (price_stats) neu aufbauen"
+    ),
+    'refresh-db-meta': (
+        refresh_dashboard_meta,
+        "Dashboard-Kennzahlen (db_meta) neu berechnen"
+    ),
+    'tune-price-indexes': (
+        tune_price_indexes,
+        "Verlaufs- und Teilindex für aktuelle Preise anlegen, is_current-Index entfernen"
+    ),
+    'normalize-product-keys': (
+        normalize_product_keys,
+        "Endung '.0' aus Produktnummern/GTINs entfernen und doppelte Produkte zusammenführen"
+    ),
+    'clear-swissmedic-units': (
+        remove_swissmedic_units,
+        "Abgabekategorie A–E (Swissmedic-Liste) aus products.unit entfernen"
+    ),
+}
+
+
+def main():
+    """Hauptfunktion."""
+    parser = argparse.ArgumentParser(description="Datenbank-Migrationen")
+    parser.add_argument('migration', choices=sorted(MIGRATIONS),
+                        help="Auszuführende Migration")
+    parser.add_argument('--db', dest='db_path', help="Pfad zur Datenbank")
+    parser.add_argument('--no-backup', action='store_true',
+                        help="Kein Backup vor der Migration erstellen")
+    args = parser.parse_args()
+
+    db_path = args.db_path or get_db_path()
+    migration, description = MIGRATIONS[args.migration]
+
+    print("\n" + "="*70)
+    print(f"🔄 MIGRATION: {args.migration}")
+    print("="*70)
+    print(f"{description}")
+    print(f"Datenbank: {db_path}\n")
+
+    if not os.path.exists(db_path):
+        print(f"❌ Datenbank nicht gefunden: {db_path}")
+        return
+
+    if not args.no_backup:
+        backup_database(db_path)
+
+    size_before = os.path.getsize(db_path)
+
+    try:
+        migration(db_path)
+    except sqlite3.Error as e:
+        print(f"\n❌ Migration fehlgeschlagen: {e}")
+        return
+
+    size_after = os.path.getsize(db_path)
+    print(f"\n📦 Dateigröße: {size_before:,} → {size_after:,} Bytes")
+    print("✅ Migration abgeschlossen!\n")
+
+
+if __name__ == "__main__":
+    main()
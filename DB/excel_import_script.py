@@ -1,9 +1,13 @@
 import sqlite3
-import pandas as pd
+import hashlib
 import os
 import re
 import sys
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
 
 # Füge Root-Verzeichnis zum Python-Pfad hinzu
@@ -13,23 +17,77 @@ sys.path.insert(0, str(ROOT_DIR))
 
 # Importiere zentrale Konfiguration
 from config import Config
+from db_diagnose_fix import (
+    create_price_stats_table, rebuild_price_stats, create_db_meta_table, refresh_db_meta,
+    create_sheet_tables, create_mapping_profiles_table, create_gtin_column,
+    PRICE_MODE_PUBLICATION, PRICE_MODE_CHANGE_ONLY, get_price_mode, set_price_mode
+)
+from mapping_profiles import (
+    HEURISTIC_PROFILE, HEURISTIC_VERSION, SNIFF_ROWS, header_signature, match_profile,
+    sniff_mapping, load_known_mappings, save_mapping
+)
+from string_pool import SharedStringCache, StringInterner
+from xlsx_reader import XlsxStreamReader
+
+
+# Zusatz-Sheets der Publikationsdateien: Sheet-Name → (Art, Sprache)
+EXTRA_SHEETS = {
+    'Publications_FR': ('texts', 'fr'),
+    'Limitationen': ('limitations', 'de'),
+    'Limitations_FR': ('limitations', 'fr'),
+    'Generika': ('generics', None),
+}
+
+# Packungen mit erhöhtem Selbstbehalt (20% bis 2023, danach 40%)
+DEDUCTIBLE_SHEET_PATTERN = re.compile(r'^Packungen_(\d+)%SB$')
+
+# Spaltennamen (DE/FR) für die Produktnummer und die Texte der Zusatz-Sheets
+NUMBER_COLUMNS = ('Swissmedic-Nr.', 'N° Swissmedic')
+TEXT_COLUMNS = {
+    'texts': ('Description',),
+    'limitations': ('Limitationen', 'Limitations'),
+}
+
+# Felder und weitere Spalten, die als Schlüssel (Text) gelesen werden
+KEY_FIELDS = ('product_number', 'gtin')
+KEY_COLUMNS = NUMBER_COLUMNS + ('GTIN', 'BAG-Dossier')
+
+# Shared Strings aller in diesem Prozess gelesenen Dateien (auch pro Worker)
+SHARED_STRINGS = SharedStringCache()
 
 
 class PublicationImporter:
     """Klasse für den Import von Publication Excel-Dateien"""
     
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, bulk=True, force=False, change_only=False,
+                 extra_sheets=True):
         """
         Initialisiert den Importer.
         
         Args:
             db_path (str): Pfad zur SQLite Datenbank (optional, nutzt Config)
+            bulk (bool): Mengenbasierter Import über eine Staging-Tabelle
+                         (False = zeilenweise get_or_create_product/add_price)
+            force (bool): Dateien auch dann importieren, wenn sie laut
+                          import_manifest bereits importiert wurden
+            change_only (bool): Nur bei Preisänderung ein neues Preisintervall
+                                anlegen, sonst das aktuelle weiterlaufen lassen
+            extra_sheets (bool): Zusatz-Sheets (Publications_FR, Limitationen,
+                                 Generika, Packungen_xx%SB) mit importieren
         """
         self.db_path = db_path or str(Config.DB_PATH)
+        self.bulk = bulk
+        self.force = force
+        self.change_only = change_only
+        self.price_mode = PRICE_MODE_CHANGE_ONLY if change_only else PRICE_MODE_PUBLICATION
+        self.extra_sheets = extra_sheets
         self.conn = None
         self.cursor = None
+        self.interner = None
+        self.known_mappings = {}
         self.stats = {
             'files_processed': 0,
+            'files_skipped': 0,
             'products_added': 0,
             'products_updated': 0,
             'prices_added': 0,
@@ -47,15 +105,78 @@ class PublicationImporter:
         
         self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
+        self.ensure_schema()
+        self.check_price_mode()
+        self.interner = StringInterner(self.cursor)
+        self.known_mappings = load_known_mappings(self.cursor)
         print(f"✅ Verbindung zu '{self.db_path}' hergestellt")
     
+    def ensure_schema(self):
+        """Legt vom Importer benötigte Zusatztabellen in bestehenden Datenbanken an."""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_manifest (
+                sha256 TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_mtime REAL NOT NULL,
+                valid_from DATE,
+                row_count INTEGER,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_import_manifest_file
+            ON import_manifest(filename, file_size, file_mtime)
+        """)
+        
+        # price_stats wird inkrementell gepflegt und muss daher beim
+        # erstmaligen Anlegen aus dem bestehenden Verlauf gefüllt werden
+        has_price_stats = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_stats'"
+        ).fetchone()
+        if not has_price_stats:
+            create_price_stats_table(self.cursor)
+            rebuild_price_stats(self.cursor)
+        
+        # Ältere Datenbanken (vor der Migration add-number-index) haben noch
+        # keine Spalte products.gtin, die der Import schreibt
+        if create_gtin_column(self.cursor):
+            print("ℹ️  Spalte products.gtin ergänzt")
+        
+        create_mapping_profiles_table(self.cursor)
+        
+        create_db_meta_table(self.cursor)
+        create_sheet_tables(self.cursor)
+        
+        self.conn.commit()
+    
+    def check_price_mode(self):
+        """
+        Prüft, ob --change-only zum Speichermodus der Datenbank passt.
+        
+        Ein Archiv mit Zeilen pro Publikation und Intervallen gemischt lässt
+        sich nicht mehr auswerten (price_analytics): Ob ein Produkt an einem
+        Publikationstag gelistet war, hängt vom Modus ab.
+        
+        Raises:
+            ValueError: Wenn die Datenbank im anderen Modus importiert wurde
+        """
+        stored = get_price_mode(self.cursor)
+        if stored is not None and stored != self.price_mode:
+            option = "ohne --change-only" if self.change_only else "mit --change-only"
+            raise ValueError(
+                f"Datenbank enthält Preise im Modus '{stored}', nicht '{self.price_mode}' "
+                f"(Import {option} ausführen oder neue Datenbank verwenden)"
+            )
+    
     def close(self):
         """Schließt die Datenbankverbindung."""
         if self.conn:
             self.conn.close()
             print("✅ Datenbankverbindung geschlossen")
     
-    def extract_date_from_filename(self, filename):
+    @staticmethod
+    def extract_date_from_filename(filename):
         """Extrahiert das Datum aus dem Dateinamen."""
         match = re.search(r'Publications-(\d{8})', filename)
         if match:
@@ -67,42 +188,74 @@ class PublicationImporter:
                 return None
         return None
     
-    def detect_column_mapping(self, df):
-        """Erkennt automatisch die Spalten-Zuordnung."""
-        columns = df.columns.tolist()
+    @staticmethod
+    def detect_column_mapping(columns):
+        """
+        Erkennt die Spalten-Zuordnung heuristisch anhand der Kopfzeile.
+        
+        Wird nur für Dateien ohne passendes Profil (mapping_profiles.PROFILES)
+        verwendet. Suchbegriffe müssen einem ganzen Wort des Spaltennamens
+        entsprechen (lange Begriffe auch als Wortende, z.B. 'Artikelnummer'),
+        damit kurze Begriffe wie 'nr' oder 'me' nicht in 'Gammennummer' oder
+        'Swissmedic-Liste' treffen.
+        """
+        def matches(words, terms):
+            return any(
+                word == term or (len(term) >= 5 and word.endswith(term))
+                for word in words for term in terms
+            )
+        
         mapping = {
             'product_number': None,
             'description': None,
             'category': None,
             'unit': None,
+            'gtin': None,
             'price': None
         }
         
         for col in columns:
-            col_lower = col.lower()
+            if col is None:
+                continue
+            words = re.findall(r'[^\W\d_]+', str(col).lower())
             
-            if any(term in col_lower for term in ['nummer', 'number', 'nr', 'artikel', 'item', 'sku']):
+            if matches(words, ['gtin', 'ean']):
+                if not mapping['gtin']:
+                    mapping['gtin'] = col
+            
+            elif matches(words, ['nummer', 'number', 'nr', 'artikel', 'item', 'sku']):
                 if not mapping['product_number']:
                     mapping['product_number'] = col
             
-            elif any(term in col_lower for term in ['beschreibung', 'description', 'name', 'bezeichnung']):
+            elif matches(words, ['beschreibung', 'description', 'name', 'bezeichnung']):
                 if not mapping['description']:
                     mapping['description'] = col
             
-            elif any(term in col_lower for term in ['kategorie', 'category', 'gruppe', 'group']):
+            elif matches(words, ['kategorie', 'category', 'gruppe', 'group']):
                 if not mapping['category']:
                     mapping['category'] = col
             
-            elif any(term in col_lower for term in ['einheit', 'unit', 'me', 'uom']):
+            elif matches(words, ['einheit', 'unit', 'me', 'uom']):
                 if not mapping['unit']:
                     mapping['unit'] = col
             
-            elif any(term in col_lower for term in ['preis', 'price', 'betrag', 'amount']):
+            elif matches(words, ['preis', 'price', 'betrag', 'amount']):
                 if not mapping['price']:
                     mapping['price'] = col
         
         return mapping
     
+    @staticmethod
+    def _cell_text(row, position):
+        """Liefert den Zellwert an der Position als bereinigten Text (oder None)."""
+        if position is None or position >= len(row):
+            return None
+        value = row[position]
+        if value is None:
+            return None
+        text = str(value).strip()
+        return text or None
+    
     def get_or_create_product(self, product_data):
         """Holt vorhandenes Produkt oder erstellt ein neues."""
         product_number = product_data.get('product_number')
@@ -121,12 +274,13 @@ class PublicationImporter:
             
             self.cursor.execute("""
                 UPDATE products 
-                SET description = ?, category = ?, unit = ?
+                SET description = ?, category = ?, unit = ?, gtin = ?
                 WHERE id = ?
             """, (
                 product_data.get('description'),
                 product_data.get('category'),
                 product_data.get('unit'),
+                product_data.get('gtin'),
                 product_id
             ))
             
@@ -134,31 +288,59 @@ class PublicationImporter:
             return product_id
         else:
             self.cursor.execute("""
-                INSERT INTO products (product_number, description, category, unit)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO products (product_number, description, category, unit, gtin)
+                VALUES (?, ?, ?, ?, ?)
             """, (
                 product_number,
                 product_data.get('description'),
                 product_data.get('category'),
-                product_data.get('unit')
+                product_data.get('unit'),
+                product_data.get('gtin')
             ))
             
             self.stats['products_added'] += 1
             return self.cursor.lastrowid
     
-    def add_price(self, product_id, price, valid_from, source_file):
-        """Fügt einen Preis hinzu."""
-        if price is None or pd.isna(price):
-            return
+    @staticmethod
+    def parse_price(price):
+        """
+        Wandelt einen Zellwert in einen Preis um.
+        
+        Returns:
+            float: Preis oder None bei leerer Zelle
+        
+        Raises:
+            ValueError: Wenn der Wert kein gültiger Preis ist
+        """
+        if price is None or price == '':
+            return None
         
         try:
-            price_value = float(price)
+            return float(price)
         except (ValueError, TypeError):
+            raise ValueError(f"Ungültiger Preis: {price}")
+    
+    def add_price(self, product_id, price, valid_from, source_file):
+        """Fügt einen Preis hinzu."""
+        try:
+            price_value = self.parse_price(price)
+        except ValueError:
             self.stats['errors'].append(
                 f"Ungültiger Preis für Produkt {product_id}: {price}"
             )
             return
         
+        if price_value is None:
+            return
+        
+        if self.change_only:
+            current = self.cursor.execute(
+                "SELECT price FROM prices WHERE product_id = ? AND is_current = 1",
+                (product_id,)
+            ).fetchone()
+            if current and current[0] == price_value:
+                return
+        
         self.cursor.execute("""
             UPDATE prices 
             SET is_current = 0, valid_until = ?
@@ -172,77 +354,467 @@ class PublicationImporter:
         
         self.stats['prices_added'] += 1
     
-    def import_excel_file(self, filepath, sheet_name=None):
-        """Importiert eine einzelne Excel-Datei."""
+    def write_staged_rows(self, staged_rows, valid_from, source_file):
+        """
+        Schreibt alle Zeilen einer Datei mengenbasiert in die Datenbank.
+        
+        Die Zeilen werden per executemany in eine temporäre Staging-Tabelle
+        geladen; Produkt-Update und -Insert, Schliessen der aktuellen Preise
+        und Einfügen der neuen Preise laufen danach als je ein SQL-Statement.
+        
+        Args:
+            staged_rows (list): Tupel (product_number, description, category, unit, gtin, price)
+            valid_from (str): Gültigkeitsdatum der Datei
+            source_file (str): Dateiname
+        """
+        self.cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS staging_rows (
+                product_number TEXT PRIMARY KEY,
+                description TEXT,
+                category TEXT,
+                unit TEXT,
+                gtin TEXT,
+                price REAL
+            )
+        """)
+        self.cursor.execute("DELETE FROM staging_rows")
+        
+        # Doppelte Produktnummern: letzte Zeile der Datei gewinnt wie im
+        # zeilenweisen Import, eine Zeile ohne Preis (z.B. "(Teilpackung)")
+        # überschreibt aber nicht den Preis einer früheren Zeile
+        self.cursor.executemany("""
+            INSERT INTO staging_rows (product_number, description, category, unit, gtin, price)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (product_number) DO UPDATE SET
+                description = excluded.description,
+                category = excluded.category,
+                unit = excluded.unit,
+                gtin = excluded.gtin,
+                price = COALESCE(excluded.price, staging_rows.price)
+        """, staged_rows)
+        
+        staged_count, new_count = self.cursor.execute("""
+            SELECT COUNT(*),
+                   SUM(NOT EXISTS (SELECT 1 FROM products p WHERE p.product_number = s.product_number))
+            FROM staging_rows s
+        """).fetchone()
+        
+        # Bestehende Produkte aktualisieren und nur neue einfügen: ein
+        # INSERT ... ON CONFLICT DO UPDATE würde bei AUTOINCREMENT für jede
+        # Konflikt-Zeile eine ID verbrauchen. Unveränderte Produkte werden
+        # nicht angefasst, damit Trigger (Volltextindex) nur bei echten
+        # Änderungen laufen.
+        self.cursor.execute("""
+            UPDATE products
+            SET (description, category, unit, gtin) = (
+                SELECT s.description, s.category, s.unit, s.gtin
+                FROM staging_rows s
+                WHERE s.product_number = products.product_number
+            )
+            WHERE product_number IN (
+                SELECT s.product_number
+                FROM staging_rows s
+                WHERE s.product_number = products.product_number
+                  AND (s.description IS NOT products.description
+                       OR s.category IS NOT products.category
+                       OR s.unit IS NOT products.unit
+                       OR s.gtin IS NOT products.gtin)
+            )
+        """)
+        
+        self.cursor.execute("""
+            INSERT INTO products (product_number, description, category, unit, gtin)
+            SELECT product_number, description, category, unit, gtin
+            FROM staging_rows s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM products p WHERE p.product_number = s.product_number
+            )
+        """)
+        
+        # Im Intervall-Modus bleiben unveränderte Preise als offenes Intervall stehen
+        price_changed = "AND s.price <> prices.price" if self.change_only else ""
+        self.cursor.execute(f"""
+            UPDATE prices
+            SET is_current = 0, valid_until = ?
+            WHERE is_current = 1
+              AND EXISTS (
+                  SELECT 1
+                  FROM products p
+                  JOIN staging_rows s ON s.product_number = p.product_number
+                  WHERE p.id = prices.product_id
+                    AND s.price IS NOT NULL
+                    {price_changed}
+              )
+        """, (valid_from,))
+        
+        self.cursor.execute("""
+            INSERT INTO prices (product_id, price, valid_from, source_file, is_current)
+            SELECT p.id, s.price, ?, ?, 1
+            FROM staging_rows s
+            JOIN products p ON p.product_number = s.product_number
+            WHERE s.price IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM prices c
+                  WHERE c.product_id = p.id AND c.is_current = 1
+              )
+        """, (valid_from, source_file))
+        prices_added = self.cursor.rowcount
+        
+        new_count = new_count or 0
+        self.stats['products_added'] += new_count
+        self.stats['products_updated'] += staged_count - new_count
+        self.stats['prices_added'] += prices_added
+    
+    def write_sheet_data(self, sheets, valid_from):
+        """
+        Schreibt die Daten der Zusatz-Sheets mengenbasiert in die Datenbank.
+        
+        Französische Bezeichnungen werden überschrieben; Limitationen und
+        Generikum/Selbstbehalt werden wie Preise als Intervalle geführt
+        (neue Zeile nur bei Änderung). Eine Limitation, die im Sheet einer
+        Sprache fehlt, wird geschlossen. Limitationstexte werden über
+        strings interniert und nur als ID verglichen.
+        
+        Args:
+            sheets (dict): Ergebnis von parse_extra_sheets
+            valid_from (str): Gültigkeitsdatum der Datei
+        
+        Returns:
+            dict: Anzahl geänderter Zeilen pro Tabelle
+        """
+        changes = {'product_texts': 0, 'limitations': 0, 'product_flags': 0}
+        
+        if sheets['texts']:
+            self.cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS staging_texts (
+                    product_number TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    description TEXT,
+                    PRIMARY KEY (product_number, language)
+                )
+            """)
+            self.cursor.execute("DELETE FROM staging_texts")
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO staging_texts (product_number, language, description)
+                VALUES (?, ?, ?)
+            """, sheets['texts'])
+            self.cursor.execute("""
+                INSERT INTO product_texts (product_id, language, description)
+                SELECT p.id, s.language, s.description
+                FROM staging_texts s
+                JOIN products p ON p.product_number = s.product_number
+                WHERE true
+                ON CONFLICT(product_id, language) DO UPDATE
+                SET description = excluded.description
+                WHERE description IS NOT excluded.description
+            """)
+            changes['product_texts'] = self.cursor.rowcount
+        
+        if sheets['limitation_languages']:
+            self.cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS staging_limitations (
+                    product_number TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    text_id INTEGER NOT NULL,
+                    PRIMARY KEY (product_number, language)
+                )
+            """)
+            self.cursor.execute("DELETE FROM staging_limitations")
+            text_ids = self.interner.intern_many([text for _, _, text in sheets['limitations']])
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO staging_limitations (product_number, language, text_id)
+                VALUES (?, ?, ?)
+            """, (
+                (product_number, language, text_id)
+                for (product_number, language, _), text_id in zip(sheets['limitations'], text_ids)
+            ))
+            
+            languages = sheets['limitation_languages']
+            placeholders = ', '.join('?' * len(languages))
+            self.cursor.execute(f"""
+                UPDATE limitations
+                SET valid_until = ?
+                WHERE valid_until IS NULL
+                  AND language IN ({placeholders})
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM staging_limitations s
+                      JOIN products p ON p.product_number = s.product_number
+                      WHERE p.id = limitations.product_id
+                        AND s.language = limitations.language
+                        AND s.text_id = limitations.text_id
+                  )
+            """, (valid_from, *languages))
+            
+            self.cursor.execute("""
+                INSERT INTO limitations (product_id, language, text_id, valid_from)
+                SELECT p.id, s.language, s.text_id, ?
+                FROM staging_limitations s
+                JOIN products p ON p.product_number = s.product_number
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM limitations l
+                    WHERE l.product_id = p.id
+                      AND l.language = s.language
+                      AND l.valid_until IS NULL
+                )
+            """, (valid_from,))
+            changes['limitations'] = self.cursor.rowcount
+        
+        if sheets['flags']:
+            self.cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS staging_flags (
+                    product_number TEXT PRIMARY KEY,
+                    is_generic INTEGER NOT NULL,
+                    deductible_percent INTEGER
+                )
+            """)
+            self.cursor.execute("DELETE FROM staging_flags")
+            self.cursor.executemany("""
+                INSERT OR REPLACE INTO staging_flags (product_number, is_generic, deductible_percent)
+                VALUES (?, ?, ?)
+            """, sheets['flags'])
+            
+            self.cursor.execute("""
+                UPDATE product_flags
+                SET valid_until = ?
+                WHERE valid_until IS NULL
+                  AND EXISTS (
+                      SELECT 1
+                      FROM staging_flags s
+                      JOIN products p ON p.product_number = s.product_number
+                      WHERE p.id = product_flags.product_id
+                        AND (s.is_generic IS NOT product_flags.is_generic
+                             OR s.deductible_percent IS NOT product_flags.deductible_percent)
+                  )
+            """, (valid_from,))
+            
+            self.cursor.execute("""
+                INSERT INTO product_flags (product_id, is_generic, deductible_percent, valid_from)
+                SELECT p.id, s.is_generic, s.deductible_percent, ?
+                FROM staging_flags s
+                JOIN products p ON p.product_number = s.product_number
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM product_flags f
+                    WHERE f.product_id = p.id AND f.valid_until IS NULL
+                )
+            """, (valid_from,))
+            changes['product_flags'] = self.cursor.rowcount
+        
+        return changes
+    
+    def update_price_stats(self, after_price_id):
+        """
+        Aktualisiert price_stats mit den neu eingefügten Preiszeilen.
+        
+        Args:
+            after_price_id (int): Höchste prices.id vor dem Import der Datei
+        """
+        self.cursor.execute("""
+            INSERT INTO price_stats (
+                product_id, price_count, price_sum, min_price, max_price,
+                first_price, first_valid_from, current_price, current_valid_from,
+                last_change_date
+            )
+            SELECT product_id, 1, price, price, price,
+                   price, valid_from, price, valid_from,
+                   valid_from
+            FROM prices
+            WHERE id > ?
+            ORDER BY id
+            ON CONFLICT(product_id) DO UPDATE SET
+                price_count = price_count + 1,
+                price_sum = price_sum + excluded.price_sum,
+                min_price = MIN(min_price, excluded.min_price),
+                max_price = MAX(max_price, excluded.max_price),
+                first_price = CASE WHEN excluded.first_valid_from < first_valid_from
+                                   THEN excluded.first_price ELSE first_price END,
+                first_valid_from = MIN(first_valid_from, excluded.first_valid_from),
+                last_change_date = CASE WHEN excluded.current_valid_from >= current_valid_from
+                                         AND excluded.current_price <> current_price
+                                        THEN excluded.current_valid_from
+                                        ELSE last_change_date END,
+                current_price = CASE WHEN excluded.current_valid_from >= current_valid_from
+                                     THEN excluded.current_price ELSE current_price END,
+                current_valid_from = MAX(current_valid_from, excluded.current_valid_from)
+        """, (after_price_id,))
+    
+    def check_manifest(self, filepath):
+        """
+        Prüft anhand von import_manifest, ob eine Datei bereits importiert wurde.
+        
+        Zuerst wird nur über Dateiname, Grösse und mtime gesucht (ein stat,
+        kein Lesen der Datei). Erst wenn das nicht passt, wird der SHA-256
+        berechnet; so werden auch umbenannte oder neu kopierte Dateien mit
+        identischem Inhalt erkannt.
+        
+        Args:
+            filepath (str): Pfad zur Excel-Datei
+        
+        Returns:
+            dict: Manifest-Eintrag für den Import, oder None wenn die Datei
+                  übersprungen werden kann
+        """
+        filename = os.path.basename(filepath)
+        stat = os.stat(filepath)
+        
+        if not self.force:
+            known = self.cursor.execute("""
+                SELECT 1 FROM import_manifest
+                WHERE filename = ? AND file_size = ? AND file_mtime = ?
+            """, (filename, stat.st_size, stat.st_mtime)).fetchone()
+            if known:
+                return None
+        
+        source = {
+            'sha256': file_sha256(filepath),
+            'filename': filename,
+            'file_size': stat.st_size,
+            'file_mtime': stat.st_mtime
+        }
+        
+        if not self.force:
+            self.cursor.execute("""
+                UPDATE import_manifest
+                SET filename = :filename, file_size = :file_size, file_mtime = :file_mtime
+                WHERE sha256 = :sha256
+            """, source)
+            if self.cursor.rowcount:
+                self.conn.commit()
+                return None
+        
+        return source
+    
+    def record_manifest(self, source, valid_from, row_count):
+        """Vermerkt eine Datei in import_manifest (innerhalb der Import-Transaktion)."""
+        self.cursor.execute("""
+            INSERT OR REPLACE INTO import_manifest
+                (sha256, filename, file_size, file_mtime, valid_from, row_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            source['sha256'],
+            source['filename'],
+            source['file_size'],
+            source['file_mtime'],
+            valid_from,
+            row_count
+        ))
+    
+    def import_excel_file(self, filepath, sheet_name=None, source=None):
+        """
+        Importiert eine einzelne Excel-Datei.
+        
+        Args:
+            filepath (str): Pfad zur Excel-Datei
+            sheet_name (str): Name des Tabellenblatts (optional, nutzt Config)
+            source (dict): Bereits ermittelter Manifest-Eintrag (optional)
+        """
         if sheet_name is None:
             sheet_name = Config.EXCEL_SHEET_NAME
         
         filename = os.path.basename(filepath)
         print(f"\\n📄 Importiere: {filename}")
         
-        try:
-            valid_from = self.extract_date_from_filename(filename)
-            if not valid_from:
-                print(f"  ⚠️  Warnung: Konnte kein Datum aus '{filename}' extrahieren")
-                valid_from = datetime.now().strftime('%Y-%m-%d')
-            
-            print(f"  📅 Gültigkeitsdatum: {valid_from}")
-            
-            try:
-                df = pd.read_excel(filepath, sheet_name=sheet_name)
-            except ValueError:
-                df = pd.read_excel(filepath)
-                print(f"  ℹ️  Sheet '{sheet_name}' nicht gefunden, verwende erstes Sheet")
-            
-            if df.empty:
-                print(f"  ⚠️  Datei ist leer, überspringe...")
+        if source is None:
+            source = self.check_manifest(filepath)
+            if source is None:
+                print(f"  ⏭️  Bereits importiert (unverändert), überspringe...")
+                self.stats['files_skipped'] += 1
                 return False
+        
+        try:
+            parsed = parse_publication_file(
+                filepath, sheet_name, self.extra_sheets, self.known_mappings
+            )
+        except Exception as e:
+            error_msg = f"Fehler bei {filename}: {str(e)}"
+            self.stats['errors'].append(error_msg)
+            print(f"  ❌ FEHLER: {e}")
+            return False
+        
+        return self.write_parsed_file(parsed, source)
+    
+    def write_parsed_file(self, parsed, source):
+        """
+        Schreibt eine mit parse_publication_file gelesene Datei in die Datenbank.
+        
+        Args:
+            parsed (dict): Ergebnis von parse_publication_file
+            source (dict): Manifest-Eintrag aus check_manifest
+        
+        Returns:
+            bool: True wenn erfolgreich
+        """
+        filename = parsed['filename']
+        valid_from = parsed['valid_from']
+        
+        for message in parsed['messages']:
+            print(f"  {message}")
+        
+        if parsed['mapping'] is None:
+            return False
+        
+        profile = parsed['profile']
+        print(f"  📅 Gültigkeitsdatum: {valid_from}")
+        print(f"  🧩 Profil: {profile['profile']} v{profile['version']} "
+              f"({'neu erkannt' if profile['new'] else 'bekannt'})")
+        print(f"  🔍 Erkannte Spalten:")
+        for key, value in parsed['mapping'].items():
+            if value:
+                print(f"     • {key}: '{value}'")
+        
+        rows = parsed['rows']
+        skipped_count = parsed['skipped']
+        print(f"  📊 Zeilen: {len(rows) + skipped_count}")
+        
+        for error in parsed['errors']:
+            self.stats['errors'].append(error)
+            print(f"  ❌ {error}")
+        
+        try:
+            last_price_id = self.cursor.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM prices"
+            ).fetchone()[0]
             
-            print(f"  📊 Zeilen: {len(df)}")
-            
-            mapping = self.detect_column_mapping(df)
-            print(f"  🔍 Erkannte Spalten:")
-            for key, value in mapping.items():
-                if value:
-                    print(f"     • {key}: '{value}'")
-            
-            if not mapping['product_number']:
-                raise ValueError("Produktnummer-Spalte nicht gefunden!")
-            
-            if not mapping['price']:
-                raise ValueError("Preis-Spalte nicht gefunden!")
-            
-            imported_count = 0
-            skipped_count = 0
+            if self.bulk:
+                self.write_staged_rows(rows, valid_from, filename)
+            else:
+                for product_number, description, category, unit, gtin, price in rows:
+                    try:
+                        product_id = self.get_or_create_product({
+                            'product_number': product_number,
+                            'description': description,
+                            'category': category,
+                            'unit': unit,
+                            'gtin': gtin
+                        })
+                        self.add_price(product_id, price, valid_from, filename)
+                    except Exception as e:
+                        error_msg = f"Produkt {product_number}: {str(e)}"
+                        self.stats['errors'].append(error_msg)
+                        print(f"  ❌ Fehler bei Produkt {product_number}: {e}")
             
-            for idx, row in df.iterrows():
-                try:
-                    product_data = {
-                        'product_number': str(row[mapping['product_number']]) if pd.notna(row[mapping['product_number']]) else None,
-                        'description': str(row[mapping['description']]) if mapping['description'] and pd.notna(row[mapping['description']]) else None,
-                        'category': str(row[mapping['category']]) if mapping['category'] and pd.notna(row[mapping['category']]) else None,
-                        'unit': str(row[mapping['unit']]) if mapping['unit'] and pd.notna(row[mapping['unit']]) else None
-                    }
-                    
-                    if not product_data['product_number'] or product_data['product_number'] == 'nan':
-                        skipped_count += 1
-                        continue
-                    
-                    product_id = self.get_or_create_product(product_data)
-                    price = row[mapping['price']]
-                    self.add_price(product_id, price, valid_from, filename)
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Zeile {idx + 2}: {str(e)}"
-                    self.stats['errors'].append(error_msg)
-                    print(f"  ❌ Fehler in Zeile {idx + 2}: {e}")
+            if parsed['sheets'] is not None:
+                changes = self.write_sheet_data(parsed['sheets'], valid_from)
+                print(f"  📑 Zusatz-Sheets: {', '.join(parsed['sheets']['names'])}")
+                for table, count in changes.items():
+                    if count:
+                        print(f"     • {table}: {count} neue/geänderte Zeilen")
             
+            self.update_price_stats(last_price_id)
+            self.record_manifest(source, valid_from, len(rows))
+            set_price_mode(self.cursor, self.price_mode)
+            refresh_db_meta(self.cursor, bump_generation=True)
+            if profile['new']:
+                save_mapping(self.cursor, profile['signature'], profile, profile['header'])
             self.conn.commit()
             
+            if profile['new']:
+                self.known_mappings[profile['signature']] = {
+                    key: profile[key] for key in ('profile', 'version', 'positions')
+                }
+            
             print(f"  ✅ Import abgeschlossen:")
-            print(f"     • Erfolgreich: {imported_count} Zeilen")
+            print(f"     • Erfolgreich: {len(rows)} Zeilen")
             if skipped_count > 0:
                 print(f"     • Übersprungen: {skipped_count} Zeilen")
             
@@ -251,13 +823,72 @@ class PublicationImporter:
             
         except Exception as e:
             self.conn.rollback()
+            self.interner.reset()
             error_msg = f"Fehler bei {filename}: {str(e)}"
             self.stats['errors'].append(error_msg)
             print(f"  ❌ FEHLER: {e}")
             return False
     
-    def import_directory(self, directory_path=None, pattern=None):
-        """Importiert alle Excel-Dateien aus einem Verzeichnis."""
+    def import_files_parallel(self, files, jobs, sheet_name=None):
+        """
+        Parst Dateien parallel in einem Prozess-Pool und schreibt sie seriell.
+        
+        Die Worker liefern nur kompakte Zeilen-Tupel zurück; geschrieben wird
+        ausschließlich von dieser Verbindung, strikt in Reihenfolge der Dateiliste.
+        Es sind höchstens 2 × jobs geparste Dateien gleichzeitig im Speicher.
+        
+        Args:
+            files (list): Tupel (Dateipfad, Manifest-Eintrag), sortiert nach
+                          Gültigkeitsdatum
+            jobs (int): Anzahl Worker-Prozesse
+            sheet_name (str): Name des Tabellenblatts (optional, nutzt Config)
+        """
+        if sheet_name is None:
+            sheet_name = Config.EXCEL_SHEET_NAME
+        
+        remaining = iter(files)
+        pending = deque()
+        
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            def submit_next():
+                item = next(remaining, None)
+                if item is not None:
+                    filepath, source = item
+                    future = executor.submit(
+                        parse_publication_file, str(filepath), sheet_name,
+                        self.extra_sheets, self.known_mappings
+                    )
+                    pending.append((filepath, source, future))
+            
+            for _ in range(jobs * 2):
+                submit_next()
+            
+            while pending:
+                filepath, source, future = pending.popleft()
+                submit_next()
+                
+                filename = os.path.basename(filepath)
+                print(f"\\n📄 Importiere: {filename}")
+                
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    error_msg = f"Fehler bei {filename}: {str(e)}"
+                    self.stats['errors'].append(error_msg)
+                    print(f"  ❌ FEHLER: {e}")
+                    continue
+                
+                self.write_parsed_file(parsed, source)
+    
+    def import_directory(self, directory_path=None, pattern=None, jobs=1):
+        """
+        Importiert alle Excel-Dateien aus einem Verzeichnis.
+        
+        Args:
+            directory_path (str): Verzeichnis (optional, nutzt Config)
+            pattern (str): Glob-Pattern (optional, nutzt Config)
+            jobs (int): Anzahl paralleler Parser-Prozesse (1 = sequentiell)
+        """
         if directory_path is None:
             directory_path = str(Config.TESTDATA_PATH)
         
@@ -268,7 +899,10 @@ class PublicationImporter:
         print(f"   Pattern: {pattern}")
         
         path = Path(directory_path)
-        files = sorted(path.glob(pattern))
+        files = sorted(
+            path.glob(pattern),
+            key=lambda f: (self.extract_date_from_filename(f.name) or '', f.name)
+        )
         
         if not files:
             print(f"⚠️  Keine passenden Dateien gefunden!")
@@ -278,12 +912,28 @@ class PublicationImporter:
         for f in files:
             print(f"   • {f.name}")
         
+        pending_files = []
+        for f in files:
+            source = self.check_manifest(str(f))
+            if source is None:
+                self.stats['files_skipped'] += 1
+            else:
+                pending_files.append((f, source))
+        
+        if self.stats['files_skipped']:
+            print(f"\\n⏭️  Bereits importiert (unverändert): {self.stats['files_skipped']} Dateien")
+        
         print("\\n" + "="*70)
         print("🚀 STARTE IMPORT")
+        if jobs > 1:
+            print(f"   Parallel: {jobs} Prozesse")
         print("="*70)
         
-        for filepath in files:
-            self.import_excel_file(str(filepath))
+        if jobs > 1:
+            self.import_files_parallel(pending_files, jobs)
+        else:
+            for filepath, source in pending_files:
+                self.import_excel_file(str(filepath), source=source)
         
         self.print_summary()
     
@@ -293,6 +943,7 @@ class PublicationImporter:
         print("📊 IMPORT ZUSAMMENFASSUNG")
         print("="*70)
         print(f"Verarbeitete Dateien: {self.stats['files_processed']}")
+        print(f"Übersprungene Dateien: {self.stats['files_skipped']}")
         print(f"Neue Produkte: {self.stats['products_added']}")
         print(f"Aktualisierte Produkte: {self.stats['products_updated']}")
         print(f"Hinzugefügte Preise: {self.stats['prices_added']}")
@@ -309,8 +960,372 @@ class PublicationImporter:
         print("="*70 + "\\n")
 
 
+def file_sha256(filepath):
+    """Berechnet den SHA-256 einer Datei blockweise."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_column(values):
+    """Bereinigt eine Spalte zu Text (leere Zellen und Leerstrings → None)."""
+    return [str(value).strip() or None if value is not None else None for value in values]
+
+
+def number_column(values):
+    """
+    Bereinigt eine Nummern-Spalte (Produktnummer, GTIN) zu Text.
+    
+    Als Zahl gespeicherte Nummern kommen als float an und würden als
+    '53662013.0' abgelegt; die Endung '.0' wird entfernt.
+    """
+    return [
+        text[:-2] if text and text[-2:] == '.0' and text[:-2].isdigit() else text
+        for text in text_column(values)
+    ]
+
+
+def price_column(values):
+    """
+    Wandelt eine Preis-Spalte in float um.
+    
+    Returns:
+        tuple: (Preise, Liste der Positionen mit ungültigem Wert)
+    """
+    try:
+        # Schneller Weg: alle Werte sind Zahlen oder leer
+        return [float(value) if value is not None else None for value in values], []
+    except (ValueError, TypeError):
+        pass
+    
+    prices = []
+    invalid = []
+    for position, value in enumerate(values):
+        if value is None or value == '':
+            prices.append(None)
+            continue
+        try:
+            prices.append(float(value))
+        except (ValueError, TypeError):
+            prices.append(None)
+            invalid.append(position)
+    return prices, invalid
+
+
+def normalize_rows(rows, positions):
+    """
+    Normalisiert die zugeordneten Spalten spaltenweise.
+    
+    Statt jede Zelle einzeln über _cell_text/parse_price zu führen, wird
+    jede zugeordnete Spalte einmal herausgezogen, mit einer
+    Listen-Abstraktion bereinigt und am Ende per zip wieder zu Tupeln für
+    executemany zusammengesetzt.
+    
+    Args:
+        rows (list): Datenzeilen aus dem Reader
+        positions (dict): Feld → Spaltenindex (oder None)
+    
+    Returns:
+        tuple: (Tupel (product_number, description, category, unit, gtin, price),
+                Anzahl übersprungener Zeilen, Fehlermeldungen)
+    """
+    if not rows:
+        return [], 0, []
+    
+    fields = ('product_number', 'description', 'category', 'unit', 'gtin', 'price')
+    mapped = [field for field in fields if positions[field] is not None]
+    width = max(positions[field] for field in mapped) + 1
+    
+    # Der Reader lässt leere Zellen am Zeilenende weg
+    if min(map(len, rows)) < width:
+        padding = (None,) * width
+        rows = [row if len(row) >= width else row + padding[len(row):] for row in rows]
+    
+    raw = {field: [row[positions[field]] for row in rows] for field in mapped}
+    
+    empty = [None] * len(rows)
+    product_numbers = number_column(raw['product_number'])
+    prices, invalid = price_column(raw['price'])
+    columns = (
+        product_numbers,
+        text_column(raw['description']) if 'description' in raw else empty,
+        text_column(raw['category']) if 'category' in raw else empty,
+        text_column(raw['unit']) if 'unit' in raw else empty,
+        number_column(raw['gtin']) if 'gtin' in raw else empty,
+        prices
+    )
+    
+    errors = [
+        f"Zeile {position + 2}: Ungültiger Preis für Produkt "
+        f"{product_numbers[position]}: {raw['price'][position]}"
+        for position in invalid if product_numbers[position]
+    ]
+    normalized = [row for row in zip(*columns) if row[0]]
+    return normalized, len(rows) - len(normalized), errors
+
+
+def find_column(header, names):
+    """Liefert die Position der ersten Spalte, deren Name in names vorkommt (oder None)."""
+    for position, column in enumerate(header):
+        if column is not None and str(column).strip() in names:
+            return position
+    return None
+
+
+def find_key_columns(header):
+    """Liefert die Positionen aller Schlüsselspalten (KEY_COLUMNS) der Kopfzeile."""
+    return {
+        position for position, column in enumerate(header)
+        if column is not None and str(column).strip() in KEY_COLUMNS
+    }
+
+
+def parse_extra_sheets(reader, product_numbers, messages):
+    """
+    Liest die Zusatz-Sheets einer bereits geöffneten Publikationsdatei.
+    
+    Alle Sheets werden über denselben Reader gelesen, die Datei wird also
+    nur einmal geöffnet und die Shared Strings nur einmal dekodiert.
+    
+    Args:
+        reader (XlsxStreamReader): Geöffnete Datei
+        product_numbers (list): Produktnummern des Publications-Sheets
+        messages (list): Liste für Meldungen
+    
+    Returns:
+        dict: names (gelesene Sheets), texts (product_number, language, description),
+              limitations (product_number, language, text), limitation_languages,
+              flags (product_number, is_generic, deductible_percent)
+    """
+    sheets = {
+        'names': [],
+        'texts': [],
+        'limitations': [],
+        'limitation_languages': [],
+        'flags': []
+    }
+    limitation_texts = {}
+    generics = None
+    deductible = {}
+    
+    for sheet_name in reader.sheet_names():
+        deductible_match = DEDUCTIBLE_SHEET_PATTERN.match(sheet_name)
+        if sheet_name in EXTRA_SHEETS:
+            kind, language = EXTRA_SHEETS[sheet_name]
+        elif deductible_match:
+            kind, language = 'deductible', None
+        else:
+            continue
+        
+        key_columns = set()
+        rows = reader.iter_rows(sheet_name, key_columns)
+        header = next(rows, None)
+        if header is None:
+            continue
+        
+        number_pos = find_column(header, NUMBER_COLUMNS)
+        key_columns.add(number_pos)
+        text_pos = find_column(header, TEXT_COLUMNS.get(kind, ()))
+        if number_pos is None or (kind in TEXT_COLUMNS and text_pos is None):
+            messages.append(f"⚠️  Sheet '{sheet_name}': Spalten nicht erkannt, überspringe...")
+            continue
+        
+        sheets['names'].append(sheet_name)
+        cell_text = PublicationImporter._cell_text
+        
+        if kind == 'limitations':
+            sheets['limitation_languages'].append(language)
+        elif kind == 'generics':
+            generics = set()
+        
+        for row in rows:
+            product_number = cell_text(row, number_pos)
+            if not product_number:
+                continue
+            
+            if kind == 'texts':
+                sheets['texts'].append((product_number, language, cell_text(row, text_pos)))
+            
+            elif kind == 'limitations':
+                text = cell_text(row, text_pos)
+                if text:
+                    # Mehrere Limitationen pro Packung werden zusammengefasst
+                    texts = limitation_texts.setdefault((product_number, language), [])
+                    if text not in texts:
+                        texts.append(text)
+            
+            elif kind == 'generics':
+                generics.add(product_number)
+            
+            else:
+                deductible[product_number] = int(deductible_match.group(1))
+    
+    sheets['limitations'] = [
+        (product_number, language, '\n\n'.join(texts))
+        for (product_number, language), texts in limitation_texts.items()
+    ]
+    
+    # Selbstbehalt NULL = Standard-Selbstbehalt (Packung nicht im Sheet)
+    if generics is not None:
+        sheets['flags'] = [
+            (product_number, int(product_number in generics), deductible.get(product_number))
+            for product_number in dict.fromkeys(product_numbers)
+        ]
+    
+    return sheets
+
+
+def resolve_column_mapping(header, rows, known_mappings):
+    """
+    Ermittelt die Spaltenzuordnung einer Kopfzeile.
+    
+    Bekannte Signaturen werden direkt nachgeschlagen. Sonst wird ein
+    explizites Profil gesucht und erst danach die Heuristik verwendet; eine
+    neue Zuordnung wird an den ersten Datenzeilen auf Plausibilität geprüft.
+    
+    Args:
+        header (tuple): Kopfzeile
+        rows (iterator): Datenzeilen (werden für die Prüfung angelesen)
+        known_mappings (dict): Signatur → gespeicherte Zuordnung
+    
+    Returns:
+        tuple: (Zuordnung, Datenzeilen, neu erkannt)
+    
+    Raises:
+        ValueError: Pflichtspalte fehlt oder Zuordnung ist unplausibel
+    """
+    signature = header_signature(header)
+    known = known_mappings.get(signature)
+    if known is not None:
+        return dict(known, signature=signature), rows, False
+    
+    profile, positions = match_profile(header)
+    if profile is not None:
+        entry = {'profile': profile['name'], 'version': profile['version'], 'positions': positions}
+    else:
+        names = PublicationImporter.detect_column_mapping(header)
+        entry = {
+            'profile': HEURISTIC_PROFILE,
+            'version': HEURISTIC_VERSION,
+            'positions': {
+                key: header.index(value) if value else None
+                for key, value in names.items()
+            }
+        }
+    
+    if entry['positions']['product_number'] is None:
+        raise ValueError("Produktnummer-Spalte nicht gefunden!")
+    
+    if entry['positions']['price'] is None:
+        raise ValueError("Preis-Spalte nicht gefunden!")
+    
+    sample = list(islice(rows, SNIFF_ROWS))
+    problems = sniff_mapping(entry['positions'], sample)
+    if problems:
+        raise ValueError(
+            f"Spaltenzuordnung ({entry['profile']}) unplausibel: {'; '.join(problems)}"
+        )
+    
+    entry['signature'] = signature
+    return entry, chain(sample, rows), True
+
+
+def parse_publication_file(filepath, sheet_name, extra_sheets=False, known_mappings=None):
+    """
+    Liest eine Publications-Datei in kompakte Zeilen-Tupel.
+    
+    Die Funktion greift nicht auf die Datenbank zu und kann deshalb auch
+    in einem Worker-Prozess laufen. Meldungen werden gesammelt statt
+    ausgegeben, damit die Ausgabe paralleler Worker nicht durcheinander gerät.
+    
+    Args:
+        filepath (str): Pfad zur Excel-Datei
+        sheet_name (str): Name des Tabellenblatts
+        extra_sheets (bool): Zusatz-Sheets im selben Durchgang mitlesen
+        known_mappings (dict): Gespeicherte Zuordnungen (Signatur → Eintrag)
+    
+    Returns:
+        dict: filename, valid_from, mapping, profile (Eintrag für mapping_profiles,
+              header, new), rows (product_number, description, category, unit,
+              gtin, price), sheets (Ergebnis von parse_extra_sheets oder None),
+              skipped, errors, messages
+    """
+    filename = os.path.basename(filepath)
+    parsed = {
+        'filename': filename,
+        'valid_from': PublicationImporter.extract_date_from_filename(filename),
+        'mapping': None,
+        'profile': None,
+        'rows': [],
+        'sheets': None,
+        'skipped': 0,
+        'errors': [],
+        'messages': []
+    }
+    
+    if not parsed['valid_from']:
+        parsed['messages'].append(f"⚠️  Warnung: Konnte kein Datum aus '{filename}' extrahieren")
+        parsed['valid_from'] = datetime.now().strftime('%Y-%m-%d')
+    
+    with XlsxStreamReader(filepath, SHARED_STRINGS) as reader:
+        sheet_names = reader.sheet_names()
+        if sheet_name not in sheet_names:
+            parsed['messages'].append(f"ℹ️  Sheet '{sheet_name}' nicht gefunden, verwende erstes Sheet")
+            sheet_name = sheet_names[0]
+        
+        # Schlüsselspalten als Text lesen, sobald ihre Position bekannt ist
+        key_columns = set()
+        rows = reader.iter_rows(sheet_name, key_columns)
+        header = next(rows, None)
+        
+        if header is None:
+            parsed['messages'].append(f"⚠️  Datei ist leer, überspringe...")
+            return parsed
+        
+        key_columns.update(find_key_columns(header))
+        profile, rows, is_new = resolve_column_mapping(header, rows, known_mappings or {})
+        positions = profile['positions']
+        key_columns.update(positions[field] for field in KEY_FIELDS if positions[field] is not None)
+        mapping = {
+            key: header[position] if position is not None else None
+            for key, position in positions.items()
+        }
+        parsed['profile'] = dict(profile, header=header, new=is_new)
+        
+        parsed['rows'], parsed['skipped'], parsed['errors'] = normalize_rows(
+            list(rows), positions
+        )
+        
+        if extra_sheets:
+            parsed['sheets'] = parse_extra_sheets(
+                reader, [row[0] for row in parsed['rows']], parsed['messages']
+            )
+    
+    parsed['mapping'] = mapping
+    return parsed
+
+
+def parse_args():
+    """Liest die Kommandozeilen-Optionen."""
+    parser = argparse.ArgumentParser(description="Excel Import für Publications Datenbank")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Anzahl paralleler Parser-Prozesse beim Verzeichnis-Import")
+    parser.add_argument('--dir', dest='directory',
+                        help="Verzeichnis direkt importieren (ohne Menü)")
+    parser.add_argument('--force', action='store_true',
+                        help="Auch bereits importierte Dateien erneut importieren")
+    parser.add_argument('--change-only', action='store_true',
+                        help="Preise als Intervalle speichern (neue Zeile nur bei Preisänderung)")
+    parser.add_argument('--prices-only', action='store_true',
+                        help="Nur das Publications-Sheet lesen (ohne Zusatz-Sheets)")
+    return parser.parse_args()
+
+
 def main():
     """Hauptfunktion für den Import."""
+    args = parse_args()
     
     print("\\n" + "="*70)
     print("📥 EXCEL IMPORT für Publications Datenbank")
@@ -324,11 +1339,19 @@ def main():
         print("\\n⚠️  Bitte Konfiguration prüfen (.env Datei)\\n")
     
     # Importer initialisieren
-    importer = PublicationImporter()
+    importer = PublicationImporter(force=args.force, change_only=args.change_only,
+                                   extra_sheets=not args.prices_only)
     
     try:
         importer.connect()
         
+        if args.directory:
+            if os.path.isdir(args.directory):
+                importer.import_directory(args.directory, jobs=args.jobs)
+            else:
+                print(f"❌ Verzeichnis nicht gefunden: {args.directory}")
+            return
+        
         print("\\nWählen Sie eine Option:")
         print("  1. Einzelne Datei importieren")
         print("  2. Alle Dateien aus Verzeichnis importieren")
@@ -348,14 +1371,14 @@ def main():
         elif choice == '2':
             directory = input("Pfad zum Verzeichnis: ").strip()
             if os.path.isdir(directory):
-                importer.import_directory(directory)
+                importer.import_directory(directory, jobs=args.jobs)
             else:
                 print(f"❌ Verzeichnis nicht gefunden: {directory}")
         
         elif choice == '3':
             if Config.TESTDATA_PATH.exists():
                 print(f"\\n✅ Verwende konfiguriertes Verzeichnis")
-                importer.import_directory()
+                importer.import_directory(jobs=args.jobs)
             else:
                 print(f"❌ Verzeichnis nicht gefunden: {Config.TESTDATA_PATH}")
                 print("Bitte .env Datei prüfen oder Option 2 wählen.")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark für den Excel-Import
+Vergleicht den Streaming-Reader mit pandas.read_excel (openpyxl), den
+zeilenweisen mit dem mengenbasierten Datenbank-Import sowie die
+zellenweise mit der spaltenweisen Normalisierung
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Füge Root-Verzeichnis zum Python-Pfad hinzu
+SCRIPT_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from xlsx_reader import XlsxStreamReader
+
+
+SHEET_NAME = 'Publications'
+
+
+def measure(func, *args):
+    """
+    Führt eine Funktion aus und misst Laufzeit und Spitzen-Speicher.
+
+    Returns:
+        tuple: (Ergebnis, Sekunden, Spitzen-Speicher in MB)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def read_with_stream(filepath):
+    """Liest alle Zeilen mit dem Streaming-Reader und gibt die Anzahl zurück."""
+    count = 0
+    with XlsxStreamReader(filepath) as reader:
+        for _ in reader.iter_rows(SHEET_NAME):
+            count += 1
+    return count - 1
+
+
+def read_with_pandas(filepath):
+    """Liest das Sheet mit pandas.read_excel und gibt die Anzahl Zeilen zurück."""
+    import pandas as pd
+    df = pd.read_excel(filepath, sheet_name=SHEET_NAME)
+    return len(df)
+
+
+def run_reader_benchmark(files):
+    """
+    Führt den Reader-Vergleich für die übergebenen Dateien aus.
+
+    Args:
+        files (list): Pfade zu XLSX-Dateien
+    """
+    try:
+        import pandas  # noqa: F401
+        readers = [('stream', read_with_stream), ('pandas', read_with_pandas)]
+    except ImportError:
+        print("⚠️  pandas nicht installiert, messe nur den Streaming-Reader")
+        readers = [('stream', read_with_stream)]
+
+    totals = {name: 0.0 for name, _ in readers}
+
+    for filepath in files:
+        print(f"\n📄 {Path(filepath).name}")
+        for name, reader in readers:
+            rows, elapsed, peak_mb = measure(reader, str(filepath))
+            totals[name] += elapsed
+            print(f"   • {name:<7} {rows:>7} Zeilen  {elapsed:7.2f} s  "
+                  f"{rows / elapsed:>9,.0f} Zeilen/s  Peak {peak_mb:7.1f} MB")
+
+    print("\n" + "="*70)
+    print("📊 GESAMT")
+    print("="*70)
+    for name, total in totals.items():
+        print(f"   • {name:<7} {total:7.2f} s")
+    if 'pandas' in totals and totals['stream'] > 0:
+        print(f"   • Faktor: {totals['pandas'] / totals['stream']:.1f}x")
+
+
+def normalize_per_cell(rows, positions):
+    """Bisherige Normalisierung: jede Zelle einzeln über _cell_text/parse_price."""
+    from excel_import_script import PublicationImporter
+
+    cell_text = PublicationImporter._cell_text
+    normalized = []
+    for row in rows:
+        product_number = cell_text(row, positions['product_number'])
+        if not product_number:
+            continue
+        price = row[positions['price']] if positions['price'] < len(row) else None
+        try:
+            price = PublicationImporter.parse_price(price)
+        except ValueError:
+            price = None
+        normalized.append((
+            product_number,
+            cell_text(row, positions['description']),
+            cell_text(row, positions['category']),
+            cell_text(row, positions['unit']),
+            cell_text(row, positions['gtin']),
+            price
+        ))
+    return normalized
+
+
+def run_normalize_benchmark(files, repeat=5):
+    """
+    Vergleicht zellenweise und spaltenweise Normalisierung (µs pro Zeile).
+
+    Die Zeilen werden vorab eingelesen, gemessen wird nur die
+    Normalisierung (beste von mehreren Runden, wie bei timeit ohne
+    Garbage Collector, damit dessen Zeitpunkt das Ergebnis nicht bestimmt).
+
+    Args:
+        files (list): Pfade zu XLSX-Dateien
+        repeat (int): Anzahl Runden
+    """
+    from excel_import_script import normalize_rows
+    from mapping_profiles import match_profile
+
+    for filepath in files:
+        start = time.perf_counter()
+        with XlsxStreamReader(str(filepath)) as reader:
+            rows = reader.iter_rows(SHEET_NAME)
+            header = next(rows)
+            rows = list(rows)
+        read_time = time.perf_counter() - start
+        _, positions = match_profile(header)
+        if positions is None:
+            print(f"\n⚠️  {Path(filepath).name}: kein Profil passt, überspringe")
+            continue
+
+        print(f"\n📄 {Path(filepath).name} ({len(rows)} Zeilen)")
+        print(f"   • lesen   {len(rows):>7} Zeilen  {read_time * 1000:7.1f} ms  "
+              f"{read_time / len(rows) * 1e6:6.2f} µs/Zeile")
+        results = {}
+        for name, func in [('cell', normalize_per_cell),
+                           ('column', lambda r, p: normalize_rows(r, p)[0])]:
+            best = None
+            for _ in range(repeat):
+                gc.collect()
+                gc.disable()
+                try:
+                    start = time.perf_counter()
+                    normalized = func(rows, positions)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    gc.enable()
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = best
+            print(f"   • {name:<7} {len(normalized):>7} Zeilen  {best * 1000:7.1f} ms  "
+                  f"{best / len(rows) * 1e6:6.2f} µs/Zeile")
+        print(f"   • Faktor: {results['cell'] / results['column']:.1f}x")
+
+
+def import_files(db_path, files, bulk):
+    """
+    Importiert Dateien in eine frische Datenbank (Ausgaben unterdrückt).
+
+    Returns:
+        dict: Import-Statistik
+    """
+    from db_diagnose_fix import create_tables
+    from excel_import_script import PublicationImporter
+
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            create_tables(db_path)
+            importer = PublicationImporter(db_path, bulk=bulk)
+            importer.connect()
+            for filepath in files:
+                importer.import_excel_file(str(filepath))
+            importer.close()
+        finally:
+            sys.stdout = stdout
+    return importer.stats
+
+
+def run_import_benchmark(files):
+    """
+    Vergleicht zeilenweisen und mengenbasierten Import (Zeilen/s).
+
+    Beide Modi importieren dieselben Dateien in je eine neue Datenbank,
+    damit ab der zweiten Datei auch der Update-Pfad gemessen wird.
+
+    Args:
+        files (list): Pfade zu XLSX-Dateien
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, bulk in [('row', False), ('bulk', True)]:
+            db_path = os.path.join(tmp_dir, f'{name}.db')
+            start = time.perf_counter()
+            stats = import_files(db_path, files, bulk)
+            elapsed = time.perf_counter() - start
+            rows = stats['products_added'] + stats['products_updated']
+            results[name] = elapsed
+            print(f"   • {name:<5} {rows:>7} Zeilen  {elapsed:7.2f} s  "
+                  f"{rows / elapsed:>9,.0f} Zeilen/s  "
+                  f"({stats['prices_added']} Preise, {len(stats['errors'])} Fehler)")
+
+    if results['bulk'] > 0:
+        print(f"   • Faktor: {results['row'] / results['bulk']:.1f}x")
+
+
+def main():
+    """Hauptfunktion: Dateien aus Argumenten oder eine Datei pro Testdaten-Jahr."""
+    parser = argparse.ArgumentParser(description="Benchmark für den Excel-Import")
+    parser.add_argument('mode', choices=['reader', 'import', 'normalize'],
+                        help="reader: Streaming vs. pandas, import: zeilenweise vs. bulk, "
+                             "normalize: zellen- vs. spaltenweise")
+    parser.add_argument('files', nargs='*', help="XLSX-Dateien")
+    args = parser.parse_args()
+
+    if args.files:
+        files = args.files
+    else:
+        files = [
+            sorted(directory.glob('Publications-*.xlsx'))[-1]
+            for directory in sorted((ROOT_DIR / 'Testdaten').glob('BAG_xls_*'))
+        ]
+
+    print("\n" + "="*70)
+    print("⏱️  IMPORT BENCHMARK")
+    print("="*70)
+
+    if args.mode == 'reader':
+        run_reader_benchmark(files)
+    elif args.mode == 'normalize':
+        run_normalize_benchmark(files)
+    else:
+        run_import_benchmark(files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Spalten-Profile für Publikationsdateien
+Ordnet die Kopfzeile einer Datei über eine Header-Signatur einem
+versionierten Profil zu und prüft die Zuordnung an Beispielzeilen,
+bevor Daten geschrieben werden
+"""
+
+import hashlib
+import json
+import re
+
+
+MAPPING_FIELDS = ('product_number', 'description', 'category', 'unit', 'gtin', 'price')
+
+# Datumsangaben in Spaltennamen (z.B. 'Exf-Preis per 01.01.2025') ändern
+# sich mit jeder Datei und gehören nicht zur Signatur
+DATE_PATTERN = re.compile(r'\d{1,2}\.\d{1,2}\.\d{4}')
+DATE_PLACEHOLDER = '<Datum>'
+
+# Explizite Profile; bei einer Änderung der Zuordnung die Version erhöhen,
+# damit gespeicherte Zuordnungen neu erkannt werden
+PROFILES = (
+    {
+        'name': 'bag_publications',
+        'version': 2,
+        'columns': {
+            'product_number': 'Swissmedic-Nr.',
+            'description': 'Bezeichnung',
+            'category': 'Therap. Gruppe',
+            # Keine eigene Packungsspalte, die Packung steht in der Bezeichnung
+            # ('Swissmedic-Liste' ist die Abgabekategorie A-E)
+            'unit': None,
+            'gtin': 'GTIN',
+            'price': f'Exf-Preis per {DATE_PLACEHOLDER}',
+        },
+    },
+)
+
+# Abgabekategorien der Spalte 'Swissmedic-Liste', die frühere Zuordnungen
+# als Einheit gespeichert haben
+SWISSMEDIC_LISTS = ('A', 'B', 'C', 'D', 'E')
+
+# Version der heuristischen Erkennung (detect_column_mapping)
+HEURISTIC_PROFILE = 'heuristic'
+HEURISTIC_VERSION = 2
+
+# Anzahl Zeilen für die Plausibilitätsprüfung und Mindestanteil passender Werte
+SNIFF_ROWS = 50
+SNIFF_MIN_SHARE = 0.9
+
+NUMBER_PATTERN = re.compile(r'^\d{4,10}(\.0)?$')
+GTIN_PATTERN = re.compile(r'^\d{8,14}$')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+
+def normalize_header(column):
+    """Bereinigt einen Spaltennamen (Leerraum, Datumsangaben)."""
+    if column is None:
+        return ''
+    text = ' '.join(str(column).split())
+    return DATE_PATTERN.sub(DATE_PLACEHOLDER, text)
+
+
+def header_signature(header):
+    """
+    Berechnet die Signatur einer Kopfzeile.
+
+    Args:
+        header (tuple): Spaltennamen
+
+    Returns:
+        str: SHA-256 der bereinigten Spaltennamen (hex)
+    """
+    normalized = '\x1f'.join(normalize_header(column) for column in header)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def current_versions():
+    """Liefert die aktuelle Version jedes Profils (inkl. Heuristik)."""
+    versions = {profile['name']: profile['version'] for profile in PROFILES}
+    versions[HEURISTIC_PROFILE] = HEURISTIC_VERSION
+    return versions
+
+
+def match_profile(header):
+    """
+    Sucht ein explizites Profil, dessen Spalten alle in der Kopfzeile vorkommen.
+
+    Args:
+        header (tuple): Spaltennamen
+
+    Returns:
+        tuple: (profile, positions) oder (None, None); positions = Feld → Spaltenindex
+    """
+    normalized = [normalize_header(column) for column in header]
+
+    for profile in PROFILES:
+        positions = {}
+        for field in MAPPING_FIELDS:
+            column = profile['columns'].get(field)
+            if column is None:
+                positions[field] = None
+            elif column in normalized:
+                positions[field] = normalized.index(column)
+            else:
+                break
+        else:
+            return profile, positions
+
+    return None, None
+
+
+def _is_number(value):
+    """Prüft, ob ein Zellwert als Zahl lesbar ist."""
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_code(value):
+    """Kurzer Code ohne Datum (Kategorie); '07.02.30.' ist ein Code."""
+    return len(value) <= 20 and not DATE_PATTERN.search(value)
+
+
+# Erwarteter Inhalt je Feld (geprüft werden nur nicht-leere Zellen);
+# die Einheit ist Freitext ('Fl 100 ml', 'Stk') und wird nicht geprüft
+FIELD_CHECKS = {
+    'product_number': lambda value: bool(NUMBER_PATTERN.match(value)),
+    'description': lambda value: bool(LETTER_PATTERN.search(value)) and not _is_number(value),
+    'category': _is_code,
+    'gtin': lambda value: bool(GTIN_PATTERN.match(value)),
+    'price': _is_number,
+}
+
+
+def sniff_mapping(positions, sample_rows):
+    """
+    Prüft eine Zuordnung anhand von Beispielzeilen.
+
+    Args:
+        positions (dict): Feld → Spaltenindex (oder None)
+        sample_rows (list): Erste Datenzeilen der Datei
+
+    Returns:
+        list: Beschreibungen unplausibler Zuordnungen (leer = in Ordnung)
+    """
+    problems = []
+
+    for field, position in positions.items():
+        check = FIELD_CHECKS.get(field)
+        if position is None or check is None:
+            continue
+
+        values = []
+        for row in sample_rows:
+            if position < len(row) and row[position] is not None:
+                text = str(row[position]).strip()
+                if text:
+                    values.append(text)
+
+        if not values:
+            if field in ('product_number', 'price'):
+                problems.append(f"{field}: keine Werte in den ersten {len(sample_rows)} Zeilen")
+            continue
+
+        matches = sum(1 for value in values if check(value))
+        if matches < len(values) * SNIFF_MIN_SHARE:
+            example = next(value for value in values if not check(value))
+            problems.append(
+                f"{field}: nur {matches}/{len(values)} Werte passen (z.B. '{example[:30]}')"
+            )
+
+    return problems
+
+
+def load_known_mappings(cursor):
+    """
+    Liest gespeicherte Zuordnungen, deren Profil-Version noch aktuell ist.
+
+    Args:
+        cursor: SQLite Cursor
+
+    Returns:
+        dict: Signatur → {'profile', 'version', 'positions'}
+    """
+    versions = current_versions()
+    known = {}
+    for signature, profile, version, positions in cursor.execute(
+        "SELECT signature, profile, version, positions FROM mapping_profiles"
+    ):
+        if versions.get(profile) == version:
+            known[signature] = {
+                'profile': profile,
+                'version': version,
+                'positions': json.loads(positions),
+            }
+    return known
+
+
+def clear_swissmedic_units(cursor):
+    """
+    Entfernt Abgabekategorien, die frühere Importe als Einheit gespeichert haben.
+
+    Args:
+        cursor: SQLite Cursor
+
+    Returns:
+        int: Anzahl bereinigter Produkte
+    """
+    placeholders = ', '.join('?' * len(SWISSMEDIC_LISTS))
+    cursor.execute(
+        f"UPDATE products SET unit = NULL WHERE unit IN ({placeholders})", SWISSMEDIC_LISTS
+    )
+    return cursor.rowcount
+
+
+def save_mapping(cursor, signature, entry, header):
+    """
+    Speichert eine neu erkannte Zuordnung.
+
+    Args:
+        cursor: SQLite Cursor
+        signature (str): Header-Signatur
+        entry (dict): {'profile', 'version', 'positions'}
+        header (tuple): Kopfzeile (zur Diagnose mitgespeichert)
+    """
+    cursor.execute("""
+        INSERT OR REPLACE INTO mapping_profiles (signature, profile, version, positions, header)
+        VALUES (?, ?, ?, ?, ?)
+    """, (
+        signature,
+        entry['profile'],
+        entry['version'],
+        json.dumps(entry['positions']),
+        json.dumps([normalize_header(column) for column in header], ensure_ascii=False),
+    ))
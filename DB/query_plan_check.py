@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Query-Plan Prüfung
+Prüft per EXPLAIN QUERY PLAN, dass alle SQL-Abfragen der Flask-App
+(mediprice_app/app.py) einen Index nutzen statt Tabellen zu scannen
+"""
+
+import argparse
+import ast
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Füge Root-Verzeichnis zum Python-Pfad hinzu
+SCRIPT_DIR = Path(__file__).parent.resolve()
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+APP_FILE = ROOT_DIR / 'mediprice_app' / 'app.py'
+
+# Kleine Tabellen, bei denen ein Scan unproblematisch ist
+SMALL_TABLES = {'db_meta', 'import_manifest'}
+
+# Kommentar in einer Abfrage, der einen Tabellen-Scan bewusst erlaubt
+SCAN_OK_MARKER = '-- scan-ok'
+
+# Anweisungen mit Query-Plan (PRAGMAs u.ä. werden nicht geprüft)
+QUERY_PATTERN = re.compile(r'^\s*(?:--[^\n]*\n\s*)*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+def extract_queries(app_file=APP_FILE):
+    """
+    Sucht alle konstanten SQL-Strings, die an execute() übergeben werden.
+
+    Args:
+        app_file (Path): Python-Datei
+
+    Returns:
+        list: Tupel (Funktionsname, Zeilennummer, SQL)
+    """
+    tree = ast.parse(Path(app_file).read_text(encoding='utf-8'))
+    queries = []
+
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        for node in ast.walk(function):
+            if (isinstance(node, ast.Call)
+                    and isinstance(node.func, ast.Attribute)
+                    and node.func.attr == 'execute'
+                    and node.args
+                    and isinstance(node.args[0], ast.Constant)
+                    and isinstance(node.args[0].value, str)
+                    and QUERY_PATTERN.match(node.args[0].value)):
+                queries.append((function.name, node.lineno, node.args[0].value))
+
+    return queries
+
+
+def count_parameters(sql):
+    """Anzahl Parameter einer Abfrage (? oder nummeriert ?1, ?2, ...)."""
+    numbered = [int(number) for number in re.findall(r'\?(\d+)', sql)]
+    if numbered:
+        return max(numbered)
+    return sql.count('?')
+
+
+def copy_statistics(db_path, source_path=None):
+    """
+    Überträgt Planer-Statistiken in eine Datenbank mit leerem Schema.
+
+    Übernommen werden die Zeilen aus sqlite_stat1 der Quelldatenbank
+    unverändert (nur für Tabellen und Indizes, die es im Ziel gibt), auch
+    veraltete Werte: der Plan soll dem der echten Datenbank entsprechen.
+    Ohne Quelle bleibt das Schema ohne Statistiken, SQLite plant dann mit
+    seinen Standardannahmen.
+
+    Args:
+        db_path (str): Zieldatenbank (frisches Schema)
+        source_path (str): Datenbank mit Statistiken (optional)
+
+    Returns:
+        str: Herkunft der Statistiken
+    """
+    stats = []
+    if source_path and os.path.exists(source_path):
+        source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+        try:
+            stats = source.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+        except sqlite3.OperationalError:
+            stats = []
+        finally:
+            source.close()
+    if not stats:
+        return 'keine (Standardannahmen von SQLite)'
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    conn.execute("DELETE FROM sqlite_stat1")
+    conn.executemany(
+        "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)",
+        [row for row in stats if row[0] in names and (row[1] is None or row[1] in names)]
+    )
+    conn.commit()
+    conn.close()
+    return source_path
+
+
+def find_table_scans(plan):
+    """
+    Ermittelt Tabellen-Scans in einem Query-Plan.
+
+    Nur SEARCH-Schritte gelten als Indexzugriff. Ein SCAN liest alle Zeilen,
+    auch mit USING (COVERING) INDEX, und wird beanstandet. Ausgenommen sind
+    Unterabfragen und CTEs (CO-ROUTINE/MATERIALIZE), konstante Zeilen,
+    virtuelle Tabellen mit Bedingung (MATCH, json_each) und die SMALL_TABLES.
+
+    Args:
+        plan (list): Zeilen aus EXPLAIN QUERY PLAN
+
+    Returns:
+        list: Beschreibungen der beanstandeten Plan-Schritte
+    """
+    subqueries = set()
+    for row in plan:
+        match = re.match(r'(?:CO-ROUTINE|MATERIALIZE) (\S+)', row[-1])
+        if match:
+            subqueries.add(match.group(1))
+
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = re.match(r'SCAN (\S+)', detail)
+        if not match:
+            continue
+        name = match.group(1)
+        if detail == 'SCAN CONSTANT ROW' or name.startswith('(subquery'):
+            continue
+        if name in subqueries or name in SMALL_TABLES:
+            continue
+        # Virtuelle Tabellen (FTS5, json_each) lesen nur ohne Bedingung alles:
+        # "INDEX 0:" ist ein voller Scan, "INDEX 0:M2" (MATCH) oder "INDEX 1:" nicht
+        if 'VIRTUAL TABLE INDEX' in detail and not detail.endswith('VIRTUAL TABLE INDEX 0:'):
+            continue
+        scans.append(detail)
+    return scans
+
+
+def check_query_plans(db_path, app_file=APP_FILE):
+    """
+    Prüft die Query-Pläne aller Abfragen der App.
+
+    Args:
+        db_path (str): Datenbank mit aktuellem Schema
+        app_file (Path): Python-Datei mit den Abfragen
+
+    Returns:
+        list: Tupel (Funktionsname, Zeilennummer, Problem) für jede Abfrage ohne Index
+    """
+    conn = sqlite3.connect(db_path)
+    problems = []
+
+    for function_name, lineno, sql in extract_queries(app_file):
+        if SCAN_OK_MARKER in sql:
+            print(f"  ⏭️  {function_name}:{lineno} (Scan erlaubt)")
+            continue
+
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * count_parameters(sql)).fetchall()
+        except sqlite3.Error as e:
+            if 'no such table' in str(e):
+                # z.B. noch nicht migrierte Datenbank; die App hat dafür einen Fallback
+                print(f"  ⚠️  {function_name}:{lineno} übersprungen ({e})")
+                continue
+            problems.append((function_name, lineno, f"Fehler: {e}"))
+            print(f"  ❌ {function_name}:{lineno} Fehler: {e}")
+            continue
+
+        scans = find_table_scans(plan)
+        if scans:
+            problems.append((function_name, lineno, ', '.join(scans)))
+            print(f"  ❌ {function_name}:{lineno} {', '.join(scans)}")
+        else:
+            print(f"  ✅ {function_name}:{lineno}")
+
+    conn.close()
+    return problems
+
+
+def main():
+    """
+    Hauptfunktion: prüft gegen die angegebene Datenbank oder ein frisch
+    angelegtes Schema mit den Statistiken der konfigurierten Datenbank.
+    """
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN Prüfung der App-Abfragen")
+    parser.add_argument('--db', dest='db_path',
+                        help="Bestehende Datenbank prüfen (Standard: frisches Schema)")
+    parser.add_argument('--stats-from', dest='stats_path',
+                        help="Statistiken für das frische Schema aus dieser Datenbank "
+                             "(Standard: konfigurierte Datenbank, sonst keine)")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("🔍 QUERY-PLAN PRÜFUNG")
+    print("="*70)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db_path
+        if db_path is None:
+            from db_diagnose_fix import create_tables, get_db_path
+            db_path = os.path.join(tmp_dir, 'schema.db')
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    create_tables(db_path)
+                finally:
+                    sys.stdout = stdout
+            origin = copy_statistics(db_path, args.stats_path or get_db_path())
+            print(f"Statistiken: {origin}")
+
+        print(f"Datenbank: {db_path}\n")
+        problems = check_query_plans(db_path)
+
+    print()
+    if problems:
+        print(f"❌ {len(problems)} Abfrage(n) ohne Index")
+        sys.exit(1)
+    print("✅ Alle Abfragen nutzen einen Index\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+String-Pool für den Import
+Interniert Texte dateiübergreifend: im Prozess über einen gemeinsamen
+Cache für Shared Strings, in der Datenbank über die Tabelle strings
+(string → id), auf die Textspalten per ID verweisen
+"""
+
+# Obergrenze für den prozessweiten Shared-Strings-Cache (Anzahl Einträge)
+SHARED_STRING_CACHE_LIMIT = 500000
+
+# Texte pro Nachschlage-Abfrage (WHERE value IN (...)); unter dem Limit
+# von 999 Parametern älterer SQLite-Versionen
+LOOKUP_CHUNK_SIZE = 500
+
+
+class SharedStringCache(dict):
+    """
+    Prozessweiter Cache für Shared Strings aus mehreren Workbooks.
+
+    Gleiche Texte aus verschiedenen Monatsdateien werden auf dasselbe
+    str-Objekt abgebildet, damit sie nur einmal im Speicher liegen. Wird
+    die Obergrenze erreicht, beginnt der Cache von vorn.
+    """
+
+    def __init__(self, limit=SHARED_STRING_CACHE_LIMIT):
+        super().__init__()
+        self.limit = limit
+
+    def canonical(self, value):
+        """
+        Liefert das gemeinsame Objekt für einen Text.
+
+        Args:
+            value (str): Frisch dekodierter Text
+
+        Returns:
+            str: Gleicher Text, ggf. als bereits bekanntes Objekt
+        """
+        cached = self.get(value)
+        if cached is not None:
+            return cached
+        if len(self) >= self.limit:
+            self.clear()
+        self[value] = value
+        return value
+
+
+class StringInterner:
+    """Bildet Texte auf IDs der Tabelle strings ab und legt fehlende an."""
+
+    def __init__(self, cursor):
+        """
+        Initialisiert den Interner.
+
+        Args:
+            cursor: SQLite Cursor (Tabelle strings muss existieren)
+        """
+        self.cursor = cursor
+        self._ids = {}
+
+    def intern(self, value):
+        """
+        Liefert die ID eines Textes (legt ihn bei Bedarf an).
+
+        Args:
+            value (str): Text
+
+        Returns:
+            int: strings.id
+        """
+        return self.intern_many([value])[0]
+
+    def intern_many(self, values):
+        """
+        Liefert die IDs mehrerer Texte; unbekannte Texte werden in einem
+        Durchgang eingefügt (INSERT OR IGNORE) und danach blockweise über
+        den Index auf strings.value nachgeschlagen.
+
+        Args:
+            values (list): Texte
+
+        Returns:
+            list: strings.id in derselben Reihenfolge
+        """
+        ids = self._ids
+        missing = list(dict.fromkeys(value for value in values if value not in ids))
+
+        if missing:
+            self.cursor.executemany(
+                "INSERT OR IGNORE INTO strings (value) VALUES (?)",
+                ((value,) for value in missing)
+            )
+            for start in range(0, len(missing), LOOKUP_CHUNK_SIZE):
+                chunk = missing[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                ids.update((value, string_id) for string_id, value in self.cursor.execute(
+                    f"SELECT id, value FROM strings WHERE value IN ({placeholders})", chunk
+                ))
+
+        return [ids[value] for value in values]
+
+    def reset(self):
+        """Verwirft den Cache (z.B. nach einem Rollback)."""
+        self._ids.clear()
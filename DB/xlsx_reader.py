@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Streaming XLSX Reader für Publications-Dateien
+Liest einzelne Tabellenblätter zeilenweise direkt aus dem ZIP-Archiv,
+ohne das ganze Workbook in ein DataFrame zu laden.
+"""
+
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_DOC_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+TAG_SHEET = NS_MAIN + 'sheet'
+TAG_SHEET_DATA = NS_MAIN + 'sheetData'
+TAG_ROW = NS_MAIN + 'row'
+TAG_VALUE = NS_MAIN + 'v'
+TAG_TEXT = NS_MAIN + 't'
+TAG_RUN = NS_MAIN + 'r'
+TAG_INLINE = NS_MAIN + 'is'
+TAG_SI = NS_MAIN + 'si'
+
+INT_PATTERN = re.compile(r'-?\d+')
+
+
+def column_index(cell_ref):
+    """
+    Wandelt eine Zellreferenz (z.B. 'AB12') in einen 0-basierten Spaltenindex um.
+
+    Args:
+        cell_ref (str): Zellreferenz
+
+    Returns:
+        int: Spaltenindex
+    """
+    index = 0
+    for char in cell_ref:
+        if char.isdigit():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def number_text(raw):
+    """
+    Wandelt einen numerischen Zellwert in Schlüssel-Text um.
+
+    '53662013' bleibt unverändert, '53662013.0' und '7.680536620137E12'
+    werden zu ganzzahligem Text ohne Nachkommastellen.
+
+    Args:
+        raw (str): Inhalt des <v>-Elements
+
+    Returns:
+        str: Ziffernfolge (oder raw, falls keine ganze Zahl)
+    """
+    if INT_PATTERN.fullmatch(raw):
+        return raw
+    try:
+        value = float(raw)
+    except ValueError:
+        return raw
+    return str(int(value)) if value.is_integer() else raw
+
+
+def _element_text(element):
+    """Setzt den Text eines <si>- oder <is>-Elements zusammen (ohne Phonetik)."""
+    parts = []
+    for child in element:
+        if child.tag == TAG_TEXT:
+            parts.append(child.text or '')
+        elif child.tag == TAG_RUN:
+            text = child.find(TAG_TEXT)
+            if text is not None:
+                parts.append(text.text or '')
+    return ''.join(parts)
+
+
+class XlsxStreamReader:
+    """Liest XLSX-Tabellenblätter als Strom von Tupeln."""
+
+    def __init__(self, filepath, string_cache=None):
+        """
+        Öffnet das Workbook.
+
+        Args:
+            filepath (str): Pfad zur XLSX-Datei
+            string_cache (SharedStringCache): Dateiübergreifender Cache, über
+                den gleiche Shared Strings dasselbe Objekt erhalten (optional)
+        """
+        self.filepath = filepath
+        self.string_cache = string_cache
+        self.zip = zipfile.ZipFile(filepath)
+        self._sheets = None
+        self._shared_strings = []
+        self._shared_strings_iter = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Schließt das ZIP-Archiv."""
+        if self._shared_strings_iter is not None:
+            self._shared_strings_iter.close()
+            self._shared_strings_iter = None
+        self.zip.close()
+
+    def sheet_names(self):
+        """Gibt die Namen der Tabellenblätter in Workbook-Reihenfolge zurück."""
+        return list(self._sheet_index())
+
+    def _sheet_index(self):
+        """Ermittelt die Zuordnung Sheet-Name → ZIP-Member (einmalig)."""
+        if self._sheets is None:
+            targets = {}
+            with self.zip.open('xl/_rels/workbook.xml.rels') as rels:
+                for _, elem in iterparse(rels):
+                    if elem.tag == NS_PKG_REL + 'Relationship':
+                        target = elem.get('Target')
+                        if target.startswith('/'):
+                            target = target.lstrip('/')
+                        else:
+                            target = posixpath.normpath(posixpath.join('xl', target))
+                        targets[elem.get('Id')] = target
+
+            self._sheets = {}
+            with self.zip.open('xl/workbook.xml') as workbook:
+                for _, elem in iterparse(workbook):
+                    if elem.tag == TAG_SHEET:
+                        rel_id = elem.get(NS_DOC_REL + 'id')
+                        self._sheets[elem.get('name')] = targets[rel_id]
+        return self._sheets
+
+    def _iter_shared_strings(self):
+        """Liest sharedStrings.xml inkrementell, Eintrag für Eintrag."""
+        try:
+            stream = self.zip.open('xl/sharedStrings.xml')
+        except KeyError:
+            return
+        with stream:
+            for _, elem in iterparse(stream):
+                if elem.tag == TAG_SI:
+                    yield _element_text(elem)
+                    elem.clear()
+
+    def shared_string(self, index):
+        """
+        Löst einen Shared-String-Index auf.
+
+        Die Tabelle wird nur so weit geparst, wie bisher Indizes angefragt
+        wurden, und bleibt danach für weitere Sheets im Speicher.
+
+        Args:
+            index (int): Index in sharedStrings.xml
+
+        Returns:
+            str: Zeichenkette
+        """
+        strings = self._shared_strings
+        if index >= len(strings):
+            if self._shared_strings_iter is None:
+                self._shared_strings_iter = self._iter_shared_strings()
+            canonical = self.string_cache.canonical if self.string_cache is not None else None
+            for value in self._shared_strings_iter:
+                strings.append(canonical(value) if canonical else value)
+                if index < len(strings):
+                    break
+            else:
+                raise IndexError(f"Shared String {index} nicht vorhanden")
+        return strings[index]
+
+    def _cell_value(self, cell, as_text=False):
+        """
+        Konvertiert ein <c>-Element in einen Python-Wert.
+
+        Mit as_text werden Zahlen als Text geliefert (Schlüsselspalten wie
+        Swissmedic-Nr. oder GTIN), statt als int/float.
+        """
+        cell_type = cell.get('t')
+
+        if cell_type == 'inlineStr':
+            inline = cell.find(TAG_INLINE)
+            value = _element_text(inline) if inline is not None else ''
+            return value or None
+
+        raw = cell.findtext(TAG_VALUE)
+        if raw is None:
+            return None
+
+        if cell_type == 's':
+            return self.shared_string(int(raw)) or None
+        if cell_type == 'b':
+            return raw == '1'
+        if cell_type in ('str', 'e'):
+            return raw or None
+
+        if as_text:
+            return number_text(raw)
+        if INT_PATTERN.fullmatch(raw):
+            return int(raw)
+        return float(raw)
+
+    def iter_rows(self, sheet_name, text_columns=None):
+        """
+        Liefert die Zeilen eines Tabellenblatts als Tupel.
+
+        Leere Zellen werden als None geliefert, fehlende Zeilen übersprungen.
+        Bereits verarbeitete Zeilen werden sofort wieder freigegeben.
+
+        Args:
+            sheet_name (str): Name des Tabellenblatts
+            text_columns (set): Spaltenindizes, deren Zahlen als Text gelesen
+                werden; die Menge kann nach dem Lesen der Kopfzeile noch
+                ergänzt werden
+
+        Yields:
+            tuple: Zellwerte der Zeile
+        """
+        sheets = self._sheet_index()
+        if sheet_name not in sheets:
+            raise ValueError(f"Sheet '{sheet_name}' nicht gefunden")
+
+        with self.zip.open(sheets[sheet_name]) as stream:
+            sheet_data = None
+            for event, elem in iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == TAG_SHEET_DATA:
+                        sheet_data = elem
+                    continue
+
+                if elem.tag != TAG_ROW:
+                    continue
+
+                values = []
+                for cell in elem:
+                    ref = cell.get('r')
+                    if ref:
+                        position = column_index(ref)
+                        if position > len(values):
+                            values.extend([None] * (position - len(values)))
+                    values.append(self._cell_value(
+                        cell, bool(text_columns) and len(values) in text_columns
+                    ))
+
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+                if any(value is not None for value in values):
+                    yield tuple(values)
@@ -2,15 +2,18 @@
 # app.py - Haupt-Applikation
 # =============================================================================
 
-from flask import Flask, render_template, request, jsonify, url_for
+from flask import Flask, render_template, request, jsonify, url_for, g, stream_with_context
+import base64
 import sqlite3
-import matplotlib
-matplotlib.use('Agg')  # Für Server-Nutzung ohne Display
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime
+import glob
+import hashlib
+import json
 import os
+import queue
+import re
 import sys
+import time
+from datetime import date
 from pathlib import Path
 
 # Bestimme Root-Verzeichnis absolut
@@ -20,6 +23,9 @@ ROOT_DIR = SCRIPT_DIR.parent
 # Füge Root zum Python-Pfad hinzu
 sys.path.insert(0, str(ROOT_DIR))
 
+from chart_renderer import PriceChartRenderer
+from price_analytics import PriceArchive
+
 # Versuche Config zu importieren
 try:
     from config import Config
@@ -37,13 +43,27 @@ app = Flask(__name__)
 if USE_CONFIG:
     app.config['DATABASE'] = str(Config.DB_PATH)
     app.config['PLOT_FOLDER'] = str(Config.FLASK_PLOT_FOLDER)
+    app.config['CHART_MODE'] = Config.FLASK_CHART_MODE
+    app.config['CHART_POOL_SIZE'] = Config.FLASK_CHART_POOL_SIZE
+    app.config['CHART_PROCESSES'] = Config.FLASK_CHART_PROCESSES
+    app.config['DASHBOARD_TTL'] = Config.FLASK_DASHBOARD_TTL
     app.config['SECRET_KEY'] = Config.FLASK_SECRET_KEY
+    app.config['DB_POOL_SIZE'] = Config.DB_POOL_SIZE
+    app.config['DB_CACHE_SIZE_MB'] = Config.DB_CACHE_SIZE_MB
+    app.config['DB_MMAP_SIZE_MB'] = Config.DB_MMAP_SIZE_MB
     Config.validate()
 else:
     # Fallback: Absolute Pfade
     app.config['DATABASE'] = str(SCRIPT_DIR / 'publications.db')
     app.config['PLOT_FOLDER'] = str(SCRIPT_DIR / 'static' / 'plots')
+    app.config['CHART_MODE'] = 'server'
+    app.config['CHART_POOL_SIZE'] = 4
+    app.config['CHART_PROCESSES'] = 0
+    app.config['DASHBOARD_TTL'] = 60
     app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
+    app.config['DB_POOL_SIZE'] = 8
+    app.config['DB_CACHE_SIZE_MB'] = 64
+    app.config['DB_MMAP_SIZE_MB'] = 256
     
     # Erstelle Plot-Ordner
     os.makedirs(app.config['PLOT_FOLDER'], exist_ok=True)
@@ -60,43 +80,293 @@ if os.path.exists(app.config['DATABASE']):
 print(f"Plot-Ordner:     {app.config['PLOT_FOLDER']}")
 print(f"{'='*70}\n")
 
+# Diagramm-Renderer (Figure-Pool, optional Prozess-Pool)
+chart_renderer = PriceChartRenderer(
+    pool_size=app.config['CHART_POOL_SIZE'],
+    processes=app.config['CHART_PROCESSES']
+)
 
-def get_db_connection():
-    """Erstellt Datenbankverbindung."""
-    conn = sqlite3.connect(app.config['DATABASE'])
+
+# Pool offener Verbindungen pro Datenbank-Pfad
+_connection_pools = {}
+
+
+def open_db_connection(db_path):
+    """
+    Öffnet eine neue Datenbankverbindung mit Lese-Einstellungen.
+    
+    Die Verbindung wird im Pool wiederverwendet, daher bleiben Page-Cache,
+    Memory-Map und die vorbereiteten Statements (cached_statements) über
+    Requests hinweg erhalten.
+    
+    Args:
+        db_path (str): Pfad zur Datenbank
+    
+    Returns:
+        sqlite3.Connection: Verbindung
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    
+    try:
+        # WAL: Lesende Requests blockieren einen laufenden Import nicht
+        conn.execute('PRAGMA journal_mode = WAL')
+    except sqlite3.OperationalError:
+        pass  # z.B. schreibgeschützte Datei
+    
+    conn.execute(f"PRAGMA mmap_size = {app.config['DB_MMAP_SIZE_MB'] * 1024 * 1024}")
+    conn.execute(f"PRAGMA cache_size = -{app.config['DB_CACHE_SIZE_MB'] * 1024}")
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA query_only = ON')
     return conn
 
 
-def search_products(query):
+def get_db_connection():
+    """
+    Liefert die Datenbankverbindung des aktuellen Requests.
+    
+    Pro Request wird eine Verbindung aus dem Pool entnommen (oder neu
+    geöffnet) und in flask.g abgelegt. Nach dem Request gibt
+    release_db_connection sie an den Pool zurück.
+    """
+    if 'db' not in g:
+        db_path = app.config['DATABASE']
+        pool = _connection_pools.setdefault(db_path, queue.LifoQueue())
+        try:
+            g.db = pool.get_nowait()
+        except queue.Empty:
+            g.db = open_db_connection(db_path)
+        g.db_path = db_path
+    return g.db
+
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    """Gibt die Verbindung des Requests an den Pool zurück."""
+    conn = g.pop('db', None)
+    if conn is None:
+        return
+    
+    pool = _connection_pools[g.pop('db_path')]
+    if pool.qsize() < app.config['DB_POOL_SIZE']:
+        pool.put(conn)
+    else:
+        conn.close()
+
+
+# Seitengrösse der Suche (Keyset-Paginierung über product_number)
+SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_PAGE_SIZE = 500
+
+
+def build_fts_query(query):
+    """
+    Wandelt einen Suchbegriff in eine FTS5 MATCH-Abfrage um.
+    
+    Jedes Wort wird als Präfix gesucht ("3tc filmt" → "3tc"* "filmt"*),
+    alle Wörter müssen vorkommen. Sonderzeichen der FTS-Syntax werden so
+    nie als Operatoren interpretiert.
+    
+    Args:
+        query (str): Suchbegriff
+    
+    Returns:
+        str: MATCH-Ausdruck oder None wenn kein Wort enthalten ist
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def build_number_query(query):
+    """
+    Erkennt Nummern-Suchen (Produktnummer oder GTIN) für den Trigram-Index.
+    
+    Leerzeichen, Punkte und Bindestriche werden entfernt. Der Trigram-
+    Tokenizer benötigt mindestens 3 Zeichen für einen Teilstring-Treffer.
+    
+    Args:
+        query (str): Suchbegriff
+    
+    Returns:
+        str: MATCH-Ausdruck oder None wenn der Begriff keine Nummer ist
+    """
+    digits = re.sub(r'[\s.\-]', '', query)
+    if len(digits) < 3 or not digits.isdigit():
+        return None
+    return f'"{digits}"'
+
+
+def search_products(query, after=None, limit=SEARCH_PAGE_SIZE):
     """
     Sucht Produkte basierend auf Suchbegriff.
     
+    Nummern werden zuerst exakt per Gleichheit über idx_products_number
+    und idx_products_gtin gesucht (zwei Gleichheitssuchen per UNION, der
+    Suchbegriff per CROSS JOIN als äussere Schleife: ein OR oder eine
+    veraltete Statistik zu gtin führt der Planer sonst als Scan über alle
+    Produkte aus), ohne Treffer als Teilstring über den Trigram-Index
+    products_trigram; Text über den Volltextindex products_fts. Fehlt der
+    Index (Datenbank noch nicht migriert), wird auf die LIKE-Suche
+    zurückgefallen.
+    
+    Die Abfragen gehen von der Treffermenge des Index aus (CROSS JOIN legt
+    sie als äussere Schleife fest), ein seltener Suchbegriff kostet so nur
+    seine wenigen Treffer. Textsuchen sind nach bm25-Relevanz sortiert,
+    Nummernsuchen nach product_number; bei gleicher Relevanz entscheidet
+    die Produktnummer. Geblättert wird per Keyset ab dem Sortierschlüssel
+    after (siehe search_key); jede Seite sortiert dafür alle Treffer.
+    
     Args:
         query (str): Suchbegriff
+        after (tuple): Sortierschlüssel des letzten Treffers der vorherigen
+            Seite (None = Anfang)
+        limit (int): Maximale Anzahl Treffer
     
     Returns:
         list: Gefundene Produkte
     """
+    fts_query = build_fts_query(query)
+    if fts_query is None:
+        return []
+    
+    after_rank, after_number = after or (None, '')
+    number_query = build_number_query(query)
     conn = get_db_connection()
     
-    # Suche in Produktnummer und Beschreibung
-    products = conn.execute('''
-        SELECT DISTINCT p.*, 
-               pr.price as current_price,
-               pr.valid_from as current_valid_from
-        FROM products p
-        LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
-        WHERE p.product_number LIKE ? 
-           OR p.description LIKE ?
-        ORDER BY p.product_number
-        LIMIT 50
-    ''', (f'%{query}%', f'%{query}%')).fetchall()
+    try:
+        if number_query is not None:
+            number = number_query.strip('"')
+            products = conn.execute('''
+                SELECT p.*,
+                       pr.price as current_price,
+                       pr.valid_from as current_valid_from
+                FROM (SELECT ?1 AS value) k
+                CROSS JOIN products p ON p.product_number = k.value
+                LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+                UNION
+                SELECT p.*,
+                       pr.price as current_price,
+                       pr.valid_from as current_valid_from
+                FROM (SELECT ?1 AS value) k
+                CROSS JOIN products p ON p.gtin = k.value
+                LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+                ORDER BY product_number
+            ''', (number,)).fetchall()
+            
+            # Exakte Treffer (wenige) ohne Cursor abfragen, damit Folgeseiten
+            # nicht auf die Teilstring-Suche ausweichen
+            if products:
+                return [product for product in products
+                        if product['product_number'] > after_number][:limit]
+            
+            products = conn.execute('''
+                SELECT p.*,
+                       pr.price as current_price,
+                       pr.valid_from as current_valid_from
+                FROM products_trigram t
+                CROSS JOIN products p ON p.id = t.rowid
+                LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+                WHERE products_trigram MATCH ?
+                  AND p.product_number > ?
+                ORDER BY p.product_number
+                LIMIT ?
+            ''', (number_query, after_number, limit)).fetchall()
+        else:
+            products = conn.execute('''
+                SELECT p.*,
+                       pr.price as current_price,
+                       pr.valid_from as current_valid_from,
+                       m.rank as search_rank
+                FROM (
+                    SELECT rowid, bm25(products_fts) AS rank
+                    FROM products_fts
+                    WHERE products_fts MATCH ?1
+                ) m
+                CROSS JOIN products p ON p.id = m.rowid
+                LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+                WHERE ?2 IS NULL OR (m.rank, p.product_number) > (?2, ?3)
+                ORDER BY m.rank, p.product_number
+                LIMIT ?4
+            ''', (fts_query, after_rank, after_number, limit)).fetchall()
+    except sqlite3.OperationalError:
+        # Suche in Produktnummer und Beschreibung
+        products = conn.execute('''
+            -- scan-ok: Fallback für Datenbanken ohne Volltextindex
+            SELECT DISTINCT p.*, 
+                   pr.price as current_price,
+                   pr.valid_from as current_valid_from
+            FROM products p
+            LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+            WHERE p.product_number > ?
+              AND (p.product_number LIKE ? 
+                   OR p.description LIKE ?)
+            ORDER BY p.product_number
+            LIMIT ?
+        ''', (after_number, f'%{query}%', f'%{query}%', limit)).fetchall()
     
-    conn.close()
     return products
 
 
+def search_key(product):
+    """
+    Sortierschlüssel eines Treffers für die Keyset-Paginierung.
+    
+    Returns:
+        tuple: (bm25-Relevanz oder None bei Nummernsuchen, Produktnummer)
+    """
+    rank = product['search_rank'] if 'search_rank' in product.keys() else None
+    return rank, product['product_number']
+
+
+def encode_cursor(key):
+    """Kodiert den Sortierschlüssel (search_key) als Cursor-Token (JSON, base64url)."""
+    data = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Dekodiert ein Cursor-Token aus encode_cursor.
+    
+    Args:
+        token (str): Cursor-Token
+    
+    Returns:
+        tuple: Sortierschlüssel oder None bei ungültigem Token
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        rank, product_number = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    
+    if rank is not None and not isinstance(rank, (int, float)):
+        return None
+    if not isinstance(product_number, str) or not product_number:
+        return None
+    return rank, product_number
+
+
+def search_page(query, after=None, limit=SEARCH_PAGE_SIZE):
+    """
+    Holt eine Seite Suchergebnisse samt Cursor für die nächste Seite.
+    
+    Args:
+        query (str): Suchbegriff
+        after (tuple): Sortierschlüssel aus dem Cursor (None = erste Seite)
+        limit (int): Seitengrösse
+    
+    Returns:
+        tuple: (Produkte, Cursor der nächsten Seite oder None)
+    """
+    products = search_products(query, after, limit + 1)
+    if len(products) <= limit:
+        return products, None
+    return products[:limit], encode_cursor(search_key(products[limit - 1]))
+
+
 def get_product_details(product_id):
     """
     Holt Details eines Produkts.
@@ -113,7 +383,6 @@ def get_product_details(product_id):
         SELECT * FROM products WHERE id = ?
     ''', (product_id,)).fetchone()
     
-    conn.close()
     return product
 
 
@@ -136,67 +405,187 @@ def get_price_history(product_id):
         ORDER BY valid_from ASC
     ''', (product_id,)).fetchall()
     
-    conn.close()
     return prices
 
 
-def create_price_chart(product_id, product_name):
+# Höchstzahl Schlüssel pro Sammelabfrage (as-of, Batch-Lookup)
+MAX_LOOKUP_KEYS = 5000
+
+
+def normalize_lookup_keys(keys):
+    """
+    Bereinigt Produktschlüssel (Produktnummer oder GTIN) einer Sammelabfrage.
+    
+    Args:
+        keys (list): Schlüssel (Text oder Zahl)
+    
+    Returns:
+        list: Eindeutige, nicht-leere Schlüssel in Eingabe-Reihenfolge
+    """
+    cleaned = (str(key).strip() for key in keys if key is not None)
+    return list(dict.fromkeys(key for key in cleaned if key))
+
+
+def get_prices_as_of(keys, as_of):
+    """
+    Holt den Preis vieler Produkte zu einem Stichtag.
+    
+    Alle Schlüssel werden als JSON-Array in einer einzigen Abfrage
+    übergeben (json_each, Parameter ?1). Produktnummer und GTIN werden in
+    zwei Zweigen mit je einem Gleichheits-Join aufgelöst und per UNION
+    zusammengeführt: Ein Join mit OR über beide Spalten plant SQLite bei
+    veralteten Statistiken als Scan von products pro Schlüssel. CROSS JOIN
+    legt json_each als äussere Schleife fest.
+    
+    Die letzte Preiszeile mit valid_from <= Stichtag (?2) liefern skalare
+    Unterabfragen über (product_id, valid_from); auf dem normalen Schema
+    ist das ein Rückwärts-Scan auf idx_prices_product_history, auf dem
+    kompakten Schema (View prices, ohne id) ein Zugriff über den
+    Primärschlüssel von prices_compact.
+    
+    Args:
+        keys (list): Produktnummern oder GTINs (bereinigt)
+        as_of (str): Stichtag 'YYYY-MM-DD'
+    
+    Returns:
+        list: Treffer mit key, Produktangaben und price/valid_from/valid_until
+            (price None, wenn das Produkt zum Stichtag noch keinen Preis hatte)
+    """
+    conn = get_db_connection()
+    
+    return conn.execute('''
+        SELECT k.value AS key, p.id, p.product_number, p.gtin, p.description,
+               (SELECT price FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS price,
+               (SELECT valid_from FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS valid_from,
+               (SELECT valid_until FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS valid_until
+        FROM json_each(?1) k
+        CROSS JOIN products p ON p.product_number = k.value
+        UNION
+        SELECT k.value AS key, p.id, p.product_number, p.gtin, p.description,
+               (SELECT price FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS price,
+               (SELECT valid_from FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS valid_from,
+               (SELECT valid_until FROM prices
+                WHERE product_id = p.id AND valid_from <= ?2
+                ORDER BY valid_from DESC LIMIT 1) AS valid_until
+        FROM json_each(?1) k
+        CROSS JOIN products p ON p.gtin = k.value
+        ORDER BY key, product_number
+    ''', (json.dumps(keys), as_of)).fetchall()
+
+
+def get_products_by_keys(keys):
+    """
+    Holt Details und aktuellen Preis vieler Produkte in einer Abfrage.
+    
+    Wie get_prices_as_of: Schlüssel als JSON-Array über json_each, je
+    Schlüssel ein Index-Lookup in products (Produktnummer und GTIN als zwei
+    Gleichheits-Joins, per UNION zusammengeführt); der aktuelle Preis kommt
+    über den partiellen Index idx_prices_current_product.
+    
+    Args:
+        keys (list): Produktnummern oder GTINs (bereinigt)
+    
+    Returns:
+        list: Treffer mit key, Produktspalten, current_price und current_valid_from
+    """
+    conn = get_db_connection()
+    
+    return conn.execute('''
+        SELECT k.value AS key, p.*,
+               pr.price as current_price,
+               pr.valid_from as current_valid_from
+        FROM json_each(?1) k
+        CROSS JOIN products p ON p.product_number = k.value
+        LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+        UNION
+        SELECT k.value AS key, p.*,
+               pr.price as current_price,
+               pr.valid_from as current_valid_from
+        FROM json_each(?1) k
+        CROSS JOIN products p ON p.gtin = k.value
+        LEFT JOIN prices pr ON p.id = pr.product_id AND pr.is_current = 1
+        ORDER BY key, product_number
+    ''', (json.dumps(keys),)).fetchall()
+
+
+def price_history_fingerprint(product_name, prices):
+    """
+    Berechnet einen Fingerabdruck über Titel und Preisverlauf.
+    
+    Ändert sich der Verlauf (neuer Import mit anderem Preis) oder die
+    Produktbezeichnung, ändert sich auch der Fingerabdruck und damit der
+    Dateiname des Diagramms.
+    
+    Args:
+        product_name (str): Produktname für Titel
+        prices (list): Preisverlauf
+    
+    Returns:
+        str: Hex-Fingerabdruck (12 Zeichen)
+    """
+    digest = hashlib.sha1(product_name.encode('utf-8'))
+    for price in prices:
+        digest.update(f"|{price['valid_from']}={price['price']}".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def create_price_chart(product_id, product_name, prices=None):
     """
     Erstellt Preisdiagramm für ein Produkt.
     
+    Das Diagramm wird unter price_history_{id}_{fingerprint}.png abgelegt.
+    Existiert die Datei bereits, ist sie noch aktuell und wird ohne neues
+    Rendern verwendet. Veraltete Diagramme des Produkts werden gelöscht.
+    
     Args:
         product_id (int): Produkt-ID
         product_name (str): Produktname für Titel
+        prices (list): Preisverlauf (wird sonst aus der DB geladen)
     
     Returns:
         str: Pfad zum generierten Diagramm
     """
-    prices = get_price_history(product_id)
+    if prices is None:
+        prices = get_price_history(product_id)
     
     if not prices:
         return None
     
-    # Daten vorbereiten
-    dates = []
-    price_values = []
+    fingerprint = price_history_fingerprint(product_name, prices)
+    filename = f'price_history_{product_id}_{fingerprint}.png'
+    filepath = os.path.join(app.config['PLOT_FOLDER'], filename)
     
-    for price in prices:
-        date_obj = datetime.strptime(price['valid_from'], '%Y-%m-%d')
-        dates.append(date_obj)
-        price_values.append(float(price['price']))
+    # Cache-Treffer: Verlauf unverändert seit dem letzten Rendern
+    if os.path.exists(filepath):
+        return filename
     
     # Diagramm erstellen
-    plt.figure(figsize=(12, 6))
-    plt.plot(dates, price_values, marker='o', linewidth=2, markersize=8)
-    
-    # Styling
-    plt.title(f'Preisverlauf: {product_name}', fontsize=16, fontweight='bold')
-    plt.xlabel('Datum', fontsize=12)
-    plt.ylabel('Preis (CHF)', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    
-    # Datumsformatierung
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-    plt.gcf().autofmt_xdate()
-    
-    # Preise an Datenpunkten anzeigen
-    for date, price in zip(dates, price_values):
-        plt.annotate(f'{price:.2f}', 
-                    xy=(date, price), 
-                    xytext=(0, 10),
-                    textcoords='offset points',
-                    ha='center',
-                    fontsize=9,
-                    bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
-    
-    plt.tight_layout()
-    
-    # Speichern
-    filename = f'price_history_{product_id}.png'
-    filepath = os.path.join(app.config['PLOT_FOLDER'], filename)
-    plt.savefig(filepath, dpi=100, bbox_inches='tight')
-    plt.close()
+    chart_renderer.render(
+        filepath,
+        product_name,
+        [price['valid_from'] for price in prices],
+        [price['price'] for price in prices]
+    )
+    
+    # Veraltete Diagramme dieses Produkts entfernen
+    stale_patterns = [f'price_history_{product_id}_*.png', f'price_history_{product_id}.png']
+    for pattern in stale_patterns:
+        for stale_path in glob.glob(os.path.join(app.config['PLOT_FOLDER'], pattern)):
+            if stale_path != filepath:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
     
     return filename
 
@@ -241,6 +630,143 @@ def calculate_price_statistics(prices):
     }
 
 
+def get_price_statistics(product_id, prices=None):
+    """
+    Holt die vorberechneten Preisstatistiken eines Produkts aus price_stats.
+    
+    Fehlt die Tabelle oder der Eintrag, werden die Statistiken aus dem
+    Preisverlauf berechnet.
+    
+    Args:
+        product_id (int): Produkt-ID
+        prices (list): Preisverlauf für den Fallback (wird sonst geladen)
+    
+    Returns:
+        dict: Statistiken
+    """
+    conn = get_db_connection()
+    
+    try:
+        row = conn.execute('''
+            SELECT min_price, max_price, avg_price, current_price,
+                   price_change, change_percent, price_count, last_change_date
+            FROM price_stats
+            WHERE product_id = ?
+        ''', (product_id,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    
+    if row is None:
+        if prices is None:
+            prices = get_price_history(product_id)
+        return calculate_price_statistics(prices)
+    
+    return {
+        'min': row['min_price'],
+        'max': row['max_price'],
+        'avg': row['avg_price'],
+        'current': row['current_price'],
+        'change': row['price_change'],
+        'change_percent': row['change_percent'],
+        'count': row['price_count'],
+        'last_change_date': row['last_change_date']
+    }
+
+
+# Zwischengespeicherte Dashboard-Kennzahlen pro Datenbank: (gültig bis, Werte)
+_dashboard_cache = {}
+
+
+def get_dashboard_stats():
+    """
+    Holt die Kennzahlen für die Startseite.
+    
+    Die Werte stammen aus db_meta (vom Importer gepflegt) und werden
+    DASHBOARD_TTL Sekunden im Prozess zwischengespeichert. Fehlt db_meta,
+    wird wie bisher direkt gezählt.
+    
+    Returns:
+        dict: product_count, price_count, latest_date, import_generation
+    """
+    db_path = app.config['DATABASE']
+    cached = _dashboard_cache.get(db_path)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    conn = get_db_connection()
+    
+    try:
+        meta = dict(conn.execute('SELECT key, value FROM db_meta').fetchall())
+    except sqlite3.OperationalError:
+        meta = {}
+    
+    if 'product_count' in meta:
+        stats = {
+            'product_count': meta['product_count'],
+            'price_count': meta['price_count'],
+            'latest_date': meta['latest_date'],
+            'import_generation': meta.get('import_generation')
+        }
+    else:
+        product_count, price_count, latest_date = conn.execute('''
+            -- scan-ok: Fallback ohne db_meta, Ergebnis wird zwischengespeichert
+            SELECT (SELECT COUNT(*) FROM products),
+                   (SELECT COUNT(*) FROM prices),
+                   (SELECT MAX(valid_from) FROM prices)
+        ''').fetchone()
+        stats = {
+            'product_count': product_count,
+            'price_count': price_count,
+            'latest_date': latest_date,
+            'import_generation': None
+        }
+    
+    _dashboard_cache[db_path] = (time.monotonic() + app.config['DASHBOARD_TTL'], stats)
+    return stats
+
+
+# Geladenes Preisarchiv pro Datenbank: (Import-Stand, PriceArchive)
+_archive_cache = {}
+
+MONTH_PATTERN = re.compile(r'^(\d{4})-(\d{2})$')
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def is_iso_date(value):
+    """Prüft, ob value ein gültiges Datum im Format YYYY-MM-DD ist."""
+    if not DATE_PATTERN.match(value):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def get_price_archive():
+    """
+    Liefert das Preisarchiv als Spalten für produktübergreifende Auswertungen.
+    
+    Das Archiv wird einmal pro Prozess geladen und erst neu geladen, wenn
+    sich der Import-Stand (import_generation, Anzahl Preise, letztes Datum
+    aus get_dashboard_stats) ändert.
+    
+    Returns:
+        PriceArchive: Archiv
+    """
+    db_path = app.config['DATABASE']
+    stats = get_dashboard_stats()
+    version = (stats['import_generation'], stats['price_count'], stats['latest_date'])
+    
+    cached = _archive_cache.get(db_path)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    archive = PriceArchive.load(get_db_connection())
+    _archive_cache[db_path] = (version, archive)
+    return archive
+
+
 # =============================================================================
 # Routes
 # =============================================================================
@@ -249,83 +775,265 @@ def calculate_price_statistics(prices):
 def index():
     """Startseite mit Suchfeld."""
     # Statistiken für Dashboard
-    conn = get_db_connection()
-    
-    product_count = conn.execute('SELECT COUNT(*) as count FROM products').fetchone()['count']
-    price_count = conn.execute('SELECT COUNT(*) as count FROM prices').fetchone()['count']
-    
-    # Neueste Preise
-    latest_date = conn.execute('''
-        SELECT MAX(valid_from) as latest FROM prices
-    ''').fetchone()['latest']
-    
-    conn.close()
+    stats = get_dashboard_stats()
     
     return render_template('index.html', 
-                         product_count=product_count,
-                         price_count=price_count,
-                         latest_date=latest_date)
+                         product_count=stats['product_count'],
+                         price_count=stats['price_count'],
+                         latest_date=stats['latest_date'])
 
 
 @app.route('/search')
 def search():
-    """Suchseite mit Ergebnissen."""
+    """Suchseite mit Ergebnissen (?cursor= für die nächste Seite)."""
     query = request.args.get('q', '')
+    cursor = request.args.get('cursor', '')
     
     if query:
-        results = search_products(query)
+        results, next_cursor = search_page(query, decode_cursor(cursor))
     else:
-        results = []
+        results, next_cursor = [], None
     
-    return render_template('search.html', query=query, results=results)
+    return render_template('search.html', query=query, results=results,
+                         cursor=cursor, next_cursor=next_cursor)
 
 
 @app.route('/product/<int:product_id>')
 def product_detail(product_id):
-    """Detailseite für ein Produkt mit Preisverlauf."""
+    """
+    Detailseite für ein Produkt mit Preisverlauf.
+    
+    Mit ?chart=client (oder FLASK_CHART_MODE=client) wird kein PNG
+    gerendert; der Browser zeichnet das Diagramm aus /api/product/<id>/prices.
+    """
     product = get_product_details(product_id)
     
     if not product:
         return "Produkt nicht gefunden", 404
     
     prices = get_price_history(product_id)
-    stats = calculate_price_statistics(prices)
+    stats = get_price_statistics(product_id, prices)
+    
+    chart_mode = request.args.get('chart', app.config['CHART_MODE'])
     
     # Diagramm erstellen
-    chart_filename = create_price_chart(
-        product_id, 
-        f"{product['product_number']} - {product['description']}"
-    )
+    if chart_mode == 'client':
+        chart_filename = None
+    else:
+        chart_filename = create_price_chart(
+            product_id, 
+            f"{product['product_number']} - {product['description']}",
+            prices
+        )
     
     return render_template('product_detail.html',
                          product=product,
                          prices=prices,
                          stats=stats,
+                         chart_mode=chart_mode,
                          chart_filename=chart_filename)
 
 
+def product_to_json(product):
+    """Wandelt ein Suchergebnis in ein JSON-Objekt um."""
+    return {
+        'id': product['id'],
+        'product_number': product['product_number'],
+        'gtin': product['gtin'] if 'gtin' in product.keys() else None,
+        'description': product['description'],
+        'category': product['category'],
+        'current_price': product['current_price']
+    }
+
+
 @app.route('/api/search')
 def api_search():
-    """API-Endpoint für Suche (für AJAX)."""
+    """
+    API-Endpoint für Suche (für AJAX).
+    
+    Liefert eine Seite (?limit=, Standard SEARCH_PAGE_SIZE) als JSON-Array.
+    Gibt es weitere Treffer, enthält die Antwort den Cursor der nächsten
+    Seite im Header X-Next-Cursor und als Link-Header (rel="next").
+    
+    Mit ?stream=1 (oder true/yes/on) werden die Treffer ab dem Cursor als NDJSON (ein
+    Produkt pro Zeile) gestreamt; der Server holt sie seitenweise per
+    Keyset, ohne die ganze Trefferliste im Speicher zu halten. limit ist
+    dort die Obergrenze für den ganzen Stream; ohne limit werden alle
+    Treffer gestreamt.
+    """
     query = request.args.get('q', '')
+    cursor = request.args.get('cursor', '')
+    limit = request.args.get('limit', type=int)
     
     if len(query) < 2:
         return jsonify([])
     
-    results = search_products(query)
+    after = decode_cursor(cursor) if cursor else None
+    if cursor and after is None:
+        return jsonify({'error': 'Ungültiger Cursor'}), 400
+    if limit is not None and not 1 <= limit <= MAX_SEARCH_PAGE_SIZE:
+        return jsonify({'error': f'limit muss zwischen 1 und {MAX_SEARCH_PAGE_SIZE} liegen'}), 400
     
-    # Konvertiere zu JSON
-    products_list = []
-    for product in results:
-        products_list.append({
-            'id': product['id'],
-            'product_number': product['product_number'],
-            'description': product['description'],
-            'category': product['category'],
-            'current_price': product['current_price']
-        })
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes', 'on'):
+        def generate(after, remaining):
+            while remaining is None or remaining > 0:
+                page_size = MAX_SEARCH_PAGE_SIZE
+                if remaining is not None:
+                    page_size = min(remaining, page_size)
+                products = search_products(query, after, page_size)
+                for product in products:
+                    yield json.dumps(product_to_json(product), ensure_ascii=False) + '\n'
+                if len(products) < page_size:
+                    return
+                if remaining is not None:
+                    remaining -= len(products)
+                after = search_key(products[-1])
+        
+        return app.response_class(stream_with_context(generate(after, limit)),
+                                  mimetype='application/x-ndjson')
     
-    return jsonify(products_list)
+    limit = limit or SEARCH_PAGE_SIZE
+    results, next_cursor = search_page(query, after, limit)
+    
+    response = jsonify([product_to_json(product) for product in results])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_url = url_for('api_search', q=query, cursor=next_cursor, limit=limit)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+
+@app.route('/api/product/<int:product_id>/prices')
+def api_product_prices(product_id):
+    """
+    API-Endpoint für den Preisverlauf eines Produkts (für Client-Diagramme).
+    
+    Liefert die Reihe spaltenweise ({"dates": [...], "prices": [...]}).
+    Das ETag ist der Fingerabdruck des Verlaufs; bei unverändertem Verlauf
+    antwortet der Endpoint auf If-None-Match mit 304.
+    """
+    prices = get_price_history(product_id)
+    
+    if not prices and not get_product_details(product_id):
+        return jsonify({'error': 'Produkt nicht gefunden'}), 404
+    
+    response = jsonify({
+        'product_id': product_id,
+        'dates': [price['valid_from'] for price in prices],
+        'prices': [price['price'] for price in prices]
+    })
+    response.set_etag(price_history_fingerprint(str(product_id), prices))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@app.route('/api/prices/as-of', methods=['GET', 'POST'])
+def api_prices_as_of():
+    """
+    API-Endpoint: Preise vieler Produkte zu einem Stichtag.
+    
+    GET  ?date=YYYY-MM-DD&keys=<Nr>,<GTIN>,...
+    POST {"date": "YYYY-MM-DD", "keys": [...]} (für lange Listen)
+    
+    Schlüssel sind Produktnummern oder GTINs, höchstens MAX_LOOKUP_KEYS.
+    """
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        as_of = payload.get('date')
+        keys = payload.get('keys')
+    else:
+        as_of = request.args.get('date')
+        keys = request.args.get('keys', '').split(',')
+    
+    if not isinstance(as_of, str) or not is_iso_date(as_of):
+        return jsonify({'error': 'Parameter date im Format YYYY-MM-DD erwartet'}), 400
+    if not isinstance(keys, list):
+        return jsonify({'error': 'Parameter keys als Liste erwartet'}), 400
+    
+    keys = normalize_lookup_keys(keys)
+    if not keys:
+        return jsonify({'error': 'Keine Schlüssel angegeben'}), 400
+    if len(keys) > MAX_LOOKUP_KEYS:
+        return jsonify({'error': f'Höchstens {MAX_LOOKUP_KEYS} Schlüssel pro Anfrage'}), 400
+    
+    rows = get_prices_as_of(keys, as_of)
+    found = {row['key'] for row in rows}
+    
+    return jsonify({
+        'date': as_of,
+        'count': len(rows),
+        'prices': [dict(row) for row in rows],
+        'not_found': [key for key in keys if key not in found]
+    })
+
+
+@app.route('/api/products/batch', methods=['POST'])
+def api_products_batch():
+    """
+    API-Endpoint: Details und aktueller Preis vieler Produkte.
+    
+    POST {"keys": [...]} mit Produktnummern oder GTINs (höchstens
+    MAX_LOOKUP_KEYS) ersetzt einzelne /api/search-Aufrufe pro Produkt.
+    """
+    payload = request.get_json(silent=True) or {}
+    keys = payload.get('keys')
+    
+    if not isinstance(keys, list):
+        return jsonify({'error': 'Parameter keys als Liste erwartet'}), 400
+    
+    keys = normalize_lookup_keys(keys)
+    if not keys:
+        return jsonify({'error': 'Keine Schlüssel angegeben'}), 400
+    if len(keys) > MAX_LOOKUP_KEYS:
+        return jsonify({'error': f'Höchstens {MAX_LOOKUP_KEYS} Schlüssel pro Anfrage'}), 400
+    
+    rows = get_products_by_keys(keys)
+    found = {row['key'] for row in rows}
+    
+    return jsonify({
+        'count': len(rows),
+        'products': [dict(row) for row in rows],
+        'not_found': [key for key in keys if key not in found]
+    })
+
+
+@app.route('/api/analytics/changes')
+def api_analytics_changes():
+    """API-Endpoint: alle Preisänderungen eines Monats (?month=YYYY-MM)."""
+    match = MONTH_PATTERN.match(request.args.get('month', ''))
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return jsonify({'error': 'Parameter month im Format YYYY-MM erwartet'}), 400
+    
+    changes = get_price_archive().price_changes(int(match.group(1)), int(match.group(2)))
+    return jsonify({'month': match.group(0), 'count': len(changes), 'changes': changes})
+
+
+@app.route('/api/analytics/decreases')
+def api_analytics_decreases():
+    """
+    API-Endpoint: grösste Preissenkungen je therapeutischer Gruppe.
+    
+    Parameter: n (pro Gruppe, Standard 10), from/to (YYYY-MM-DD, Standard
+    ganzes Archiv), level (Ebenen des IT-Codes, Standard 1).
+    """
+    start = request.args.get('from')
+    end = request.args.get('to')
+    for value in (start, end):
+        if value is not None and not is_iso_date(value):
+            return jsonify({'error': 'Datum im Format YYYY-MM-DD erwartet'}), 400
+    
+    n = request.args.get('n', 10, type=int)
+    level = request.args.get('level', 1, type=int)
+    if not 1 <= n <= 100 or not 1 <= level <= 4:
+        return jsonify({'error': 'n (1-100) oder level (1-4) ungültig'}), 400
+    
+    return jsonify(get_price_archive().top_decreases(n, start, end, level))
+
+
+@app.route('/api/analytics/index')
+def api_analytics_index():
+    """API-Endpoint: verketteter Preisindex (optional ?group=<Anfang IT-Code>)."""
+    return jsonify(get_price_archive().price_index(request.args.get('group')))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,186 @@
+# =============================================================================
+# chart_renderer.py - Preisdiagramme ohne pyplot
+# =============================================================================
+"""
+Rendert Preisdiagramme mit matplotlib.figure.Figure und FigureCanvasAgg.
+
+Im Gegensatz zur pyplot-API gibt es keinen globalen Zustand (aktuelle
+Figure/Achse), daher können mehrere Threads gleichzeitig rendern, solange
+jeder eine eigene Figure verwendet. PriceChartRenderer hält dafür einen
+kleinen Pool wiederverwendbarer Figures und kann das Rendern optional an
+einen Prozess-Pool abgeben.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import DateFormatter, MonthLocator
+from matplotlib.figure import Figure
+
+
+FIGURE_SIZE = (12, 6)
+DPI = 100
+
+# Figure des aktuellen Worker-Prozesses (nur im Prozess-Pool genutzt)
+_process_figure = None
+
+
+def create_figure():
+    """
+    Erstellt eine Figure samt Agg-Canvas und Achse.
+
+    Returns:
+        Figure: Figure mit genau einer Achse
+    """
+    figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+    FigureCanvasAgg(figure)
+    figure.add_subplot(1, 1, 1)
+    return figure
+
+
+def draw_price_chart(figure, title, dates, prices):
+    """
+    Zeichnet einen Preisverlauf in eine (wiederverwendete) Figure.
+
+    Args:
+        figure (Figure): Figure aus create_figure
+        title (str): Diagrammtitel
+        dates (list): Datumswerte als 'YYYY-MM-DD'
+        prices (list): Preise
+    """
+    ax = figure.axes[0]
+    ax.clear()
+
+    date_values = [datetime.strptime(date, '%Y-%m-%d') for date in dates]
+    price_values = [float(price) for price in prices]
+
+    ax.plot(date_values, price_values, marker='o', linewidth=2, markersize=8)
+
+    # Styling
+    ax.set_title(f'Preisverlauf: {title}', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Datum', fontsize=12)
+    ax.set_ylabel('Preis (CHF)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    # Datumsformatierung
+    ax.xaxis.set_major_formatter(DateFormatter('%b %Y'))
+    ax.xaxis.set_major_locator(MonthLocator(interval=1))
+    figure.autofmt_xdate()
+
+    # Preise an Datenpunkten anzeigen
+    for date, price in zip(date_values, price_values):
+        ax.annotate(f'{price:.2f}',
+                    xy=(date, price),
+                    xytext=(0, 10),
+                    textcoords='offset points',
+                    ha='center',
+                    fontsize=9,
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
+
+    figure.tight_layout()
+
+
+def save_figure(figure, filepath):
+    """
+    Speichert eine Figure als PNG.
+
+    Es wird zuerst in eine temporäre Datei geschrieben und diese dann
+    umbenannt, damit parallele Requests nie eine halbe Datei sehen.
+
+    Args:
+        figure (Figure): Gezeichnete Figure
+        filepath (str): Zielpfad
+    """
+    temp_path = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+    figure.savefig(temp_path, dpi=DPI, bbox_inches='tight', format='png')
+    os.replace(temp_path, filepath)
+
+
+def render_in_process(filepath, title, dates, prices):
+    """
+    Rendert ein Diagramm in einem Worker-Prozess.
+
+    Jeder Worker behält seine Figure für weitere Aufträge.
+    """
+    global _process_figure
+    if _process_figure is None:
+        _process_figure = create_figure()
+
+    draw_price_chart(_process_figure, title, dates, prices)
+    save_figure(_process_figure, filepath)
+    return filepath
+
+
+class PriceChartRenderer:
+    """Thread-sicherer Renderer für Preisdiagramme mit Figure-Pool."""
+
+    def __init__(self, pool_size=4, processes=0):
+        """
+        Initialisiert den Renderer.
+
+        Args:
+            pool_size (int): Maximale Anzahl gehaltener Figures (Threads)
+            processes (int): Anzahl Worker-Prozesse (0 = im aufrufenden Thread)
+        """
+        self.pool_size = pool_size
+        self.processes = processes
+        self._figures = queue.LifoQueue()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _acquire_figure(self):
+        """Entnimmt eine Figure aus dem Pool oder erstellt eine neue."""
+        try:
+            return self._figures.get_nowait()
+        except queue.Empty:
+            return create_figure()
+
+    def _release_figure(self, figure):
+        """Gibt eine Figure an den Pool zurück (oder verwirft sie)."""
+        if self._figures.qsize() < self.pool_size:
+            self._figures.put(figure)
+
+    def _get_executor(self):
+        """Startet den Prozess-Pool beim ersten Gebrauch."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            return self._executor
+
+    def render(self, filepath, title, dates, prices):
+        """
+        Rendert einen Preisverlauf als PNG.
+
+        Args:
+            filepath (str): Zielpfad
+            title (str): Diagrammtitel
+            dates (list): Datumswerte als 'YYYY-MM-DD'
+            prices (list): Preise
+
+        Returns:
+            str: Zielpfad
+        """
+        if self.processes > 0:
+            future = self._get_executor().submit(
+                render_in_process, filepath, title, list(dates), list(prices)
+            )
+            return future.result()
+
+        figure = self._acquire_figure()
+        try:
+            draw_price_chart(figure, title, dates, prices)
+            save_figure(figure, filepath)
+        finally:
+            self._release_figure(figure)
+        return filepath
+
+    def shutdown(self):
+        """Beendet den Prozess-Pool (falls gestartet)."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -19,13 +19,16 @@ class Config:
     # Datenbank
     DB_PATH = ROOT_DIR / os.getenv('DB_PATH', 'publications.db')
     DB_BACKUP_PATH = ROOT_DIR / os.getenv('DB_BACKUP_PATH', 'DB/backups')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+    DB_CACHE_SIZE_MB = int(os.getenv('DB_CACHE_SIZE_MB', '64'))
+    DB_MMAP_SIZE_MB = int(os.getenv('DB_MMAP_SIZE_MB', '256'))
     
     # Testdaten
     TESTDATA_PATH = ROOT_DIR / os.getenv('TESTDATA_PATH', 'Testdaten/BAG_xls_yyyy')
     EXCEL_FILE_PATTERN = os.getenv('EXCEL_FILE_PATTERN', 'Publications-*.xlsx')
     
     # Excel Import
-    EXCEL_SHEET_NAME = os.getenv('EXCEL_SHEET_NAME', 'Publication')
+    EXCEL_SHEET_NAME = os.getenv('EXCEL_SHEET_NAME', 'Publications')
     BATCH_SIZE = int(os.getenv('BATCH_SIZE', '1000'))
     
     # Flask
@@ -34,6 +37,10 @@ class Config:
     FLASK_SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
     FLASK_PORT = int(os.getenv('FLASK_PORT', '5000'))
     FLASK_PLOT_FOLDER = ROOT_DIR / os.getenv('FLASK_PLOT_FOLDER', 'static/plots')
+    FLASK_CHART_MODE = os.getenv('FLASK_CHART_MODE', 'server')  # server | client
+    FLASK_CHART_POOL_SIZE = int(os.getenv('FLASK_CHART_POOL_SIZE', '4'))
+    FLASK_CHART_PROCESSES = int(os.getenv('FLASK_CHART_PROCESSES', '0'))
+    FLASK_DASHBOARD_TTL = int(os.getenv('FLASK_DASHBOARD_TTL', '60'))
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -74,5 +81,6 @@ class Config:
         print(f"Excel Pattern:         {cls.EXCEL_FILE_PATTERN}")
         print(f"Flask Port:            {cls.FLASK_PORT}")
         print(f"Flask Plot Folder:     {cls.FLASK_PLOT_FOLDER}")
+        print(f"Flask Chart Mode:      {cls.FLASK_CHART_MODE}")
         print(f"Environment:           {cls.FLASK_ENV}")
         print("="*70 + "\n")
\ No newline at end of file
@@ -0,0 +1,313 @@
+# =============================================================================
+# price_analytics.py - Auswertungen über das ganze Preisarchiv
+# =============================================================================
+"""
+Hält das Preisarchiv als NumPy-Spalten im Speicher und beantwortet
+produktübergreifende Fragen (Preisänderungen eines Monats, grösste
+Preissenkungen je therapeutischer Gruppe, Preisindex) vektorisiert,
+statt pro Produkt eine SQL-Abfrage abzusetzen.
+
+Die Zeilen von prices werden nach (product_id, valid_from) sortiert
+geladen und daraus eine dichte Matrix Produkt × Publikationstag aufgebaut
+(NaN = nicht gelistet); alle Auswertungen sind Spaltenoperationen auf
+dieser Matrix. Publikationstage und Speichermodus (db_meta price_mode)
+vermerkt der Importer.
+"""
+
+import sqlite3
+
+import numpy as np
+
+
+# Speichermodus mit Intervallen (--change-only), siehe db_diagnose_fix
+PRICE_MODE_CHANGE_ONLY = 'change_only'
+
+# Ebenen des IT-Codes (Therap. Gruppe, z.B. '08.03.') für die Gruppierung
+DEFAULT_GROUP_LEVEL = 1
+GROUP_LEVEL_WIDTH = 3
+
+
+def to_days(values):
+    """Wandelt ISO-Daten ('YYYY-MM-DD', None) in Tage seit 1970 um (None = -1)."""
+    days = np.array([value or 'NaT' for value in values], dtype='datetime64[D]')
+    result = days.astype(np.int64)
+    result[np.isnat(days)] = -1
+    return result
+
+
+def to_dates(days):
+    """Wandelt Tage seit 1970 in ISO-Daten um."""
+    return np.datetime_as_string(np.asarray(days).astype('datetime64[D]')).tolist()
+
+
+def group_key(category, level):
+    """Kürzt einen IT-Code auf die ersten level Ebenen ('08.03.' → '08.')."""
+    return (category or '')[:level * GROUP_LEVEL_WIDTH]
+
+
+class PriceArchive:
+    """Preisarchiv als Spalten (product_id, day, price) und Preis-Matrix."""
+
+    def __init__(self, products, rows, publications=(), change_only=False):
+        """
+        Args:
+            products (list): (id, product_number, description, category) nach id sortiert
+            rows (list): (product_id, valid_from, valid_until, price) nach
+                product_id, valid_from sortiert
+            publications (list): Publikationstage ('YYYY-MM-DD'), auch solche
+                ohne eigene Preiszeile (Intervall-Modus ohne Preisänderung)
+            change_only (bool): Preise als Intervalle gespeichert (--change-only)
+        """
+        self.product_ids = np.array([row[0] for row in products], dtype=np.int64)
+        self.product_numbers = [row[1] for row in products]
+        self.descriptions = [row[2] for row in products]
+        self.categories = [row[3] for row in products]
+
+        # Spalten des Archivs, sortiert nach Produkt und Datum
+        self.product_id = np.array([row[0] for row in rows], dtype=np.int64)
+        self.day = to_days([row[1] for row in rows])
+        self.until = to_days([row[2] for row in rows])
+        self.price = np.array([row[3] for row in rows], dtype=np.float64)
+        self.change_only = change_only
+
+        self.dates = np.unique(np.concatenate((self.day, to_days(publications))))
+        self.matrix = self._build_matrix()
+
+    @classmethod
+    def load(cls, conn):
+        """
+        Lädt das Archiv aus der Datenbank.
+
+        Args:
+            conn (sqlite3.Connection): Verbindung
+
+        Returns:
+            PriceArchive: Archiv
+        """
+        products = conn.execute('''
+            -- scan-ok: lädt alle Produkte
+            SELECT id, product_number, description, category
+            FROM products
+            ORDER BY id
+        ''').fetchall()
+        rows = conn.execute('''
+            -- scan-ok: lädt das ganze Archiv
+            SELECT product_id, valid_from, valid_until, price
+            FROM prices
+            ORDER BY product_id, valid_from
+        ''').fetchall()
+
+        # Ältere Datenbanken ohne Eintrag wurden pro Publikation importiert
+        try:
+            mode = conn.execute("SELECT value FROM db_meta WHERE key = 'price_mode'").fetchone()
+            publications = [row[0] for row in conn.execute('''
+                -- scan-ok: alle importierten Dateien
+                SELECT DISTINCT valid_from FROM import_manifest WHERE valid_from IS NOT NULL
+            ''')]
+        except sqlite3.OperationalError:
+            mode, publications = None, []
+
+        change_only = mode is not None and mode[0] == PRICE_MODE_CHANGE_ONLY
+        return cls(products, rows, publications, change_only)
+
+    def _build_matrix(self):
+        """
+        Baut die Matrix Produkt × Publikationstag.
+
+        Im normalen Import schreibt jede Publikation eine Zeile pro gelistetem
+        Produkt; eine Zeile gilt dann nur für ihren eigenen Publikationstag.
+        Ein offenes Intervall (valid_until NULL) heisst dort nicht "weiterhin
+        gelistet": Der Importer schliesst die Zeile eines Produkts, das aus
+        der Liste fällt, nie ab.
+
+        Im Intervall-Modus (--change-only) gibt es neue Zeilen nur bei
+        Preisänderungen; eine Zeile gilt dann ab valid_from bis zur nächsten
+        Zeile des Produkts, höchstens bis valid_until. Ältere Datenbanken
+        enthalten Intervalle mit valid_until <= valid_from (Import in falscher
+        Reihenfolge); dort wird valid_until ignoriert.
+
+        Die Bereiche werden ohne Python-Schleife über np.repeat in Zeilen-/
+        Spaltenindizes aufgelöst.
+        """
+        matrix = np.full((len(self.product_ids), len(self.dates)), np.nan)
+        if not len(self.day):
+            return matrix
+
+        rows = np.searchsorted(self.product_ids, self.product_id)
+        start = np.searchsorted(self.dates, self.day)
+
+        if not self.change_only:
+            lengths = np.ones(len(start), dtype=np.int64)
+        else:
+            same_product = self.product_id[1:] == self.product_id[:-1]
+            open_end = np.iinfo(np.int64).max
+            end_day = np.where(self.until > self.day, self.until, open_end)
+            end_day[:-1] = np.where(
+                same_product, np.minimum(end_day[:-1], self.day[1:]), end_day[:-1]
+            )
+            lengths = np.searchsorted(self.dates, end_day) - start
+
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        columns = np.arange(lengths.sum()) - offsets + np.repeat(start, lengths)
+        matrix[np.repeat(rows, lengths), columns] = np.repeat(self.price, lengths)
+        return matrix
+
+    def column_at(self, date):
+        """
+        Liefert den Spaltenindex der letzten Publikation bis zum Datum.
+
+        Args:
+            date (str): Datum 'YYYY-MM-DD' (None = letzte Publikation)
+
+        Returns:
+            int: Spaltenindex oder -1, wenn das Datum vor dem Archiv liegt
+        """
+        if date is None:
+            return len(self.dates) - 1
+        return int(np.searchsorted(self.dates, to_days([date])[0], side='right')) - 1
+
+    def group_mask(self, prefix):
+        """Maske der Produkte, deren IT-Code mit prefix beginnt (None = alle)."""
+        if not prefix:
+            return np.ones(len(self.product_ids), dtype=bool)
+        return np.array([(category or '').startswith(prefix) for category in self.categories])
+
+    def _product(self, index):
+        """Produktangaben einer Matrix-Zeile."""
+        return {
+            'id': int(self.product_ids[index]),
+            'product_number': self.product_numbers[index],
+            'description': self.descriptions[index],
+            'category': self.categories[index],
+        }
+
+    def price_changes(self, year, month):
+        """
+        Alle Preisänderungen mit Publikationstag im angegebenen Monat.
+
+        Args:
+            year (int): Jahr
+            month (int): Monat
+
+        Returns:
+            list: Änderungen (Produkt, Datum, alter/neuer Preis, Prozent),
+                nach prozentualer Änderung sortiert
+        """
+        month_start = np.datetime64(f'{year:04d}-{month:02d}', 'M')
+        first = month_start.astype('datetime64[D]').astype(np.int64)
+        last = (month_start + 1).astype('datetime64[D]').astype(np.int64)
+        columns = np.nonzero((self.dates >= first) & (self.dates < last))[0]
+        columns = columns[columns > 0]
+
+        old = self.matrix[:, columns - 1]
+        new = self.matrix[:, columns]
+        changed = np.isfinite(old) & np.isfinite(new) & (old != new) & (old > 0)
+        rows, positions = np.nonzero(changed)
+
+        old = old[rows, positions]
+        new = new[rows, positions]
+        percent = (new - old) / old * 100
+        dates = to_dates(self.dates[columns[positions]])
+
+        changes = []
+        for order in np.argsort(percent, kind='stable'):
+            changes.append(dict(
+                self._product(rows[order]),
+                date=dates[order],
+                old_price=float(old[order]),
+                new_price=float(new[order]),
+                change_percent=round(float(percent[order]), 2),
+            ))
+        return changes
+
+    def top_decreases(self, n=10, start=None, end=None, level=DEFAULT_GROUP_LEVEL):
+        """
+        Die n grössten Preissenkungen je therapeutischer Gruppe.
+
+        Verglichen wird der Preis zur letzten Publikation bis start mit dem
+        zur letzten Publikation bis end; Produkte, die zu einem der beiden
+        Zeitpunkte nicht gelistet waren, fallen weg.
+
+        Args:
+            n (int): Anzahl Produkte pro Gruppe
+            start (str): Anfangsdatum (None = erste Publikation)
+            end (str): Enddatum (None = letzte Publikation)
+            level (int): Ebenen des IT-Codes für die Gruppe
+
+        Returns:
+            dict: {'from', 'to', 'groups': {Gruppe: [Senkungen]}}
+        """
+        first = 0 if start is None else max(self.column_at(start), 0)
+        last = self.column_at(end)
+        if last < 0 or not len(self.dates):
+            return {'from': None, 'to': None, 'groups': {}}
+
+        old = self.matrix[:, first]
+        new = self.matrix[:, last]
+        with np.errstate(invalid='ignore'):
+            decreased = np.isfinite(old) & np.isfinite(new) & (old > 0) & (new < old)
+        rows = np.nonzero(decreased)[0]
+        percent = (new[rows] - old[rows]) / old[rows] * 100
+
+        keys = np.array([group_key(self.categories[row], level) for row in rows], dtype=str)
+        order = np.lexsort((percent, keys))
+        sorted_keys = keys[order]
+
+        # Rang innerhalb der Gruppe: Position minus Beginn der Gruppe
+        rank = np.arange(len(order)) - np.searchsorted(sorted_keys, sorted_keys, side='left')
+
+        groups = {}
+        for position in np.nonzero(rank < n)[0]:
+            index = order[position]
+            row = rows[index]
+            groups.setdefault(str(sorted_keys[position]), []).append(dict(
+                self._product(row),
+                old_price=float(old[row]),
+                new_price=float(new[row]),
+                change_percent=round(float(percent[index]), 2),
+            ))
+
+        return {
+            'from': to_dates(self.dates[[first]])[0],
+            'to': to_dates(self.dates[[last]])[0],
+            'groups': groups,
+        }
+
+    def price_index(self, prefix=None):
+        """
+        Verketteter Preisindex (Basis erste Publikation = 100).
+
+        Pro Publikationstag wird das geometrische Mittel der Preisverhältnisse
+        aller Produkte gebildet, die an diesem und dem vorherigen Tag gelistet
+        waren (Jevons); neu aufgenommene oder gestrichene Produkte verzerren
+        den Index dadurch nicht. Zusätzlich wird der Durchschnittspreis der
+        gelisteten Produkte geliefert.
+
+        Args:
+            prefix (str): Nur Produkte dieser Gruppe (Anfang des IT-Codes)
+
+        Returns:
+            dict: {'dates', 'index', 'average_price', 'products'}
+        """
+        matrix = self.matrix[self.group_mask(prefix)]
+        listed = np.isfinite(matrix) & (matrix > 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.log(matrix[:, 1:] / matrix[:, :-1])
+        both = listed[:, 1:] & listed[:, :-1]
+        counts = both.sum(axis=0)
+        sums = np.where(both, ratios, 0.0).sum(axis=0)
+        steps = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        index = 100 * np.exp(np.concatenate(([0.0], np.cumsum(steps))))
+
+        totals = np.where(listed, matrix, 0.0).sum(axis=0)
+        products = listed.sum(axis=0)
+        average = np.divide(totals, products, out=np.full_like(totals, np.nan), where=products > 0)
+
+        return {
+            'dates': to_dates(self.dates),
+            'index': np.round(index, 2).tolist(),
+            'average_price': [None if np.isnan(value) else round(float(value), 2)
+                              for value in average],
+            'products': products.tolist(),
+        }
@@ -0,0 +1,104 @@
+/*
+ * Preisverlauf im Browser zeichnen
+ * Lädt die Preisreihe von /api/product/<id>/prices (Spalten "dates" und
+ * "prices") und zeichnet sie als Liniendiagramm auf ein <canvas>.
+ */
+
+function drawPriceChart(canvas, dates, prices) {
+    const ctx = canvas.getContext('2d');
+    const ratio = window.devicePixelRatio || 1;
+    const width = canvas.clientWidth;
+    const height = canvas.clientHeight;
+
+    canvas.width = width * ratio;
+    canvas.height = height * ratio;
+    ctx.scale(ratio, ratio);
+    ctx.clearRect(0, 0, width, height);
+
+    const pad = {left: 70, right: 30, top: 30, bottom: 50};
+    const plotWidth = width - pad.left - pad.right;
+    const plotHeight = height - pad.top - pad.bottom;
+
+    const times = dates.map(d => new Date(d + 'T00:00:00').getTime());
+    const minTime = Math.min(...times);
+    const maxTime = Math.max(...times);
+    let minPrice = Math.min(...prices);
+    let maxPrice = Math.max(...prices);
+    const margin = (maxPrice - minPrice) * 0.1 || Math.max(maxPrice * 0.05, 1);
+    minPrice -= margin;
+    maxPrice += margin;
+
+    const x = t => pad.left + (maxTime === minTime ? plotWidth / 2
+        : (t - minTime) / (maxTime - minTime) * plotWidth);
+    const y = p => pad.top + (maxPrice - p) / (maxPrice - minPrice) * plotHeight;
+
+    // Raster und Achsenbeschriftung
+    ctx.font = '12px Segoe UI, sans-serif';
+    ctx.strokeStyle = 'rgba(0, 0, 0, 0.1)';
+    ctx.fillStyle = '#666';
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    for (let i = 0; i <= 5; i++) {
+        const price = minPrice + (maxPrice - minPrice) * i / 5;
+        ctx.beginPath();
+        ctx.moveTo(pad.left, y(price));
+        ctx.lineTo(width - pad.right, y(price));
+        ctx.stroke();
+        ctx.fillText(price.toFixed(2), pad.left - 8, y(price));
+    }
+
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    const step = Math.max(1, Math.ceil(times.length / 12));
+    times.forEach((t, i) => {
+        if (i % step === 0 || i === times.length - 1) {
+            const label = new Date(t).toLocaleDateString('de-CH', {month: 'short', year: 'numeric'});
+            ctx.fillText(label, x(t), height - pad.bottom + 8);
+        }
+    });
+
+    ctx.save();
+    ctx.translate(16, pad.top + plotHeight / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.fillText('Preis (CHF)', 0, 0);
+    ctx.restore();
+
+    // Preislinie
+    ctx.strokeStyle = '#667eea';
+    ctx.lineWidth = 2;
+    ctx.beginPath();
+    times.forEach((t, i) => {
+        if (i === 0) {
+            ctx.moveTo(x(t), y(prices[i]));
+        } else {
+            ctx.lineTo(x(t), y(prices[i]));
+        }
+    });
+    ctx.stroke();
+
+    // Datenpunkte mit Preis
+    ctx.fillStyle = '#667eea';
+    ctx.textBaseline = 'bottom';
+    times.forEach((t, i) => {
+        ctx.beginPath();
+        ctx.arc(x(t), y(prices[i]), 4, 0, 2 * Math.PI);
+        ctx.fill();
+        if (i === 0 || prices[i] !== prices[i - 1]) {
+            ctx.fillStyle = '#333';
+            ctx.fillText(prices[i].toFixed(2), x(t), y(prices[i]) - 8);
+            ctx.fillStyle = '#667eea';
+        }
+    });
+}
+
+function loadPriceChart(canvas) {
+    fetch(canvas.dataset.url)
+        .then(response => response.json())
+        .then(series => {
+            if (series.dates.length > 0) {
+                drawPriceChart(canvas, series.dates, series.prices);
+            }
+        });
+}
+
+document.querySelectorAll('canvas[data-price-chart]').forEach(loadPriceChart);
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests für die Sammelabfragen der App (Stichtag-Preise, Batch-Lookup, Preisreihe,
+Such-Stream) auf dem normalen und dem kompakten Schema (prices als View ohne id)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / 'DB'))
+sys.path.insert(0, str(ROOT_DIR / 'mediprice_app'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as mediprice_app
+    from compact_schema import build_compact_database
+    from db_diagnose_fix import create_tables
+
+
+PRODUCTS = [
+    (1, '11111001', 'Alpha, Tabl 10 mg, 30 Stk', '01.01.', '7680111110011'),
+    (2, '22222001', 'Beta, Tabl 20 mg, 30 Stk', '02.01.', '7680222220011'),
+]
+
+# (product_id, price, valid_from, valid_until, source_file, is_current)
+PRICES = [
+    (1, 10.0, '2024-01-01', '2024-02-01', 'Publications-20240101.xlsx', 0),
+    (1, 9.5, '2024-02-01', '2024-03-01', 'Publications-20240201.xlsx', 0),
+    (1, 8.0, '2024-03-01', None, 'Publications-20240301.xlsx', 1),
+    (2, 20.0, '2024-02-01', None, 'Publications-20240201.xlsx', 1),
+]
+
+
+def build_database(db_path):
+    """Erstellt eine Datenbank mit aktuellem Schema und den Testdaten."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (id, product_number, description, category, gtin) "
+        "VALUES (?, ?, ?, ?, ?)", PRODUCTS
+    )
+    conn.executemany(
+        "INSERT INTO prices (product_id, price, valid_from, valid_until, source_file, is_current) "
+        "VALUES (?, ?, ?, ?, ?, ?)", PRICES
+    )
+    conn.commit()
+    conn.close()
+
+
+class LookupTestCase(unittest.TestCase):
+    """Gemeinsame Tests; Unterklassen legen das Schema fest."""
+
+    compact = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(cls.tmp_dir.name, 'publications.db')
+        build_database(db_path)
+        if cls.compact:
+            compact_path = os.path.join(cls.tmp_dir.name, 'compact.db')
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_compact_database(db_path, compact_path)
+            db_path = compact_path
+        cls.db_path = db_path
+
+    @classmethod
+    def tearDownClass(cls):
+        mediprice_app._connection_pools.pop(cls.db_path, None)
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        mediprice_app.app.config['DATABASE'] = self.db_path
+        self.client = mediprice_app.app.test_client()
+
+    def as_of(self, as_of, keys):
+        response = self.client.post('/api/prices/as-of', json={'date': as_of, 'keys': keys})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_as_of_returns_price_valid_on_date(self):
+        result = self.as_of('2024-02-15', ['11111001', '22222001'])
+        prices = {row['key']: row for row in result['prices']}
+
+        self.assertEqual(prices['11111001']['price'], 9.5)
+        self.assertEqual(prices['11111001']['valid_from'], '2024-02-01')
+        self.assertEqual(prices['11111001']['valid_until'], '2024-03-01')
+        self.assertEqual(prices['22222001']['price'], 20.0)
+
+    def test_as_of_latest_open_interval(self):
+        result = self.as_of('2025-01-01', ['11111001'])
+
+        self.assertEqual(result['prices'][0]['price'], 8.0)
+        self.assertIsNone(result['prices'][0]['valid_until'])
+
+    def test_as_of_before_first_price(self):
+        result = self.as_of('2024-01-15', ['22222001'])
+
+        self.assertEqual(result['count'], 1)
+        self.assertIsNone(result['prices'][0]['price'])
+
+    def test_as_of_resolves_gtin_and_reports_unknown_keys(self):
+        result = self.as_of('2024-03-01', ['7680111110011', '11111001', '999'])
+
+        self.assertEqual([row['key'] for row in result['prices']], ['11111001', '7680111110011'])
+        self.assertTrue(all(row['price'] == 8.0 for row in result['prices']))
+        self.assertEqual(result['not_found'], ['999'])
+
+    def test_batch_returns_current_price(self):
+        response = self.client.post('/api/products/batch',
+                                    json={'keys': ['7680222220011', '11111001', 'x']})
+        result = response.get_json()
+        products = {row['key']: row for row in result['products']}
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(products['11111001']['current_price'], 8.0)
+        self.assertEqual(products['7680222220011']['product_number'], '22222001')
+        self.assertEqual(products['7680222220011']['current_price'], 20.0)
+        self.assertEqual(result['not_found'], ['x'])
+
+    def test_price_series_is_columnar_and_conditional(self):
+        response = self.client.get('/api/product/1/prices')
+        result = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(result['dates'], ['2024-01-01', '2024-02-01', '2024-03-01'])
+        self.assertEqual(result['prices'], [10.0, 9.5, 8.0])
+
+        cached = self.client.get('/api/product/1/prices',
+                                 headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get('/api/product/99/prices').status_code, 404)
+
+    def test_search_stream_respects_limit(self):
+        response = self.client.get('/api/search?q=Tabl&stream=1&limit=1')
+        lines = response.get_data(as_text=True).splitlines()
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(len(lines), 1)
+        self.assertIn('11111001', lines[0])
+
+        response = self.client.get('/api/search?q=Tabl&stream=1')
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 2)
+
+    def test_search_pages_follow_stream_order(self):
+        streamed = [json.loads(line)['product_number'] for line in
+                    self.client.get('/api/search?q=Tabl&stream=1').get_data(as_text=True).splitlines()]
+
+        paged = []
+        url = '/api/search?q=Tabl&limit=1'
+        while url:
+            response = self.client.get(url)
+            paged.extend(product['product_number'] for product in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            url = f'/api/search?q=Tabl&limit=1&cursor={cursor}' if cursor else None
+
+        self.assertEqual(paged, streamed)
+        self.assertEqual(sorted(paged), ['11111001', '22222001'])
+
+    def test_search_stream_false_returns_page(self):
+        response = self.client.get('/api/search?q=Tabl&stream=0&limit=1')
+
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertIn('X-Next-Cursor', response.headers)
+
+
+class NormalSchemaTest(LookupTestCase):
+    compact = False
+
+
+class CompactSchemaTest(LookupTestCase):
+    compact = True
+
+
+del LookupTestCase
+
+
+if __name__ == '__main__':
+    unittest.main()
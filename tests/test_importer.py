@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Tests für den Excel-Import (PublicationImporter) mit den Publikationen
+aus Testdaten/
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / 'DB'))
+sys.path.insert(0, str(ROOT_DIR / 'mediprice_app'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from archive_export import export_database
+    from db_diagnose_fix import create_tables, get_price_mode
+    from excel_import_script import PublicationImporter
+    from price_analytics import PriceArchive, to_dates
+
+
+TESTDATA_DIR = ROOT_DIR / 'Testdaten' / 'BAG_xls_2025'
+
+# 62502002 (Menveo) steht zweimal in der Liste, die "(Teilpackung)"-Zeile
+# ohne Preis nach der Zeile mit Preis
+FILES = [TESTDATA_DIR / 'Publications-20250101.xlsx', TESTDATA_DIR / 'Publications-20250201.xlsx']
+
+
+def import_files(db_path, files, **options):
+    """Legt eine leere Datenbank an und importiert die Dateien der Reihe nach."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_tables(db_path)
+        importer = PublicationImporter(db_path, extra_sheets=False, **options)
+        importer.connect()
+        try:
+            for filepath in files:
+                importer.import_excel_file(str(filepath))
+        finally:
+            importer.close()
+    return importer.stats
+
+
+def import_directory(db_path, directory, jobs=1, create=True):
+    """Importiert alle Publikationen eines Verzeichnisses (mit Zusatz-Sheets)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if create:
+            create_tables(db_path)
+        importer = PublicationImporter(db_path)
+        importer.connect()
+        try:
+            importer.import_directory(str(directory), 'Publications-*.xlsx', jobs=jobs)
+        finally:
+            importer.close()
+    return importer.stats
+
+
+def query(db_path, sql):
+    """Alle Zeilen einer Abfrage."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def fetch_sheet_rows(db_path):
+    """Daten der Zusatz-Sheets mit Produktnummer und Text statt IDs."""
+    return {
+        'product_texts': query(db_path, """
+            SELECT p.product_number, t.language, t.description
+            FROM product_texts t JOIN products p ON p.id = t.product_id
+            ORDER BY 1, 2
+        """),
+        'limitations': query(db_path, """
+            SELECT p.product_number, l.language, s.value, l.valid_from, l.valid_until
+            FROM limitations l
+            JOIN products p ON p.id = l.product_id
+            JOIN strings s ON s.id = l.text_id
+            ORDER BY 1, 2, 4
+        """),
+        'product_flags': query(db_path, """
+            SELECT p.product_number, f.is_generic, f.deductible_percent, f.valid_from, f.valid_until
+            FROM product_flags f JOIN products p ON p.id = f.product_id
+            ORDER BY 1, 4
+        """),
+    }
+
+
+def load_archive(db_path):
+    """Lädt das Preisarchiv einer Datenbank für die Auswertungen."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return PriceArchive.load(conn)
+    finally:
+        conn.close()
+
+
+def fetch_prices(db_path):
+    """Preise mit Produktnummer statt ID (IDs hängen von der Reihenfolge ab)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT p.product_number, pr.price, pr.valid_from, pr.valid_until,
+                   pr.source_file, pr.is_current
+            FROM prices pr
+            JOIN products p ON p.id = pr.product_id
+            ORDER BY p.product_number, pr.valid_from
+        """).fetchall()
+    finally:
+        conn.close()
+
+
+@unittest.skipUnless(all(path.exists() for path in FILES), "Testdaten fehlen")
+class ImportModeTest(unittest.TestCase):
+    """Mengenbasierter und zeilenweiser Import liefern dieselben Preise."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.prices = {}
+        for bulk in (True, False):
+            db_path = os.path.join(cls.tmp_dir.name, f'bulk_{bulk}.db')
+            stats = import_files(db_path, FILES, bulk=bulk)
+            assert not stats['errors'], stats['errors']
+            cls.prices[bulk] = fetch_prices(db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_bulk_and_row_mode_store_identical_prices(self):
+        self.assertEqual(len(self.prices[True]), len(self.prices[False]))
+        self.assertEqual(self.prices[True], self.prices[False])
+
+    def test_priceless_duplicate_keeps_price(self):
+        current = [row for row in self.prices[True] if row[0] == '62502002' and row[5]]
+
+        self.assertEqual(len(current), 1)
+        self.assertEqual(current[0][1], 158.45)
+
+
+@unittest.skipUnless(all(path.exists() for path in FILES), "Testdaten fehlen")
+class PriceModeTest(unittest.TestCase):
+    """Speichermodus wird vermerkt, gemischte Archive werden abgelehnt."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.db_paths = {}
+        for change_only in (False, True):
+            db_path = os.path.join(cls.tmp_dir.name, f'change_only_{change_only}.db')
+            stats = import_files(db_path, FILES, change_only=change_only)
+            assert not stats['errors'], stats['errors']
+            cls.db_paths[change_only] = db_path
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_mode_is_recorded(self):
+        for change_only, mode in ((False, 'publication'), (True, 'change_only')):
+            conn = sqlite3.connect(self.db_paths[change_only])
+            try:
+                self.assertEqual(get_price_mode(conn.cursor()), mode)
+            finally:
+                conn.close()
+
+    def test_mixing_modes_is_rejected(self):
+        for change_only in (False, True):
+            importer = PublicationImporter(self.db_paths[change_only], change_only=not change_only)
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(ValueError):
+                    importer.connect()
+                importer.close()
+
+    def test_archive_reads_both_modes(self):
+        publication = load_archive(self.db_paths[False])
+        change_only = load_archive(self.db_paths[True])
+
+        self.assertFalse(publication.change_only)
+        self.assertTrue(change_only.change_only)
+        self.assertEqual(to_dates(change_only.dates), ['2025-01-01', '2025-02-01'])
+        self.assertEqual(change_only.price_index()['products'][0],
+                         publication.price_index()['products'][0])
+        self.assertEqual(change_only.price_changes(2025, 2), publication.price_changes(2025, 2))
+
+    def test_unchanged_price_keeps_open_interval(self):
+        publication = fetch_prices(self.db_paths[False])
+        change_only = fetch_prices(self.db_paths[True])
+        january = {row[:4] for row in publication if row[2] == '2025-01-01'}
+        unchanged = {
+            number for number, price, valid_from, _, _, _ in publication
+            if valid_from == '2025-02-01'
+            and (number, price, '2025-01-01', '2025-02-01') in january
+        }
+
+        self.assertTrue(unchanged)
+        self.assertLess(len(change_only), len(publication))
+        for number, price, valid_from, valid_until, _, is_current in change_only:
+            if number in unchanged:
+                self.assertEqual((valid_from, valid_until, is_current), ('2025-01-01', None, 1))
+
+
+@unittest.skipUnless(all(path.exists() for path in FILES), "Testdaten fehlen")
+class DirectoryImportTest(unittest.TestCase):
+    """Verzeichnis-Import mit Zusatz-Sheets, sequentiell und parallel."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.files_dir = Path(cls.tmp_dir.name) / 'files'
+        cls.files_dir.mkdir()
+        for filepath in FILES:
+            shutil.copy2(filepath, cls.files_dir)
+
+        cls.db_path = os.path.join(cls.tmp_dir.name, 'sequential.db')
+        cls.parallel_path = os.path.join(cls.tmp_dir.name, 'parallel.db')
+        for db_path, jobs in ((cls.db_path, 1), (cls.parallel_path, 2)):
+            stats = import_directory(db_path, cls.files_dir, jobs=jobs)
+            assert not stats['errors'], stats['errors']
+            assert stats['files_processed'] == len(FILES), stats
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_parallel_import_matches_sequential(self):
+        self.assertEqual(fetch_prices(self.parallel_path), fetch_prices(self.db_path))
+        self.assertEqual(fetch_sheet_rows(self.parallel_path), fetch_sheet_rows(self.db_path))
+
+    def test_reimport_skips_unchanged_files(self):
+        before = fetch_prices(self.db_path)
+        stats = import_directory(self.db_path, self.files_dir, create=False)
+
+        self.assertEqual(stats['files_skipped'], len(FILES))
+        self.assertEqual(stats['files_processed'], 0)
+        self.assertEqual(fetch_prices(self.db_path), before)
+
+    def test_product_keys_are_plain_digits(self):
+        numbers, gtins, malformed = query(self.db_path, """
+            SELECT COUNT(*), COUNT(gtin),
+                   SUM(product_number GLOB '*[^0-9]*' OR gtin GLOB '*[^0-9]*')
+            FROM products
+        """)[0]
+
+        self.assertGreater(numbers, 0)
+        self.assertGreater(gtins, 0)
+        self.assertEqual(malformed, 0)
+
+    def test_extra_sheets_are_imported(self):
+        rows = fetch_sheet_rows(self.db_path)
+
+        self.assertEqual({row[1] for row in rows['product_texts']}, {'fr'})
+        self.assertEqual({row[1] for row in rows['limitations']}, {'de', 'fr'})
+        self.assertTrue(rows['product_flags'])
+
+    def test_limitation_texts_are_stored_once(self):
+        strings, texts, limitations = query(self.db_path, """
+            SELECT (SELECT COUNT(*) FROM strings),
+                   (SELECT COUNT(DISTINCT text_id) FROM limitations),
+                   (SELECT COUNT(*) FROM limitations)
+        """)[0]
+
+        self.assertEqual(strings, texts)
+        self.assertLess(texts, limitations)
+
+    def test_db_meta_matches_tables(self):
+        meta = dict(query(self.db_path, "SELECT key, value FROM db_meta"))
+        products, prices = query(self.db_path, """
+            SELECT (SELECT COUNT(*) FROM products), (SELECT COUNT(*) FROM prices)
+        """)[0]
+
+        self.assertEqual(int(meta['product_count']), products)
+        self.assertEqual(int(meta['price_count']), prices)
+        self.assertEqual(meta['latest_date'], '2025-02-01')
+
+    def test_mapping_profile_is_stored(self):
+        self.assertEqual(query(self.db_path, "SELECT profile, version FROM mapping_profiles"),
+                         [('bag_publications', 2)])
+
+    def test_archive_export(self):
+        try:
+            import pyarrow.dataset as ds
+        except ImportError:
+            self.skipTest("pyarrow nicht installiert")
+
+        out_dir = Path(self.tmp_dir.name) / 'export'
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = export_database(self.db_path, str(out_dir))
+        prices = ds.dataset(out_dir / 'prices', format='parquet', partitioning='hive').to_table()
+
+        self.assertEqual(counts['products'], query(self.db_path, "SELECT COUNT(*) FROM products")[0][0])
+        self.assertEqual(prices.num_rows, len(fetch_prices(self.db_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
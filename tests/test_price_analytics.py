@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests für price_analytics.PriceArchive (Preis-Matrix und Auswertungen)
+"""
+
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / 'mediprice_app'))
+
+from price_analytics import PriceArchive
+
+
+PRODUCTS = [
+    (1, '11111001', 'Alpha, Tabl 10 mg, 30 Stk', '01.01.'),
+    (2, '22222001', 'Beta, Tabl 20 mg, 30 Stk', '01.02.'),
+    (3, '33333001', 'Gamma, Tabl 5 mg, 30 Stk', '02.01.'),
+]
+
+DATES = ['2024-01-01', '2024-02-01', '2024-03-01']
+
+
+class PerPublicationArchiveTest(unittest.TestCase):
+    """Normaler Import: eine Zeile pro Publikation und gelistetem Produkt."""
+
+    def setUp(self):
+        # Gamma wird nach Februar nicht mehr publiziert; seine letzte Zeile
+        # bleibt offen (valid_until NULL), wie sie der Importer hinterlässt
+        rows = [
+            (1, '2024-01-01', '2024-02-01', 10.0),
+            (1, '2024-02-01', '2024-03-01', 10.0),
+            (1, '2024-03-01', None, 8.0),
+            (2, '2024-01-01', '2024-02-01', 20.0),
+            (2, '2024-02-01', '2024-03-01', 20.0),
+            (2, '2024-03-01', None, 20.0),
+            (3, '2024-01-01', '2024-02-01', 30.0),
+            (3, '2024-02-01', None, 30.0),
+        ]
+        self.archive = PriceArchive(PRODUCTS, rows)
+
+    def test_delisted_product_is_not_listed_later(self):
+        self.assertFalse(self.archive.change_only)
+        self.assertTrue(np.isnan(self.archive.matrix[2, 2]))
+        self.assertEqual(self.archive.price_index()['products'], [3, 3, 2])
+
+    def test_average_price_ignores_delisted_product(self):
+        index = self.archive.price_index()
+
+        self.assertEqual(index['dates'], DATES)
+        self.assertEqual(index['average_price'][2], 14.0)
+        self.assertEqual(index['index'], [100.0, 100.0, round(100 * 0.8 ** 0.5, 2)])
+
+    def test_top_decreases_skips_delisted_product(self):
+        result = self.archive.top_decreases(n=5)
+        products = [item['id'] for group in result['groups'].values() for item in group]
+
+        self.assertEqual(products, [1])
+        self.assertEqual(result['groups']['01.'][0]['change_percent'], -20.0)
+
+    def test_price_changes_in_month(self):
+        changes = self.archive.price_changes(2024, 3)
+
+        self.assertEqual([(change['id'], change['new_price']) for change in changes], [(1, 8.0)])
+
+
+class ChangeOnlyArchiveTest(unittest.TestCase):
+    """Intervall-Modus: neue Zeilen nur bei Preisänderungen."""
+
+    rows = [
+        (1, '2024-01-01', '2024-03-01', 10.0),
+        (1, '2024-03-01', None, 8.0),
+        (2, '2024-01-01', None, 20.0),
+        (3, '2024-02-01', None, 30.0),
+    ]
+
+    def test_open_interval_stays_listed(self):
+        archive = PriceArchive(PRODUCTS, self.rows, DATES, change_only=True)
+
+        self.assertEqual(archive.price_index()['products'], [2, 3, 3])
+        self.assertEqual(archive.matrix[0].tolist(), [10.0, 10.0, 8.0])
+
+    def test_publication_without_price_change_has_column(self):
+        archive = PriceArchive(PRODUCTS, self.rows, DATES + ['2024-04-01'], change_only=True)
+        index = archive.price_index()
+
+        self.assertEqual(index['dates'][-1], '2024-04-01')
+        self.assertEqual(index['products'], [2, 3, 3, 3])
+        self.assertEqual(index['index'][-1], index['index'][-2])
+
+    def test_load_reads_mode_and_publications(self):
+        conn = sqlite3.connect(':memory:')
+        conn.executescript('''
+            CREATE TABLE products (id INTEGER PRIMARY KEY, product_number TEXT,
+                                   description TEXT, category TEXT);
+            CREATE TABLE prices (product_id INTEGER, valid_from DATE,
+                                 valid_until DATE, price REAL);
+            CREATE TABLE db_meta (key TEXT PRIMARY KEY, value);
+            CREATE TABLE import_manifest (sha256 TEXT PRIMARY KEY, valid_from DATE);
+            INSERT INTO db_meta VALUES ('price_mode', 'change_only');
+        ''')
+        conn.executemany("INSERT INTO products VALUES (?, ?, ?, ?)", PRODUCTS)
+        conn.executemany("INSERT INTO prices VALUES (?, ?, ?, ?)", self.rows)
+        conn.executemany("INSERT INTO import_manifest VALUES (?, ?)",
+                         [(date, date) for date in DATES + ['2024-04-01']])
+
+        archive = PriceArchive.load(conn)
+
+        self.assertTrue(archive.change_only)
+        self.assertEqual(archive.price_index()['products'], [2, 3, 3, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests für die Query-Plan Prüfung: alle Abfragen der App nutzen auf dem
+frischen Schema einen Index, auch mit veralteten Planer-Statistiken
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_DIR / 'DB'))
+sys.path.insert(0, str(ROOT_DIR / 'mediprice_app'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from compact_schema import build_compact_database
+    from db_diagnose_fix import create_tables
+    from query_plan_check import check_query_plans, find_table_scans
+
+
+# sqlite_stat1 eines Archivs 2023–2025, in dem normalize-product-keys
+# ANALYZE bei noch leerer gtin-Spalte ausgeführt hat
+STALE_STATS = [
+    ('products', 'idx_products_category', '11770 53'),
+    ('products', 'idx_products_gtin', '11770 11770'),
+    ('products', 'idx_products_number', '11770 1'),
+    ('products', 'sqlite_autoindex_products_1', '11770 1'),
+    ('prices', 'idx_prices_current_product', '11723 1'),
+    ('prices', 'idx_prices_product_history', '425561 37 1 1'),
+    ('prices', 'idx_prices_valid_from', '425561 10133'),
+    ('price_stats', None, '11723'),
+    ('limitations', 'idx_limitations_current', '8116 2 1'),
+    ('product_flags', 'idx_product_flags_current', '10208 1'),
+    ('strings', 'sqlite_autoindex_strings_1', '1948 1'),
+    ('db_meta', 'sqlite_autoindex_db_meta_1', '4 1'),
+]
+
+
+def write_stats(db_path, stats):
+    """Ersetzt sqlite_stat1 einer Datenbank durch die angegebenen Zeilen."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    conn.execute("DELETE FROM sqlite_stat1")
+    conn.executemany(
+        "INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)",
+        [row for row in stats if row[0] in names and (row[1] is None or row[1] in names)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def explain(db_path, sql, parameters=()):
+    """Query-Plan einer Abfrage."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    finally:
+        conn.close()
+
+
+class FindTableScansTest(unittest.TestCase):
+    """Nur SEARCH-Schritte gelten als Indexzugriff."""
+
+    def scans(self, *details):
+        return find_table_scans([(index, 0, 0, detail) for index, detail in enumerate(details)])
+
+    def test_search_is_accepted(self):
+        self.assertEqual(self.scans('SEARCH p USING INDEX idx_products_number (product_number=?)',
+                                    'SEARCH pr USING INTEGER PRIMARY KEY (rowid=?)'), [])
+
+    def test_scan_using_index_is_flagged(self):
+        details = ('SCAN p USING INDEX idx_products_number',
+                   'SCAN products USING COVERING INDEX idx_products_gtin',
+                   'SCAN pr')
+        self.assertEqual(self.scans(*details), list(details))
+
+    def test_subqueries_and_constant_rows_are_accepted(self):
+        self.assertEqual(self.scans('CO-ROUTINE k', 'SCAN CONSTANT ROW', 'SCAN k',
+                                    'MATERIALIZE latest', 'SCAN latest',
+                                    'SCAN (subquery-1)'), [])
+
+    def test_virtual_tables_need_a_constraint(self):
+        self.assertEqual(self.scans('SCAN products_fts VIRTUAL TABLE INDEX 0:M2',
+                                    'SCAN k VIRTUAL TABLE INDEX 1:'), [])
+        self.assertEqual(self.scans('SCAN products_fts VIRTUAL TABLE INDEX 0:'),
+                         ['SCAN products_fts VIRTUAL TABLE INDEX 0:'])
+
+    def test_small_tables_are_accepted(self):
+        self.assertEqual(self.scans('SCAN db_meta', 'SCAN import_manifest'), [])
+
+
+class AppQueryPlansTest(unittest.TestCase):
+    """Abfragen der App auf dem frischen und dem kompakten Schema."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmp_dir.name, 'schema.db')
+        cls.compact_path = os.path.join(cls.tmp_dir.name, 'compact.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables(cls.db_path)
+            build_compact_database(cls.db_path, cls.compact_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def check(self, db_path, stats):
+        write_stats(db_path, stats)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return check_query_plans(db_path)
+
+    def test_without_statistics(self):
+        for db_path in (self.db_path, self.compact_path):
+            with self.subTest(db_path=os.path.basename(db_path)):
+                self.assertEqual(self.check(db_path, []), [])
+
+    def test_with_stale_gtin_statistics(self):
+        for db_path in (self.db_path, self.compact_path):
+            with self.subTest(db_path=os.path.basename(db_path)):
+                self.assertEqual(self.check(db_path, STALE_STATS), [])
+
+    def test_or_lookup_is_flagged_with_stale_statistics(self):
+        write_stats(self.db_path, STALE_STATS)
+        plan = explain(self.db_path, "SELECT p.* FROM products p "
+                                     "WHERE p.product_number = ? OR p.gtin = ? "
+                                     "ORDER BY p.product_number", (None, None))
+
+        self.assertTrue(find_table_scans(plan))
+
+
+if __name__ == '__main__':
+    unittest.main()